@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 class Point:
 	'''
 	Point - class to work with point in 2d space
@@ -9,6 +11,8 @@ class Point:
 	'''
 	ROUND = 3
 
+	__slots__ = ("x", "y")
+
 	#Initializer
 	def __init__(self, x: float = 0, y: float = 0):
 		self.x = x
@@ -84,6 +88,10 @@ class Point:
 	#Other classic methods
 
 	def __add__(self, point2: 'Point'):
+		#Arrays of points are added by 'PointArray.__radd__'
+		if isinstance(point2, PointArray):
+			return NotImplemented
+
 		if not isinstance(point2, Point):
 			point2 = Point(0, 0)
 
@@ -96,6 +104,10 @@ class Point:
 		return self.__add__(point2)
 
 	def __sub__(self, point2: 'Point'):
+		#Arrays of points are subtracted by 'PointArray.__rsub__'
+		if isinstance(point2, PointArray):
+			return NotImplemented
+
 		return self.__add__(point2.__mul__(-1))
 
 	def __rsub__(self, point2: 'Point'):
@@ -126,6 +138,8 @@ class Direction:
 	Direction - class to work with line direction. Containing comparator of direction, and possibility to switch the direction 
 	'''
 
+	__slots__ = ("line", "direction")
+
 	#Possible directions in terms of X and Y
 	no = (0, 0)
 	up = (0, 1)
@@ -167,8 +181,11 @@ class Line:
 	Also independent parameters:
 	- 'angle': angle in radians between line and horizontal axis
 	- 'distance': distance between two points
+	Coefficients of line equation are cached with points they are computed for, and computed again after points are replaced
 	'''
 
+	__slots__ = ("point1", "point2", "angle", "distance", "equation_cache")
+
 	#Initializer
 	def __init__(self, 
 			point1: Point = Point(0, 0), 
@@ -178,6 +195,7 @@ class Line:
 		self.point2 = point2
 		self.angle = Point.get_horizontal_angle(self.point1, self.point2)
 		self.distance = round(Point.get_distance(self.point1, self.point2), 6)
+		self.equation_cache = None
 
 	@staticmethod
 	def from_angle_distance_point(
@@ -212,6 +230,27 @@ class Line:
 		'''
 		return LineEquation(self)
 
+	def get_coefficients(self):
+		'''
+		Function to get tuple of line equation coefficients (A, B, C) for equation Ax + By + C = 0
+		Coefficients are cached, until any point of the line is replaced (for example, by 'reverse_direction')
+		'''
+		#Elements created without initializer don't have cache
+		cache = getattr(self, "equation_cache", None)
+		if cache is not None and cache[0] is self.point1 and cache[1] is self.point2:
+			return cache[2]
+
+		dx = self.point2.x - self.point1.x
+		dy = self.point2.y - self.point1.y
+		coefficients = (dy, -dx, self.point1.y*dx - self.point1.x*dy)
+		self.equation_cache = (self.point1, self.point2, coefficients)
+		return coefficients
+
+	def evaluate(self, point: 'Point | PointArray'):
+		'''Function to get value Ax + By + C of line equation for point, or for each point of PointArray, without creating equation objects'''
+		A, B, C = self.get_coefficients()
+		return A*point.x + B*point.y + C
+
 	def get_boundaries(self):
 		'''Function to get boundary points of line'''
 		return self.point1, self.point2
@@ -255,12 +294,32 @@ class Line:
 		'''Function to get angle between line and horizontal axis'''
 		return self.angle
 
+	def get_boundary_box(self):
+		'''Function to get bottom left and top right points of the box containing line sector'''
+		lower = Point(min(self.point1.x, self.point2.x), min(self.point1.y, self.point2.y))
+		upper = Point(max(self.point1.x, self.point2.x), max(self.point1.y, self.point2.y))
+		return lower, upper
+
+	def get_nearest_point(self, point: Point = Point(0, 0)):
+		'''Function to get point of the line sector, nearest to the given point'''
+		delta = self.point2 - self.point1
+		length = delta.x**2 + delta.y**2
+		if length == 0:
+			return self.point1
+
+		factor = ((point.x - self.point1.x)*delta.x + (point.y - self.point1.y)*delta.y)/length
+		return self.point1 + delta*min(max(factor, 0), 1)
+
+	def get_distance_to_point(self, point: Point = Point(0, 0)):
+		'''Function to get distance between point and line sector'''
+		return point.get_distance(self.get_nearest_point(point))
+
 	def is_point_on_line(self, point: Point = Point(0, 0)):
 		'''
 		Function to check is point (x, y) located on the line
 		By default checks is line intersect center of coordinate system
 		'''
-		return self.get_equation(point) == 0
+		return self.evaluate(point) == 0
 
 	def is_point_on_object(self, point: Point = Point(0, 0)):
 		'''
@@ -313,8 +372,11 @@ class Circle:
 	Containing parameters: 
 	- 'center': central point of circle in 2d space
 	- 'radius': radius of the circle
+	Coefficients of circle equation are cached with center and radius they are computed for, and computed again after they are changed
 	'''
 
+	__slots__ = ("center", "radius", "equation_cache")
+
 	#Initializer
 	def __init__(self, 
 			center: Point = Point(0, 0), 
@@ -322,6 +384,7 @@ class Circle:
 	):
 		self.center = center
 		self.radius = radius
+		self.equation_cache = None
 
 	#Getters
 
@@ -333,6 +396,27 @@ class Circle:
 		'''
 		return CircleEquation(self)
 
+	def get_coefficients(self):
+		'''
+		Function to get tuple of circle equation coefficients (A, B, C) for equation x^2 + y^2 + Ax + By + C = 0
+		Coefficients are cached, until center is replaced or radius is changed (for example, by 'scale')
+		'''
+		#Elements created without initializer don't have cache
+		cache = getattr(self, "equation_cache", None)
+		if cache is not None and cache[0] is self.center and cache[1] == self.radius:
+			return cache[2]
+
+		x, y = self.center.x, self.center.y
+		coefficients = (-2*x, -2*y, x**2 + y**2 - self.radius**2)
+		self.equation_cache = (self.center, self.radius, coefficients)
+		return coefficients
+
+	def evaluate(self, point: 'Point | PointArray'):
+		'''Function to get value (x-x0)^2 + (y-y0)^2 - r^2 of circle equation for point, or for each point of PointArray, without creating equation objects'''
+		dx = point.x - self.center.x
+		dy = point.y - self.center.y
+		return dx*dx + dy*dy - self.radius*self.radius
+
 	def get_center(self):
 		'''Function to get center point of the circle'''
 		return self.center
@@ -348,17 +432,21 @@ class Circle:
 		delta = Point(self.radius, self.radius)*scale_factor
 		return self.center - delta, self.center + delta 
 
+	def get_distance_to_point(self, point: Point = Point(0, 0)):
+		'''Function to get distance between point and circle area (zero for points inside circle)'''
+		return max(point.get_distance(self.center) - self.radius, 0)
+
 	def is_point_inside(self, point: Point = Point(0, 0)):
 		'''
 		Function to get information - is point located inside circle
 		'''
-		return self.get_equation()(point) < 0
+		return self.evaluate(point) < 0
 
 	def is_point_on_object(self, point: Point = Point(0, 0)):
 		'''
 		Function to get information - is point located on circle boundaries
 		'''
-		return self.get_equation()(point) == 0
+		return self.evaluate(point) == 0
 
 	#Other classic methods
 
@@ -392,6 +480,8 @@ class LineEquation:
 	Containing parameters: 
 	- 'line': line in 2d space
 	'''
+	__slots__ = ("line", "coefficients", "equation")
+
 	def __init__(self, 
 			line: Line = Line(Point(0, 0), Point(1, 1))
 	):
@@ -407,11 +497,7 @@ class LineEquation:
 		Looks like: Ax + By + C = 0
 		Returns list of coefficients - [A, B, C]
 		'''
-		deltas = self.line.point2 - self.line.point1
-		A = deltas.y
-		B = -deltas.x
-		C = self.line.point1.y * deltas.x - self.line.point1.x * deltas.y
-		return [A, B, C]
+		return list(self.line.get_coefficients())
 
 	def generate_equation(self):
 		'''
@@ -419,7 +505,7 @@ class LineEquation:
 		Looks like: Ax + By + C = 0
 		Returns function f(Point(x, y)) = Ax + By + C
 		'''
-		A, B, C = self.generate_equation_coeffitients()
+		A, B, C = self.coefficients
 
 		def function(point: Point = Point(0, 0)):
 			'''Function of the line f(Point(x, y)) = Ax + By + C'''
@@ -455,6 +541,8 @@ class CircleEquation:
 	Containing parameters: 
 	- 'circle': circle in 2d space
 	'''
+	__slots__ = ("circle", "coefficients", "equation")
+
 	def __init__(self, circle: Circle = Circle(Point(0, 0), 1)):
 		self.circle = circle
 		self.coefficients = self.generate_equation_coeffitients()
@@ -469,10 +557,7 @@ class CircleEquation:
 		Returns list of coeffitients [A, B, C]
 		For x^2 and y^2 there are always coefficients equals 1, only for linear terms
 		'''
-		A = -2*self.circle.center.x
-		B = -2*self.circle.center.y
-		C = self.circle.center.x**2 + self.circle.center.y**2 - self.circle.radius**2
-		return [A, B, C]
+		return list(self.circle.get_coefficients())
 
 	def generate_equation(self):
 		'''
@@ -485,7 +570,7 @@ class CircleEquation:
 			if not isinstance(point, Point):
 				point = Point(0, 0)
 
-			deltas = self.point-self.circle.center
+			deltas = point-self.circle.center
 			return deltas.x**2 + deltas.y**2 - self.circle.radius**2
 
 		return function
@@ -508,3 +593,466 @@ class CircleEquation:
 
 	def __call__(self, point: Point = Point(0, 0)):
 		return self.equation(point)
+
+
+class PointArray:
+	'''
+	PointArray - class to work with arrays of points in 2d space, stored as structure of arrays
+	Containing parameters: 
+	- 'x' coordinates in space (numpy array)
+	- 'y' coordinates in space (numpy array)
+	Arrays can have any shape, but shapes of 'x' and 'y' must be the same
+	'''
+
+	__slots__ = ("x", "y")
+
+	#Initializer
+	def __init__(self, x = (), y = ()):
+		self.x = np.asarray(x, dtype=float)
+		self.y = np.asarray(y, dtype=float)
+
+	@staticmethod
+	def from_points(points: list[Point]):
+		'''Generate array of points from list of points'''
+		return PointArray([point.x for point in points], [point.y for point in points])
+
+	@staticmethod
+	def from_point(point: Point, shape: tuple = ()):
+		'''Generate array of the specific shape filled with one point'''
+		return PointArray(np.full(shape, point.x, dtype=float), np.full(shape, point.y, dtype=float))
+
+	#Converters
+
+	def to_points(self):
+		'''Function to convert array to flat list of points'''
+		return [Point(x, y) for x, y in zip(self.x.ravel().tolist(), self.y.ravel().tolist())]
+
+	#Getters
+
+	def get_shape(self):
+		return self.x.shape
+
+	def get_distance(self, point2: 'Point | PointArray' = None):
+		'''Distances between points of arrays (by default - distances between points and coordinate system center)'''
+		
+		if not isinstance(point2, (Point, PointArray)):
+			point2 = Point(0, 0)
+
+		dx = self.x - point2.x
+		dy = self.y - point2.y
+		return (dx**2 + dy**2)**(1/2)
+
+	def get_horizontal_angle(self, point2: 'Point | PointArray' = None):
+		'''Angles (in radians modulo PI) between lines by pairs of points and horizontal axis (by default - angles of lines connecting coordinate system center)'''
+		
+		if not isinstance(point2, (Point, PointArray)):
+			point2 = Point(0, 0)
+
+		dx = self.x - point2.x
+		dy = self.y - point2.y
+
+		#To except division by zero, set default value for arctan(infty)
+		vertical = (dx == 0)
+		with np.errstate(divide="ignore", invalid="ignore"):
+			angle = np.arctan(dy/np.where(vertical, 1, dx))%math.pi
+
+		return np.where(vertical, math.pi/2, angle)
+
+	def get_second_point_from_angle_distance(self, angle, distance):
+		'''
+		Generate second points from first, distances and angles:
+		- 'angle' - angles in radians of oriented lines (between 0 and PI)
+		- 'distance' - distances between points (can be negative to orientate it in negative direction)
+		'''
+		deltapoint = PointArray(
+			np.round(distance*np.cos(angle%math.pi), 6), 
+			np.round(distance*np.sin(angle%math.pi), 6)
+		)
+		return self+deltapoint
+
+	def get_scaled_point_to_factor(self, point: 'Point | PointArray', scale = 1):
+		'''Function to get given points with scaled distance on the same lines'''
+		return self + (point - self)*(scale/self.get_distance(point))
+
+	def get_boundary_box(self):
+		'''Function to get bottom left and top right points of the box containing all points'''
+		if self.x.size == 0:
+			return Point(0, 0), Point(0, 0)
+
+		return Point(float(self.x.min()), float(self.y.min())), Point(float(self.x.max()), float(self.y.max()))
+
+	def get_xy_lists(self):
+		return self.x.ravel().tolist(), self.y.ravel().tolist()
+
+	def get_coordinates(self):
+		return self.x, self.y
+
+	def round(self, signs: int = 0):
+		return PointArray(np.round(self.x, signs), np.round(self.y, signs))
+
+	def int(self):
+		return PointArray(np.trunc(self.x), np.trunc(self.y))
+
+	def reshape(self, *shape):
+		return PointArray(self.x.reshape(*shape), self.y.reshape(*shape))
+
+	#Other classic methods
+
+	def __add__(self, point2: 'Point | PointArray'):
+		if not isinstance(point2, (Point, PointArray)):
+			point2 = Point(0, 0)
+
+		return PointArray(self.x + point2.x, self.y + point2.y)
+
+	def __mul__(self, number):
+		return PointArray(self.x*number, self.y*number)
+
+	def __radd__(self, point2: 'Point | PointArray'):
+		return self.__add__(point2)
+
+	def __sub__(self, point2: 'Point | PointArray'):
+		return self.__add__(point2.__mul__(-1))
+
+	def __rsub__(self, point2: 'Point | PointArray'):
+		return self.__mul__(-1).__add__(point2)
+
+	def __truediv__(self, number):
+		return self.__mul__(1/number)
+
+	def __len__(self):
+		return len(self.x)
+
+	def __getitem__(self, index):
+		x = self.x[index]
+		y = self.y[index]
+		if np.ndim(x) == 0:
+			return Point(float(x), float(y))
+
+		return PointArray(x, y)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def __str__(self):
+		return f"PointArray{self.get_shape()}"
+
+	def __repr__(self):
+		return f"PointArray[x={self.x}, y={self.y}]"
+
+
+class LineArray:
+	'''
+	LineArray - class to work with arrays of lines and line sectors in 2d space, stored as structure of arrays
+	Containing parameters: 
+	- 'point1': first points in 2d space (PointArray)
+	- 'point2': second points in 2d space (PointArray)
+	Also independent parameters:
+	- 'angle': angles in radians between lines and horizontal axis (numpy array)
+	- 'distance': distances between two points of the lines (numpy array)
+	'''
+
+	__slots__ = ("point1", "point2", "angle", "distance")
+
+	#Initializer
+	def __init__(self, point1: PointArray = None, point2: PointArray = None):
+		self.point1 = point1 if isinstance(point1, PointArray) else PointArray()
+		self.point2 = point2 if isinstance(point2, PointArray) else PointArray()
+		self.angle = self.point1.get_horizontal_angle(self.point2)
+		self.distance = np.round(self.point1.get_distance(self.point2), 6)
+
+	@staticmethod
+	def from_lines(lines: list[Line]):
+		'''Generate array of lines from list of lines'''
+		return LineArray(
+			PointArray.from_points([line.point1 for line in lines]), 
+			PointArray.from_points([line.point2 for line in lines])
+		)
+
+	#Converters
+
+	def to_lines(self):
+		'''Function to convert array to flat list of lines'''
+		return [Line(point1, point2) for point1, point2 in zip(self.point1.to_points(), self.point2.to_points())]
+
+	#Setters
+
+	def reverse_direction(self, mask = True):
+		'''Reverse lines direction (only for lines selected by mask, if it's given)'''
+		mask = np.broadcast_to(mask, self.get_shape())
+		x1 = np.where(mask, self.point2.x, self.point1.x)
+		y1 = np.where(mask, self.point2.y, self.point1.y)
+		x2 = np.where(mask, self.point1.x, self.point2.x)
+		y2 = np.where(mask, self.point1.y, self.point2.y)
+		self.point1, self.point2 = PointArray(x1, y1), PointArray(x2, y2)
+
+	#Getters
+
+	def get_shape(self):
+		return self.point1.get_shape()
+
+	def get_boundaries(self):
+		'''Function to get boundary points of lines'''
+		return self.point1, self.point2
+
+	def get_points_by_distance_on_line(self, distance):
+		'''Function to get points distant in the specific distance from boundaries, and located inside lines'''
+		point1 = self.point1.get_scaled_point_to_factor(self.point2, distance)
+		point2 = self.point2.get_scaled_point_to_factor(self.point1, distance)
+		return point1, point2
+
+	def get_central_point(self):
+		'''Function to get points at center between boundaries of lines'''
+		return self.get_subdivision_points(2)[..., 0]
+
+	def get_subdivision_points(self, subdivisions_count: int = 1):
+		'''
+		Function to get subdivision points for lines. Returns points of subdivision inside. 
+		Result has shape of array with additional last axis, size of this axis is one less then subdivisions count.
+		'''
+		count = max(subdivisions_count-1, 0)
+		steps = np.arange(1, count+1)
+		scale = (steps*self.distance[..., None])/subdivisions_count
+
+		point1 = self.point1.reshape(*self.get_shape(), 1)
+		point2 = self.point2.reshape(*self.get_shape(), 1)
+		return point1.get_scaled_point_to_factor(point2, scale)
+
+	def get_distance(self):
+		'''Function to get distances between boundary points'''
+		return self.distance
+
+	def get_angle(self):
+		'''Function to get angles between lines and horizontal axis'''
+		return self.angle
+
+	def get_horizontal_angle(self):
+		return self.angle
+
+	def get_direction(self):
+		'''Function to get direction of lines in terms of X axis, same as Direction.get_direction for each line'''
+		return np.sign(self.point2.x - self.point1.x).astype(int)
+
+	def is_lines_in_one_direction(self, lines: 'LineArray'):
+		return self.get_direction() == lines.get_direction()
+
+	def get_boundary_box(self):
+		'''Function to get bottom left and top right points of the box for each line'''
+		lower = PointArray(np.minimum(self.point1.x, self.point2.x), np.minimum(self.point1.y, self.point2.y))
+		upper = PointArray(np.maximum(self.point1.x, self.point2.x), np.maximum(self.point1.y, self.point2.y))
+		return lower, upper
+
+	def get_xy_lists(self):
+		return [self.point1.x, self.point2.x], [self.point1.y, self.point2.y]
+
+	#Other classic methods
+
+	def __add__(self, point: 'Point | PointArray'):
+		if not isinstance(point, (Point, PointArray)):
+			point = Point(0, 0)
+
+		return LineArray(self.point1 + point, self.point2 + point)
+
+	def __mul__(self, number):
+		return LineArray(self.point1*number, self.point2*number)
+
+	def __sub__(self, point: 'Point | PointArray'):
+		return self.__add__(point.__mul__(-1))
+
+	def __truediv__(self, number):
+		return self.__mul__(1/number)
+
+	def __len__(self):
+		return len(self.point1)
+
+	def __getitem__(self, index):
+		point1 = self.point1[index]
+		point2 = self.point2[index]
+		if isinstance(point1, Point):
+			return Line(point1, point2)
+
+		return LineArray(point1, point2)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def __str__(self):
+		return f"LineArray{self.get_shape()}"
+
+	def __repr__(self):
+		return f"LineArray[{self.point1!r}, {self.point2!r}]"
+
+
+class CircleArray:
+	'''
+	CircleArray - class to work with arrays of circles in 2d space, stored as structure of arrays
+	Containing parameters: 
+	- 'center': central points of circles in 2d space (PointArray)
+	- 'radius': radiuses of the circles (numpy array)
+	'''
+
+	__slots__ = ("center", "radius")
+
+	#Initializer
+	def __init__(self, center: PointArray = None, radius = ()):
+		self.center = center if isinstance(center, PointArray) else PointArray()
+		self.radius = np.broadcast_to(np.asarray(radius, dtype=float), self.center.get_shape()).copy()
+
+	@staticmethod
+	def from_circles(circles: list[Circle]):
+		'''Generate array of circles from list of circles'''
+		return CircleArray(
+			PointArray.from_points([circle.center for circle in circles]), 
+			[circle.radius for circle in circles]
+		)
+
+	#Converters
+
+	def to_circles(self):
+		'''Function to convert array to flat list of circles'''
+		return [Circle(center, radius) for center, radius in zip(self.center.to_points(), self.radius.ravel().tolist())]
+
+	#Getters
+
+	def get_shape(self):
+		return self.center.get_shape()
+
+	def get_center(self):
+		'''Function to get center points of the circles'''
+		return self.center
+
+	def get_radius(self):
+		'''Function to get radiuses of the circles'''
+		return self.radius
+
+	def scale(self, scale_factor = 1):
+		self.radius *= scale_factor
+
+	def get_boundary_box(self, scale_factor = 1):
+		'''Function to get bottom left and top right points of the box for each circle'''
+		delta = self.radius*scale_factor
+		return PointArray(self.center.x - delta, self.center.y - delta), PointArray(self.center.x + delta, self.center.y + delta)
+
+	#Other classic methods
+
+	def __add__(self, point: 'Point | PointArray'):
+		if not isinstance(point, (Point, PointArray)):
+			point = Point(0, 0)
+
+		return CircleArray(self.center + point, self.radius)
+
+	def __mul__(self, number):
+		return CircleArray(self.center*number, self.radius*number)
+
+	def __sub__(self, point: 'Point | PointArray'):
+		return self.__add__(point.__mul__(-1))
+
+	def __truediv__(self, number):
+		return self.__mul__(1/number)
+
+	def __len__(self):
+		return len(self.center)
+
+	def __getitem__(self, index):
+		center = self.center[index]
+		radius = self.radius[index]
+		if isinstance(center, Point):
+			return Circle(center, float(radius))
+
+		return CircleArray(center, radius)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def __str__(self):
+		return f"CircleArray{self.get_shape()}"
+
+	def __repr__(self):
+		return f"CircleArray[{self.center!r}, {self.radius}]"
+
+
+class AffineTransform:
+	'''
+	AffineTransform - class to work with affine transforms of 2d space: x' = a*x + b*y + tx, y' = c*x + d*y + ty
+	Containing parameters: 
+	- 'a', 'b', 'c', 'd': coefficients of linear part (scaling, flipping and rotation)
+	- 'tx', 'ty': translation
+	By default transform is identity
+	'''
+
+	__slots__ = ("a", "b", "c", "d", "tx", "ty")
+
+	#Initializer
+	def __init__(self, a: float = 1, b: float = 0, c: float = 0, d: float = 1, tx: float = 0, ty: float = 0):
+		self.a = a
+		self.b = b
+		self.c = c
+		self.d = d
+		self.tx = tx
+		self.ty = ty
+
+	@staticmethod
+	def from_translation(point: Point):
+		'''Generate transform, which moves points to the specific offset'''
+		if not isinstance(point, Point):
+			point = Point(0, 0)
+
+		return AffineTransform(tx=point.x, ty=point.y)
+
+	@staticmethod
+	def from_scale(factor_x: float = 1, factor_y: float = None):
+		'''Generate transform, which scales points to the specific factors relatively to coordinate system center (by default - same factor for both axes)'''
+		return AffineTransform(a=factor_x, d=factor_x if factor_y is None else factor_y)
+
+	@staticmethod
+	def from_rotation(angle: float, center: Point = Point(0, 0)):
+		'''Generate transform, which rotates points counterclock-wise by angle in radians around the center'''
+		cos, sin = math.cos(angle), math.sin(angle)
+		rotation = AffineTransform(a=cos, b=-sin, c=sin, d=cos)
+		if center.x == 0 and center.y == 0:
+			return rotation
+
+		return AffineTransform.from_translation(center*-1).compose(rotation).compose(AffineTransform.from_translation(center))
+
+	@staticmethod
+	def from_flip_y():
+		'''Generate transform, which inverts Y axis'''
+		return AffineTransform(d=-1)
+
+	#Getters
+
+	def compose(self, transform: 'AffineTransform'):
+		'''Function to get transform, which applies this transform, and then given transform'''
+		return AffineTransform(
+			transform.a*self.a + transform.b*self.c,
+			transform.a*self.b + transform.b*self.d,
+			transform.c*self.a + transform.d*self.c,
+			transform.c*self.b + transform.d*self.d,
+			transform.a*self.tx + transform.b*self.ty + transform.tx,
+			transform.c*self.tx + transform.d*self.ty + transform.ty,
+		)
+
+	def apply(self, point: Point):
+		'''Function to get transformed point'''
+		return Point(self.a*point.x + self.b*point.y + self.tx, self.c*point.x + self.d*point.y + self.ty)
+
+	def apply_to_array(self, points: PointArray):
+		'''Function to get transformed array of points'''
+		return PointArray(*self.apply_to_coordinates(points.x, points.y))
+
+	def apply_to_coordinates(self, x, y):
+		'''Function to get transformed coordinates, given as numpy arrays. Returns tuple (x, y)'''
+		return self.a*x + self.b*y + self.tx, self.c*x + self.d*y + self.ty
+
+	def is_identity(self):
+		return (self.a, self.b, self.c, self.d, self.tx, self.ty) == (1, 0, 0, 1, 0, 0)
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"AffineTransform([{self.a}, {self.b}, {self.tx}], [{self.c}, {self.d}, {self.ty}])"
+
+	def __repr__(self):
+		return f"AffineTransform{{a={self.a}, b={self.b}, c={self.c}, d={self.d}, tx={self.tx}, ty={self.ty}}}"
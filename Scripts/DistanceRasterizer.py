@@ -0,0 +1,121 @@
+import numpy as np
+from PIL import Image
+
+from . import Instrumentation
+from . import SpatialIndex
+
+class DistanceRasterizer:
+	'''
+	DistanceRasterizer - class to rasterize circles, rings and thick lines by signed distance fields, with antialiasing in one pass
+	Containing parameters:
+	- 'circles': array with rows [x, y, radius, width] in image coordinates, where width is thickness of ring (0 - filled circle)
+	- 'lines': array with rows [x1, y1, x2, y2, width] in image coordinates, lines are drawn as capsules with round ends
+	- 'tile_size': size of square tiles in pixels, each tile is rasterized only with elements intersecting it
+	Pixel with indices (x, y) has center in point (x, y), coverage of pixel is 0.5 minus signed distance to element, limited by [0, 1]
+	Coverage of overlapped elements is maximum of their coverages, so joins of lines have no darker seams
+	'''
+
+	#Maximal count of computed distances at once (elements by pixels)
+	CHUNK_SIZE = 2**20
+
+	#Initializer
+	def __init__(self, circles, lines, tile_size: int = 64):
+		self.circles = np.asarray(circles, dtype=float).reshape(-1, 4)
+		self.lines = np.asarray(lines, dtype=float).reshape(-1, 5)
+		self.tile_size = max(int(tile_size), 1)
+
+		#Both kinds of elements are indexed by one grid with cells of tile size, lines follow circles
+		self.grid = SpatialIndex.UniformGrid(np.concatenate([self.get_circles_boxes(), self.get_lines_boxes()]), self.tile_size)
+
+	#Getters
+
+	def get_circles_boxes(self):
+		'''Function to get boxes [left, top, right, bottom] of pixels covered by circles'''
+		x, y, radius = self.circles[:, 0], self.circles[:, 1], self.circles[:, 2] + 1
+		return np.stack([x - radius, y - radius, x + radius, y + radius], axis=-1)
+
+	def get_lines_boxes(self):
+		'''Function to get boxes [left, top, right, bottom] of pixels covered by lines'''
+		points = self.lines[:, :4]
+		halfwidths = self.lines[:, 4:]/2 + 1
+		return np.concatenate([
+			np.minimum(points[:, :2], points[:, 2:]) - halfwidths,
+			np.maximum(points[:, :2], points[:, 2:]) + halfwidths,
+		], axis=1)
+
+	def get_circles_distances(self, circles, x, y):
+		'''Function to get signed distances (elements by pixels) from pixels with coordinates x, y to circles and rings'''
+		center_distance = np.hypot(x[None] - circles[:, 0, None], y[None] - circles[:, 1, None])
+		radius, width = circles[:, 2, None], circles[:, 3, None]
+
+		#Ring is drawn inside circle, so its middle is at half of the width from the circle
+		ring_distance = np.abs(center_distance - (radius - width/2)) - width/2
+		return np.where(width > 0, ring_distance, center_distance - radius)
+
+	def get_lines_distances(self, lines, x, y):
+		'''Function to get signed distances (elements by pixels) from pixels with coordinates x, y to capsules of lines'''
+		x1, y1 = lines[:, 0, None], lines[:, 1, None]
+		dx, dy = lines[:, 2, None] - x1, lines[:, 3, None] - y1
+		px, py = x[None] - x1, y[None] - y1
+
+		#Projection of pixel to the segment, as factor of the segment from the first point
+		length = dx*dx + dy*dy
+		factor = np.clip((px*dx + py*dy)/np.where(length > 0, length, 1), 0, 1)
+		return np.hypot(px - dx*factor, py - dy*factor) - lines[:, 4, None]/2
+
+	def get_coverage(self, elements, x, y, distances):
+		'''Function to get coverage of pixels with coordinates x, y by union of elements, computed by chunks of elements'''
+		coverage = np.zeros(len(x), dtype=np.float32)
+		step = max(self.CHUNK_SIZE//max(len(x), 1), 1)
+		for start in range(0, len(elements), step):
+			chunk_coverage = np.clip(0.5 - distances(elements[start:start + step], x, y), 0, 1)
+			np.maximum(coverage, chunk_coverage.max(axis=0), out=coverage)
+
+		return coverage
+
+	def get_tile_coverage(self, tile: (int, int, int, int)):
+		'''Function to get array of coverage of pixels of the tile [left, top, right, bottom] in image coordinates, or None if tile is empty'''
+		left, top, right, bottom = tile
+		indices = self.grid.query_box(left, top, right - 1, bottom - 1)
+		if len(indices) == 0:
+			return None
+
+		y, x = np.mgrid[top:bottom, left:right]
+		x, y = x.ravel().astype(np.float32), y.ravel().astype(np.float32)
+
+		#Distances are computed in single precision, which is enough for pixel coordinates
+		count = len(self.circles)
+		circles = self.circles[indices[indices < count]].astype(np.float32)
+		lines = self.lines[indices[indices >= count] - count].astype(np.float32)
+		coverage = np.maximum(
+			self.get_coverage(circles, x, y, self.get_circles_distances),
+			self.get_coverage(lines, x, y, self.get_lines_distances),
+		)
+		return coverage.reshape(bottom - top, right - left)
+
+	@Instrumentation.instrumented("Visualizer.draw")
+	def rasterize(self, size: (int, int), offset: (int, int) = (0, 0)) -> Image:
+		'''Function to rasterize elements to transparent RGBA image of the size, with elements shifted by integer offset'''
+		width, height = size
+		dx, dy = offset
+
+		alpha = np.zeros((height, width), dtype=np.uint8)
+		for top in range(0, height, self.tile_size):
+			for left in range(0, width, self.tile_size):
+				bottom, right = min(top + self.tile_size, height), min(left + self.tile_size, width)
+				coverage = self.get_tile_coverage((left - dx, top - dy, right - dx, bottom - dy))
+				if coverage is not None:
+					alpha[top:bottom, left:right] = np.round(coverage*255)
+
+		#Elements are black, so only alpha channel is filled
+		pixels = np.zeros((height, width, 4), dtype=np.uint8)
+		pixels[:, :, 3] = alpha
+		return Image.fromarray(pixels)
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"DistanceRasterizer: Circles - '{len(self.circles)}', Lines - '{len(self.lines)}', Tile size - '{self.tile_size}'"
+
+	def __repr__(self):
+		return f"DistanceRasterizer{{circles={len(self.circles)}, lines={len(self.lines)}, tile_size={self.tile_size}}}"
@@ -1,3 +1,5 @@
+import numpy as np
+
 from . import BasicElements
 
 class Intersection:
@@ -8,8 +10,8 @@ class Intersection:
 	@staticmethod
 	def intersect_line_line(line1: BasicElements.Line, line2: BasicElements.Line):
 		'''Function to get intersection point of the lines, or detect there is no intersection, or say they are equal'''
-		A1, B1, C1 = line1.get_equation().get_coefficients()
-		A2, B2, C2 = line2.get_equation().get_coefficients()
+		A1, B1, C1 = line1.get_coefficients()
+		A2, B2, C2 = line2.get_coefficients()
 
 		if A1 == A2 and B1 == B2 and C1 == C2:
 			#If coefficients are equal, then this lines are the same
@@ -32,8 +34,8 @@ class Intersection:
 	@staticmethod
 	def intersect_line_circle(line: BasicElements.Line, circle: BasicElements.Circle):
 		'''Function to get intersection points of the line and circle, or detect there is no intersection'''
-		A1, B1, C1 = circle.get_equation().get_coefficients()
-		A2, B2, C2 = line.get_equation().get_coefficients()
+		A1, B1, C1 = circle.get_coefficients()
+		A2, B2, C2 = line.get_coefficients()
 
 		#Solving system of (x, y): {x**2 + y**2 + A1x + B1y + C1 = 0, A2x + B2y + C2 = 0}
 
@@ -93,4 +95,270 @@ class Intersection:
 
 	@staticmethod
 	def intersect_circle_circle(circle1: BasicElements.Circle, circle2: BasicElements.Circle):
-		pass
\ No newline at end of file
+		'''Function to get intersection points of the circles, or detect there is no intersection, or say they are equal'''
+		delta = circle2.center - circle1.center
+		distance = circle1.center.get_distance(circle2.center)
+		r1, r2 = circle1.radius, circle2.radius
+
+		if distance == 0:
+			#Concentric circles are the same with equal radiuses, or don't intersect
+			return True if r1 == r2 else None
+
+		if distance > r1 + r2 or distance < abs(r1 - r2):
+			#Circles are too far from each other, or one circle is inside other
+			return None
+
+		#Distance from first center to the chord of intersection points, and half of the chord
+		a = (r1**2 - r2**2 + distance**2)/(2*distance)
+		h = max(r1**2 - a**2, 0)**(1/2)
+		base = circle1.center + delta*(a/distance)
+
+		if h == 0:
+			return [base]
+
+		normal = BasicElements.Point(-delta.y, delta.x)*(h/distance)
+		return [base - normal, base + normal]
+
+	@staticmethod
+	def get_cells_ranges(lower, upper, origin: tuple, cell_size: float):
+		'''Function to get ranges of indices of grid cells (first, last) along one axis, covering intervals from lower to upper coordinates'''
+		#Small margin keeps points on cells borders in cells of both sides
+		margin = 1e-9
+		first = np.floor((lower - origin)/cell_size - margin).astype(np.int64)
+		last = np.floor((upper - origin)/cell_size + margin).astype(np.int64)
+		return first, last
+
+	@staticmethod
+	def expand_ranges(first, last):
+		'''Function to expand ranges [first, last] to tuple (indices of ranges, values), with one item for each value of each range'''
+		counts = np.maximum(last - first + 1, 0)
+		indices = np.repeat(np.arange(len(first)), counts)
+		return indices, first[indices] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+	@staticmethod
+	def get_lines_cells(lines: BasicElements.LineArray, origin: tuple, cell_size: float, margin = 0):
+		'''
+		Function to get cells of uniform grid crossed by line sectors, as tuple of arrays (lines indices, columns, rows)
+		For each column of cells crossed by line sector, cells are taken from part of the sector inside the column
+		With positive margin (number or array for each line) cells of all points not farther than margin by each axis are taken
+		'''
+		lower, upper = lines.get_boundary_box()
+		margin = np.broadcast_to(np.asarray(margin, dtype=float), lower.x.shape)
+		indices, columns = Intersection.expand_ranges(*Intersection.get_cells_ranges(lower.x - margin, upper.x + margin, origin[0], cell_size))
+
+		x1, y1, x2, y2 = lines.point1.x[indices], lines.point1.y[indices], lines.point2.x[indices], lines.point2.y[indices]
+		margin = margin[indices]
+		left = np.clip(origin[0] + columns*cell_size - margin, lower.x[indices], upper.x[indices])
+		right = np.clip(origin[0] + (columns + 1)*cell_size + margin, lower.x[indices], upper.x[indices])
+
+		#Vertical sectors are inside one column with all their points
+		vertical = x1 == x2
+		slope = (y2 - y1)/np.where(vertical, 1, x2 - x1)
+		y_left = np.where(vertical, y1, y1 + (left - x1)*slope)
+		y_right = np.where(vertical, y2, y1 + (right - x1)*slope)
+
+		first, last = Intersection.get_cells_ranges(np.minimum(y_left, y_right) - margin, np.maximum(y_left, y_right) + margin, origin[1], cell_size)
+		cells, rows = Intersection.expand_ranges(first, last)
+		return indices[cells], columns[cells], rows
+
+	@staticmethod
+	def get_circles_cells(circles: BasicElements.CircleArray, origin: tuple, cell_size: float):
+		'''Function to get cells of uniform grid covered by boxes of circles, as tuple of arrays (circles indices, columns, rows)'''
+		lower, upper = circles.get_boundary_box()
+		indices, columns = Intersection.expand_ranges(*Intersection.get_cells_ranges(lower.x, upper.x, origin[0], cell_size))
+		first, last = Intersection.get_cells_ranges(lower.y[indices], upper.y[indices], origin[1], cell_size)
+		cells, rows = Intersection.expand_ranges(first, last)
+		return indices[cells], columns[cells], rows
+
+	@staticmethod
+	def get_candidate_pairs(lines: BasicElements.LineArray, circles: BasicElements.CircleArray, cell_size: float = None):
+		'''
+		Function to get array of unique pairs [i, j] (i < j) of elements, which are in common cells of uniform grid
+		Elements are indexed as lines, and then circles. Line sectors are stored only in cells they cross, circles - in cells of their boxes
+		'''
+		line_lower, line_upper = lines.get_boundary_box()
+		circle_lower, circle_upper = circles.get_boundary_box()
+		xmin = np.concatenate([line_lower.x, circle_lower.x])
+		ymin = np.concatenate([line_lower.y, circle_lower.y])
+		xmax = np.concatenate([line_upper.x, circle_upper.x])
+		ymax = np.concatenate([line_upper.y, circle_upper.y])
+		count = len(xmin)
+		if count == 0:
+			return np.zeros((0, 2), dtype=np.int64)
+
+		#By default there is about one element per cell
+		origin = (float(xmin.min()), float(ymin.min()))
+		if not cell_size:
+			area = (float(xmax.max()) - origin[0])*(float(ymax.max()) - origin[1])
+			cell_size = (area/count)**(1/2) or 1.0
+
+		line_cells = Intersection.get_lines_cells(lines, origin, cell_size)
+		circle_cells = Intersection.get_circles_cells(circles, origin, cell_size)
+		elements = np.concatenate([line_cells[0], circle_cells[0] + len(lines)])
+		columns = np.concatenate([line_cells[1], circle_cells[1]])
+		rows = np.concatenate([line_cells[2], circle_cells[2]])
+
+		#Cells are sorted by keys, then all pairs of elements in each cell are generated
+		keys = (rows - rows.min())*(columns.max() - columns.min() + 1) + (columns - columns.min())
+		order = np.argsort(keys, kind="stable")
+		keys, elements = keys[order], elements[order]
+		ends = np.searchsorted(keys, keys, side="right")
+		first, local = Intersection.expand_ranges(np.arange(len(keys)) + 1, ends - 1)
+
+		i, j = elements[first], local
+		i, j = np.minimum(i, elements[j]), np.maximum(i, elements[j])
+		codes = np.unique(i[i != j]*count + j[i != j])
+		return np.stack([codes//count, codes%count], axis=-1).reshape(-1, 2)
+
+	@staticmethod
+	def intersect_segments_arrays(lines: BasicElements.LineArray, pairs, tolerance: float = 1e-9, endpoints: bool = True):
+		'''
+		Function to get intersection points of line sectors by pairs of indices [i, j], as tuple (pairs, points)
+		Parallel and collinear sectors have no intersection points
+		'''
+		pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+		x1, y1 = lines.point1.x[pairs[:, 0]], lines.point1.y[pairs[:, 0]]
+		x2, y2 = lines.point1.x[pairs[:, 1]], lines.point1.y[pairs[:, 1]]
+		rx, ry = lines.point2.x[pairs[:, 0]] - x1, lines.point2.y[pairs[:, 0]] - y1
+		sx, sy = lines.point2.x[pairs[:, 1]] - x2, lines.point2.y[pairs[:, 1]] - y2
+
+		#Parameters of intersection point on both sectors from cross products
+		denominator = rx*sy - ry*sx
+		nonparallel = denominator != 0
+		denominator = np.where(nonparallel, denominator, 1)
+		t = ((x2 - x1)*sy - (y2 - y1)*sx)/denominator
+		u = ((x2 - x1)*ry - (y2 - y1)*rx)/denominator
+
+		found = nonparallel & (t >= -tolerance) & (t <= 1 + tolerance) & (u >= -tolerance) & (u <= 1 + tolerance)
+		if not endpoints:
+			#Touches at boundary points of any sector are excluded
+			inner = lambda factor: (factor > tolerance) & (factor < 1 - tolerance)
+			found &= inner(t) & inner(u)
+
+		return pairs[found], BasicElements.PointArray(x1[found] + rx[found]*t[found], y1[found] + ry[found]*t[found])
+
+	@staticmethod
+	def intersect_segments_circles_arrays(lines: BasicElements.LineArray, circles: BasicElements.CircleArray, pairs, tolerance: float = 1e-9):
+		'''
+		Function to get intersection points of line sectors and circles boundaries by pairs of indices [line, circle], as tuple (pairs, points)
+		Line sector tangent to circle has one intersection point
+		'''
+		pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+		x, y = lines.point1.x[pairs[:, 0]], lines.point1.y[pairs[:, 0]]
+		dx, dy = lines.point2.x[pairs[:, 0]] - x, lines.point2.y[pairs[:, 0]] - y
+		px, py = x - circles.center.x[pairs[:, 1]], y - circles.center.y[pairs[:, 1]]
+
+		#Quadratic equation of parameter of points on sector: |p + t*d - center|^2 = radius^2
+		A = dx**2 + dy**2
+		B = 2*(px*dx + py*dy)
+		C = px**2 + py**2 - circles.radius[pairs[:, 1]]**2
+		D = B**2 - 4*A*C
+		valid = (A > 0) & (D >= 0)
+		A, rD = np.where(valid, A, 1), np.sqrt(np.where(valid, D, 0))
+
+		found_pairs, found_x, found_y = [], [], []
+		for sign in [-1, 1]:
+			t = (-B + sign*rD)/(2*A)
+			found = valid & (t >= -tolerance) & (t <= 1 + tolerance) & ((sign < 0) | (D > 0))
+			found_pairs.append(pairs[found])
+			found_x.append(x[found] + dx[found]*t[found])
+			found_y.append(y[found] + dy[found]*t[found])
+
+		return np.concatenate(found_pairs), BasicElements.PointArray(np.concatenate(found_x), np.concatenate(found_y))
+
+	@staticmethod
+	def intersect_circles_arrays(circles: BasicElements.CircleArray, pairs):
+		'''
+		Function to get intersection points of circles boundaries by pairs of indices [i, j], as tuple (pairs, points)
+		Tangent circles have one intersection point, equal circles have no intersection points
+		'''
+		pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+		x1, y1, r1 = circles.center.x[pairs[:, 0]], circles.center.y[pairs[:, 0]], circles.radius[pairs[:, 0]]
+		dx, dy, r2 = circles.center.x[pairs[:, 1]] - x1, circles.center.y[pairs[:, 1]] - y1, circles.radius[pairs[:, 1]]
+		distance = np.hypot(dx, dy)
+
+		valid = (distance > 0) & (distance <= r1 + r2) & (distance >= np.abs(r1 - r2))
+		distance = np.where(valid, distance, 1)
+		a = (r1**2 - r2**2 + distance**2)/(2*distance)
+		h = np.sqrt(np.maximum(r1**2 - a**2, 0))
+
+		found_pairs, found_x, found_y = [], [], []
+		for sign in [-1, 1]:
+			found = valid & ((sign < 0) | (h > 0))
+			factor, normal = a[found]/distance[found], sign*h[found]/distance[found]
+			found_pairs.append(pairs[found])
+			found_x.append(x1[found] + dx[found]*factor - dy[found]*normal)
+			found_y.append(y1[found] + dy[found]*factor + dx[found]*normal)
+
+		return np.concatenate(found_pairs), BasicElements.PointArray(np.concatenate(found_x), np.concatenate(found_y))
+
+	@staticmethod
+	def intersect_all(lines, circles, cell_size: float = None, tolerance: float = 1e-9, endpoints: bool = True):
+		'''
+		Function to get all intersections between line sectors and circles boundaries
+		- 'lines': BasicElements.LineArray or list of lines
+		- 'circles': BasicElements.CircleArray or list of circles
+		- 'cell_size': size of cell of uniform grid for search of candidate pairs (by default - about one element per cell)
+		- 'tolerance': tolerance of parameters of points on line sectors, so touches of sectors boundaries are found
+		- 'endpoints': if False, intersections of line sectors at their boundary points are excluded (for example, connected lines)
+		Returns BatchIntersections, where indices of elements are indices in 'lines' and 'circles'
+		'''
+		if not isinstance(lines, BasicElements.LineArray):
+			lines = BasicElements.LineArray.from_lines(list(lines))
+		if not isinstance(circles, BasicElements.CircleArray):
+			circles = BasicElements.CircleArray.from_circles(list(circles))
+
+		lines = BasicElements.LineArray(lines.point1.reshape(-1), lines.point2.reshape(-1))
+		circles = BasicElements.CircleArray(circles.center.reshape(-1), circles.radius.reshape(-1))
+
+		#Elements are indexed as lines, and then circles
+		pairs = Intersection.get_candidate_pairs(lines, circles, cell_size)
+		count = len(lines)
+		is_line = pairs < count
+		line_line = pairs[is_line.all(axis=1)]
+		line_circle = pairs[is_line[:, 0] & ~is_line[:, 1]] - [0, count]
+		circle_circle = pairs[~is_line.any(axis=1)] - count
+
+		return BatchIntersections(
+			Intersection.intersect_segments_arrays(lines, line_line, tolerance, endpoints),
+			Intersection.intersect_segments_circles_arrays(lines, circles, line_circle, tolerance),
+			Intersection.intersect_circles_arrays(circles, circle_circle),
+		)
+
+
+class BatchIntersections:
+	'''
+	BatchIntersections - class with all intersections between arrays of line sectors and circles
+	Containing parameters (tuples (pairs, points), where 'pairs' is array of indices of elements, and 'points' is PointArray of intersection points):
+	- 'line_line': intersections of line sectors, pairs [line, line]
+	- 'line_circle': intersections of line sectors and circles boundaries, pairs [line, circle]
+	- 'circle_circle': intersections of circles boundaries, pairs [circle, circle]
+	Pair of elements is repeated for each of their intersection points
+	'''
+
+	__slots__ = ("line_line", "line_circle", "circle_circle")
+
+	#Initializer
+	def __init__(self, line_line: tuple, line_circle: tuple, circle_circle: tuple):
+		self.line_line = line_line
+		self.line_circle = line_circle
+		self.circle_circle = circle_circle
+
+	#Getters
+
+	def get_counts(self):
+		'''Function to get counts of intersection points as tuple (line_line, line_circle, circle_circle)'''
+		return len(self.line_line[0]), len(self.line_circle[0]), len(self.circle_circle[0])
+
+	#Other classic methods
+
+	def __len__(self):
+		return sum(self.get_counts())
+
+	def __str__(self):
+		line_line, line_circle, circle_circle = self.get_counts()
+		return f"BatchIntersections: Line-line - '{line_line}', Line-circle - '{line_circle}', Circle-circle - '{circle_circle}'"
+
+	def __repr__(self):
+		line_line, line_circle, circle_circle = self.get_counts()
+		return f"BatchIntersections{{line_line={line_line}, line_circle={line_circle}, circle_circle={circle_circle}}}"
\ No newline at end of file
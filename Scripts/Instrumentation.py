@@ -0,0 +1,272 @@
+"""
+Module for instrumentation of named stages of generation and rendering
+Records wall time, calls, element counts and optionally tracemalloc deltas of stages, while Recorder is active
+When there is no active Recorder, instrumented functions are called directly
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+#Active recorder, or None if instrumentation is disabled
+RECORDER = None
+
+class StageRecord:
+	'''
+	StageRecord - class with information about one call of named stage
+	Containing parameters:
+	- 'name': name of the stage
+	- 'start': start time in seconds from recorder start
+	- 'duration': wall time in seconds
+	- 'elements': count of processed elements (or None, if unknown)
+	- 'memory': delta of traced memory in bytes (or None, if memory isn't traced)
+	- 'pid', 'tid': process and thread identifiers
+	'''
+
+	__slots__ = ("name", "start", "duration", "elements", "memory", "pid", "tid")
+
+	#Initializer
+	def __init__(self, name: str, start: float, duration: float, elements: int = None, memory: int = None):
+		self.name = name
+		self.start = start
+		self.duration = duration
+		self.elements = elements
+		self.memory = memory
+		self.pid = os.getpid()
+		self.tid = threading.get_ident()
+
+	#Converters
+
+	def to_dict(self):
+		return {
+			"name": self.name,
+			"start": self.start,
+			"duration": self.duration,
+			"elements": self.elements,
+			"memory": self.memory,
+			"pid": self.pid,
+			"tid": self.tid,
+		}
+
+	def to_trace_event(self):
+		'''Function to convert record to Chrome trace event of complete type'''
+		event = {
+			"name": self.name,
+			"ph": "X",
+			"ts": self.start*1e6,
+			"dur": self.duration*1e6,
+			"pid": self.pid,
+			"tid": self.tid,
+			"args": {},
+		}
+		if self.elements is not None:
+			event["args"]["elements"] = self.elements
+		if self.memory is not None:
+			event["args"]["memory"] = self.memory
+
+		return event
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"StageRecord: Name - '{self.name}', Duration - '{self.duration:.6f}', Elements - '{self.elements}', Memory - '{self.memory}'"
+
+	def __repr__(self):
+		return f"StageRecord{self.to_dict()}"
+
+
+class Recorder:
+	'''
+	Recorder - context manager, which records stages while it's active
+	Containing parameters:
+	- 'trace_memory': if True, tracemalloc is started and deltas of traced memory are recorded for stages
+	- 'records': list of recorded stages [StageRecord]
+	Usage:
+		with Instrumentation.Recorder() as recorder:
+			...
+		recorder.export_json_lines("stages.jsonl")
+	'''
+
+	#Initializer
+	def __init__(self, trace_memory: bool = False):
+		self.trace_memory = trace_memory
+		self.records = []
+		self.origin = time.perf_counter()
+		self.previous = None
+		self.started_tracemalloc = False
+
+	#Setters
+
+	def add(self, record: StageRecord):
+		self.records.append(record)
+
+	def clear(self):
+		self.records = []
+
+	#Getters
+
+	def get_time(self):
+		'''Function to get time in seconds from recorder creation'''
+		return time.perf_counter() - self.origin
+
+	def get_summary(self):
+		'''Function to get statistics by stage name: {name: {"calls", "duration", "elements", "memory"}, ...}'''
+		summary = {}
+		for record in self.records:
+			stage = summary.setdefault(record.name, {"calls": 0, "duration": 0.0, "elements": 0, "memory": 0})
+			stage["calls"] += 1
+			stage["duration"] += record.duration
+			stage["elements"] += record.elements or 0
+			stage["memory"] += record.memory or 0
+
+		return summary
+
+	#Exporters
+
+	def export_json_lines(self, file):
+		'''Function to write records as JSON lines to file name or text file-like object'''
+		lines = "".join(json.dumps(record.to_dict()) + "\n" for record in self.records)
+		if isinstance(file, (str, os.PathLike)):
+			with open(file, "a") as output:
+				output.write(lines)
+		else:
+			file.write(lines)
+
+	def export_chrome_trace(self, file):
+		'''Function to write records in Chrome trace event format to file name or text file-like object'''
+		trace = {"traceEvents": [record.to_trace_event() for record in self.records], "displayTimeUnit": "ms"}
+		if isinstance(file, (str, os.PathLike)):
+			with open(file, "w") as output:
+				json.dump(trace, output)
+		else:
+			json.dump(trace, file)
+
+	#Other classic methods
+
+	def __enter__(self):
+		global RECORDER
+		self.previous = RECORDER
+		RECORDER = self
+
+		if self.trace_memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.started_tracemalloc = True
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		global RECORDER
+		RECORDER = self.previous
+
+		if self.started_tracemalloc:
+			tracemalloc.stop()
+			self.started_tracemalloc = False
+
+	def __str__(self):
+		lines = [f"Recorder: Records - '{len(self.records)}'"]
+		for name, stage in sorted(self.get_summary().items(), key=lambda item: -item[1]["duration"]):
+			lines.append(f"\t{name}: \t{stage['calls']} calls, {stage['duration']*1000:.3f} ms, {stage['elements']} elements")
+
+		return "\n".join(lines)
+
+	def __repr__(self):
+		return f"Recorder{{records={len(self.records)}, trace_memory={self.trace_memory}}}"
+
+
+class Stage:
+	'''
+	Stage - context manager, which measures one call of named stage and adds record to recorder
+	Containing parameters:
+	- 'recorder': active recorder [Recorder]
+	- 'name': name of the stage
+	- 'elements': count of processed elements (can be set inside stage by 'set_elements')
+	'''
+
+	__slots__ = ("recorder", "name", "elements", "start", "memory")
+
+	#Initializer
+	def __init__(self, recorder: Recorder, name: str, elements: int = None):
+		self.recorder = recorder
+		self.name = name
+		self.elements = elements
+
+	#Setters
+
+	def set_elements(self, elements: int):
+		self.elements = elements
+
+	#Other classic methods
+
+	def __enter__(self):
+		self.memory = tracemalloc.get_traced_memory()[0] if self.recorder.trace_memory else None
+		self.start = self.recorder.get_time()
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		duration = self.recorder.get_time() - self.start
+		memory = None
+		if self.memory is not None:
+			memory = tracemalloc.get_traced_memory()[0] - self.memory
+
+		self.recorder.add(StageRecord(self.name, self.start, duration, self.elements, memory))
+
+
+class DisabledStage:
+	'''DisabledStage - context manager, which does nothing, used when there is no active recorder'''
+
+	__slots__ = ()
+
+	def set_elements(self, elements: int):
+		pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		pass
+
+DISABLED_STAGE = DisabledStage()
+
+def stage(name: str, elements: int = None):
+	'''
+	Function to get context manager, measuring named stage inside 'with' block
+	Returns shared context manager, which does nothing, if there is no active recorder
+	'''
+	if RECORDER is None:
+		return DISABLED_STAGE
+
+	return Stage(RECORDER, name, elements)
+
+def count_elements(result):
+	'''Function to get count of elements in result of stage: length of list, or sum of lengths of lists of lists (or tuple of lists)'''
+	if isinstance(result, tuple) and result and all(isinstance(items, list) for items in result):
+		return sum(len(items) for items in result)
+
+	if isinstance(result, list):
+		if result and isinstance(result[0], list):
+			return sum(len(items) for items in result)
+
+		return len(result)
+
+	return None
+
+def instrumented(name: str):
+	'''Decorator to measure every call of function as named stage, with count of elements in returned list'''
+	def decorator(function):
+		@functools.wraps(function)
+		def wrapper(*arguments, **keywords):
+			if RECORDER is None:
+				return function(*arguments, **keywords)
+
+			with Stage(RECORDER, name) as measured:
+				result = function(*arguments, **keywords)
+				measured.set_elements(count_elements(result))
+
+			return result
+
+		return wrapper
+
+	return decorator
@@ -0,0 +1,145 @@
+"""
+Module for saving map information to versioned binary files, and loading it back
+File contains packed arrays of each layer of MapInfo (see 'MapInfo.pack') and tables of distinct line and circle parameters
+Loader maps file to memory, so layers are exposed as arrays over file pages without copying, and elements are created on first access
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from . import Abstracts
+from . import MapGenerator
+
+MAGIC = b"RMAP"
+VERSION = 1
+
+#Magic, version, flags, length of JSON header, offset of data
+HEADER = struct.Struct("<4sHHII")
+
+#Data blocks are aligned, so arrays can be viewed directly from mapped file
+ALIGNMENT = 8
+
+COORDINATES_TYPE = np.dtype("<f8")
+CLASSES_TYPE = np.dtype("<i4")
+FIXED_TYPE = np.dtype("u1")
+
+def get_aligned(offset: int):
+	return (offset + ALIGNMENT - 1)//ALIGNMENT*ALIGNMENT
+
+def get_archive_bytes(map_info: MapGenerator.MapInfo):
+	'''Function to get binary representation of map information'''
+	packed = map_info.pack()
+
+	blocks = []
+	offset = 0
+	def add_block(array, dtype):
+		nonlocal offset
+		offset = get_aligned(offset)
+		data = np.ascontiguousarray(array, dtype=dtype).tobytes()
+		blocks.append((offset, data))
+		block_offset = offset
+		offset += len(data)
+		return block_offset
+
+	layers = {}
+	for name in MapGenerator.MapInfo.LINE_LAYERS:
+		coordinates, classes = packed["layers"][name]
+		layers[name] = {
+			"count": len(coordinates),
+			"coordinates": add_block(coordinates, COORDINATES_TYPE),
+			"classes": add_block(classes, CLASSES_TYPE),
+		}
+
+	for name in MapGenerator.MapInfo.CIRCLE_LAYERS:
+		coordinates, fixed, classes = packed["layers"][name]
+		layers[name] = {
+			"count": len(coordinates),
+			"coordinates": add_block(coordinates, COORDINATES_TYPE),
+			"fixed": add_block(fixed, FIXED_TYPE),
+			"classes": add_block(classes, CLASSES_TYPE),
+		}
+
+	header = json.dumps({
+		"lineclasses": [[lineclass.thickness, lineclass.length, lineclass.distance] for lineclass in packed["lineclasses"]],
+		"circleclasses": [[circleclass.radius, circleclass.thickness] for circleclass in packed["circleclasses"]],
+		"layers": layers,
+	}).encode()
+
+	data_offset = get_aligned(HEADER.size + len(header))
+	archive = bytearray(data_offset + offset)
+	archive[:HEADER.size] = HEADER.pack(MAGIC, VERSION, 0, len(header), data_offset)
+	archive[HEADER.size:HEADER.size + len(header)] = header
+	for block_offset, data in blocks:
+		archive[data_offset + block_offset:data_offset + block_offset + len(data)] = data
+
+	return bytes(archive)
+
+def save_map_info(map_info: MapGenerator.MapInfo, file):
+	'''Function to save map information to file by name, or to binary file-like object'''
+	archive = get_archive_bytes(map_info)
+	if isinstance(file, (str, os.PathLike)):
+		with open(file, "wb") as output:
+			output.write(archive)
+	else:
+		file.write(archive)
+
+def load_map_info(file, use_mmap: bool = True) -> MapGenerator.MapInfo:
+	'''
+	Function to load map information from file by name, or from bytes-like object
+	With 'use_mmap' file is mapped to memory, and layers arrays are views of mapped file (read-only), otherwise file is read to memory
+	'''
+	if isinstance(file, (str, os.PathLike)):
+		with open(file, "rb") as source:
+			if use_mmap and os.fstat(source.fileno()).st_size > 0:
+				buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+			else:
+				buffer = source.read()
+	else:
+		buffer = file
+
+	return load_map_info_from_buffer(buffer)
+
+def load_map_info_from_buffer(buffer) -> MapGenerator.MapInfo:
+	'''Function to create map information with layers arrays viewing buffer with binary representation'''
+	view = memoryview(buffer)
+	if len(view) < HEADER.size:
+		raise ValueError(f"Map archive is too short: {len(view)} bytes")
+
+	magic, version, _, header_length, data_offset = HEADER.unpack_from(view)
+	if magic != MAGIC:
+		raise ValueError(f"Unknown map archive signature {magic!r}, expected {MAGIC!r}")
+
+	if version > VERSION:
+		raise ValueError(f"Unsupported map archive version {version}, supported versions: 1-{VERSION}")
+
+	header = json.loads(bytes(view[HEADER.size:HEADER.size + header_length]))
+
+	def get_block(offset: int, count: int, dtype, columns: int = None):
+		array = np.frombuffer(buffer, dtype=dtype, count=count*(columns or 1), offset=data_offset + offset)
+		return array.reshape(count, columns) if columns else array
+
+	layers = {}
+	for name in MapGenerator.MapInfo.LINE_LAYERS:
+		layer = header["layers"][name]
+		layers[name] = (
+			get_block(layer["coordinates"], layer["count"], COORDINATES_TYPE, 6),
+			get_block(layer["classes"], layer["count"], CLASSES_TYPE),
+		)
+
+	for name in MapGenerator.MapInfo.CIRCLE_LAYERS:
+		layer = header["layers"][name]
+		layers[name] = (
+			get_block(layer["coordinates"], layer["count"], COORDINATES_TYPE, 3),
+			get_block(layer["fixed"], layer["count"], FIXED_TYPE).view(bool),
+			get_block(layer["classes"], layer["count"], CLASSES_TYPE),
+		)
+
+	return MapGenerator.MapInfo.unpack({
+		"lineclasses": [Abstracts.AbstractMapLineParameters(*parameters) for parameters in header["lineclasses"]],
+		"circleclasses": [Abstracts.AbstractMapCircleParameters(*parameters) for parameters in header["circleclasses"]],
+		"layers": layers,
+	})
@@ -0,0 +1,199 @@
+"""
+Module for persistent cache of generated maps on disk
+Maps are stored as map archives (see MapArchive) by content-addressed keys, derived from all generator parameters
+Cache is bounded by total size of files, and least recently used maps are evicted first
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+from . import Abstracts
+from . import MapArchive
+from . import MapGenerator
+
+#Version of keys derivation, changed when generated maps for the same parameters can change
+KEY_VERSION = 1
+
+NOISE_PARAMETERS = ["noise_distance", "noise_scale_length"]
+
+class MapCache:
+	'''
+	MapCache - class of on-disk cache of generated maps, keyed by generator parameters
+	Containing parameters:
+	- 'directory': directory of cache files (created if doesn't exist)
+	- 'max_bytes': maximal total size of cached files, least recently used files are evicted after writes (None - unbounded)
+	Noise functions can't be hashed by content, so maps generated with not default noise functions require explicit 'noise_identity':
+	any string, which is the same only for the same noise functions
+	Files are written to temporary files and atomically renamed, so cache can be shared by processes and machines with common directory
+	'''
+
+	EXTENSION = ".rmap"
+
+	#Initializer
+	def __init__(self, directory: str, max_bytes: int = 1024**3):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self.writes = 0
+		self.evictions = 0
+
+		os.makedirs(self.directory, exist_ok=True)
+
+	#Getters
+
+	def get_key(self, parameters: dict, noise_identity: str = None):
+		'''Function to get stable key of generator parameters (dictionary with Generator initializer arguments) and identity of noise functions'''
+		defaults = {
+			name: parameter.default
+			for name, parameter in inspect.signature(MapGenerator.Generator.__init__).parameters.items()
+			if parameter.default is not inspect.Parameter.empty
+		}
+
+		for name in parameters:
+			if name not in defaults:
+				raise ValueError(f"Unknown generator parameter '{name}', available parameters: {list(defaults)}")
+
+		values = {**defaults, **parameters}
+
+		#Default noise functions are identified by name, other functions only by given identity
+		custom_noise = [name for name in NOISE_PARAMETERS if values[name] is not defaults[name]]
+		if custom_noise and noise_identity is None:
+			raise ValueError(f"Generator parameters with custom noise functions {custom_noise} require 'noise_identity' to be cached")
+
+		key = {
+			"version": KEY_VERSION,
+			"archive": MapArchive.VERSION,
+			"backend": values["backend"],
+			"noise": noise_identity if custom_noise else "default",
+		}
+		for name in MapGenerator.Generator.PARAMETERS:
+			if name in NOISE_PARAMETERS:
+				continue
+
+			value = values[name]
+			if name in MapGenerator.Generator.MINIMAL_COUNTS:
+				value = max(int(value), MapGenerator.Generator.MINIMAL_COUNTS[name])
+			elif isinstance(value, (Abstracts.AbstractMapLineParameters, Abstracts.AbstractMapCircleParameters)):
+				value = {"class": type(value).__name__, **vars(value)}
+
+			key[name] = value
+
+		return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+	def get_filename(self, key: str):
+		return os.path.join(self.directory, key[:2], key + self.EXTENSION)
+
+	def get(self, parameters: dict, noise_identity: str = None) -> MapGenerator.MapInfo:
+		'''Function to get cached map information for generator parameters, or None if it isn't cached'''
+		filename = self.get_filename(self.get_key(parameters, noise_identity))
+		try:
+			map_info = MapArchive.load_map_info(filename)
+			os.utime(filename)
+		except (OSError, ValueError):
+			#Missing file, file removed by other process, or damaged file
+			self.misses += 1
+			return None
+
+		self.hits += 1
+		return map_info
+
+	def get_or_generate(self, parameters: dict, noise_identity: str = None) -> MapGenerator.MapInfo:
+		'''Function to get cached map information for generator parameters, generating and caching it on miss'''
+		map_info = self.get(parameters, noise_identity)
+		if map_info is None:
+			map_info = MapGenerator.Generator(**parameters).generate()
+			self.put(parameters, map_info, noise_identity)
+
+		return map_info
+
+	def get_files(self):
+		'''Function to get list of cached files as tuples (last use time, size, filename)'''
+		files = []
+		for root, _, filenames in os.walk(self.directory):
+			for filename in filenames:
+				if not filename.endswith(self.EXTENSION):
+					continue
+
+				path = os.path.join(root, filename)
+				try:
+					status = os.stat(path)
+				except OSError:
+					continue
+
+				files.append((status.st_mtime, status.st_size, path))
+
+		return files
+
+	def get_size(self):
+		'''Function to get total size of cached files in bytes'''
+		return sum(size for _, size, _ in self.get_files())
+
+	def get_statistics(self):
+		return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+	#Setters
+
+	def put(self, parameters: dict, map_info: MapGenerator.MapInfo, noise_identity: str = None):
+		'''Function to store map information generated with parameters, and evict least recently used maps, if cache is too large'''
+		filename = self.get_filename(self.get_key(parameters, noise_identity))
+		os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+		descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+		try:
+			with os.fdopen(descriptor, "wb") as output:
+				MapArchive.save_map_info(map_info, output)
+
+			os.replace(temporary, filename)
+		except BaseException:
+			os.remove(temporary)
+			raise
+
+		self.writes += 1
+		self.evict()
+
+	def evict(self):
+		'''Function to remove least recently used files, until total size is not more than 'max_bytes' '''
+		if self.max_bytes is None:
+			return
+
+		files = sorted(self.get_files())
+		size = sum(size for _, size, _ in files)
+		for _, file_size, path in files:
+			if size <= self.max_bytes:
+				break
+
+			try:
+				os.remove(path)
+			except OSError:
+				#Already removed by other process
+				pass
+			else:
+				self.evictions += 1
+
+			size -= file_size
+
+	def clear(self):
+		'''Function to remove all cached files'''
+		for _, _, path in self.get_files():
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+	def reset_statistics(self):
+		self.hits = 0
+		self.misses = 0
+		self.writes = 0
+		self.evictions = 0
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"MapCache: Directory - '{self.directory}', Hits - '{self.hits}', Misses - '{self.misses}', Writes - '{self.writes}', Evictions - '{self.evictions}'"
+
+	def __repr__(self):
+		return f"MapCache{{directory={self.directory!r}, max_bytes={self.max_bytes}, statistics={self.get_statistics()}}}"
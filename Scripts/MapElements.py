@@ -12,6 +12,8 @@ class MapLine(BasicElements.Line):
 	- 'angle': angle in radians between line and horizontal axis
 	- 'distance': distance between two points
 	'''
+
+	__slots__ = ("lineclass",)
 	
 	DEFAULTS = {
 		"point1": BasicElements.Point(0, 0),
@@ -50,6 +52,31 @@ class MapLine(BasicElements.Line):
 		point2 = point.get_second_point_from_angle_distance(angle, distance)
 		return MapLine(point, point2, lineclass)
 
+	@staticmethod
+	def from_line_array(
+			lines: BasicElements.LineArray,
+			lineclass: Abstracts.AbstractMapLineParameters = DEFAULTS["lineclass"]
+	):
+		'''
+		Generate flat list of map lines from array of lines, reusing angles and distances already computed for whole array:
+		- 'lines' - array of lines [BasicElements.LineArray]
+		- 'lineclass': class of the lines [AbstractMapLineParameters]
+		'''
+		map_lines = []
+		angles = lines.angle.ravel().tolist()
+		distances = lines.distance.ravel().tolist()
+
+		for point1, point2, angle, distance in zip(lines.point1.to_points(), lines.point2.to_points(), angles, distances):
+			line = MapLine.__new__(MapLine)
+			line.point1 = point1
+			line.point2 = point2
+			line.angle = angle
+			line.distance = distance
+			line.lineclass = lineclass
+			map_lines.append(line)
+
+		return map_lines
+
 	#Getters
 
 	def get_parallel_line(self, 
@@ -72,6 +99,10 @@ class MapLine(BasicElements.Line):
 	def get_length(self):
 		return self.lineclass.length
 
+	def get_transformed(self, transform: BasicElements.AffineTransform):
+		'''Function to get line with boundaries transformed by affine transform'''
+		return MapLine(transform.apply(self.point1), transform.apply(self.point2), self.lineclass)
+
 	#Other classic methods
 	def __add__(self, point: BasicElements.Point):
 		if not isinstance(point, BasicElements.Point):
@@ -101,6 +132,8 @@ class MapCircle(BasicElements.Circle):
 	- 'center': central point of circle in 2d space
 	- 'circleclass': abstract class of the map circle [AbstractMapCircleParameters]
 	'''
+
+	__slots__ = ("circleclass", "fixed_radius")
 	
 	DEFAULTS = {
 		"center": BasicElements.Point(0, 0),
@@ -125,6 +158,10 @@ class MapCircle(BasicElements.Circle):
 	def get_thickness(self):
 		return self.circleclass.thickness
 
+	def get_transformed(self, transform: BasicElements.AffineTransform):
+		'''Function to get circle with center transformed by affine transform. Radius isn't transformed, same as for moving and scaling'''
+		return MapCircle(transform.apply(self.center), self.circleclass, self.fixed_radius, self.radius)
+
 	#Other classic methods
 
 	def __add__(self, point: BasicElements.Point):
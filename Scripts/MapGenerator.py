@@ -1,9 +1,25 @@
+import concurrent.futures
+import hashlib
+import json
 import math
+import multiprocessing
+import os
+import pickle
+
+import numpy as np
 
 from . import Abstracts
 from . import BasicElements
 from . import MapElements
 from . import Functions
+from . import Instrumentation
+from . import NumpyGenerator
+from . import RoadGraph
+from . import SpatialIndex
+
+def layer_property(name: str):
+	'''Function to create property, which returns layer by name with 'get_layer' method, and stores assigned layer with 'set_layer' method'''
+	return property(lambda self: self.get_layer(name), lambda self, value: self.set_layer(name, value))
 
 class MapInfo:
 	'''
@@ -17,7 +33,29 @@ class MapInfo:
 	- 'inside_circles': list of inside circles List[MapElements.MapCircle]
 	- 'inside_rings': list of inside rings List[MapElements.MapCircle]
 	- 'connecting_circles': list of connecting circles List[MapElements.MapCircle]
+	MapInfo can also be created from packed arrays (see 'pack' and 'unpack'), then elements of each list are created on first access
+	Spatial index over elements is built on first request by 'get_spatial_index' and reused by later queries
+	Moving, scaling, rotating and flipping return view of source map information with composed affine transform 'transform':
+	transformed elements are created only on iteration or access to their lists, and 'get_line_array'/'get_circle_array' transform whole map at once
 	'''
+
+	LINE_LAYERS = [
+		"outside_lines",
+		"inside_lines",
+		"central_lines",
+		"connecting_lines",
+		"sector_lines",
+	]
+
+	CIRCLE_LAYERS = [
+		"outside_circles",
+		"inside_rings",
+		"inside_circles",
+		"connecting_circles",
+	]
+
+	LAYERS = LINE_LAYERS + CIRCLE_LAYERS
+
 	def __init__(self,
 			outside_lines: list[MapElements.MapLine],
 			inside_lines: list[MapElements.MapLine],
@@ -29,85 +67,375 @@ class MapInfo:
 			inside_circles: list[MapElements.MapCircle],
 			connecting_circles: list[MapElements.MapCircle],
 	):
-		self.outside_lines = outside_lines
-		self.inside_lines = inside_lines
-		self.central_lines = central_lines
-		self.connecting_lines = connecting_lines
-		self.sector_lines = sector_lines
-		self.outside_circles = outside_circles
-		self.inside_rings = inside_rings
-		self.inside_circles = inside_circles
-		self.connecting_circles = connecting_circles
-
-		self.lines = [
-			self.outside_lines, 
-			self.inside_lines, 
-			self.central_lines,
-			self.connecting_lines,
-			self.sector_lines,
-		]
-
-		self.circles = [
-			self.outside_circles, 
-			self.inside_rings,
-			self.inside_circles,
-			self.connecting_circles,
-		]
-
-		self.objects_lists = self.lines+self.circles
+		self.packed = None
+		self.source = None
+		self.transform = BasicElements.AffineTransform()
+		self.spatial_index = None
+		self.layers = {
+			"outside_lines": outside_lines,
+			"inside_lines": inside_lines,
+			"central_lines": central_lines,
+			"connecting_lines": connecting_lines,
+			"sector_lines": sector_lines,
+			"outside_circles": outside_circles,
+			"inside_rings": inside_rings,
+			"inside_circles": inside_circles,
+			"connecting_circles": connecting_circles,
+		}
+
+	#Layers
+
+	outside_lines = layer_property("outside_lines")
+	inside_lines = layer_property("inside_lines")
+	central_lines = layer_property("central_lines")
+	connecting_lines = layer_property("connecting_lines")
+	sector_lines = layer_property("sector_lines")
+	outside_circles = layer_property("outside_circles")
+	inside_rings = layer_property("inside_rings")
+	inside_circles = layer_property("inside_circles")
+	connecting_circles = layer_property("connecting_circles")
+
+	@property
+	def lines(self):
+		return [self.get_layer(name) for name in self.LINE_LAYERS]
+
+	@property
+	def circles(self):
+		return [self.get_layer(name) for name in self.CIRCLE_LAYERS]
+
+	@property
+	def objects_lists(self):
+		return self.lines+self.circles
+
+	def get_layer(self, name: str):
+		'''Function to get list of elements by layer name, creating elements from packed arrays or by transform of source on first access'''
+		if name not in self.layers:
+			if self.source is not None:
+				self.layers[name] = list(self.iterate_layer(name))
+			else:
+				self.layers[name] = self.unpack_layer(name)
 
-	def move(self, offset: BasicElements.Point):
-		'''Function to generate updated MapInfo with moving all elements to the specific offset'''
-		
-		objects_lists = []
-		
-		for objects in self.objects_lists:
-			element_lists = []
-		
-			for element in objects:
-				new_element = element+offset
-				element_lists.append(new_element)
+		return self.layers[name]
 
-			objects_lists.append(element_lists)
+	def set_layer(self, name: str, elements: list):
+		'''Function to replace list of elements of the layer. Spatial index is dropped, because it was built over previous elements'''
+		self.layers[name] = elements
+		self.spatial_index = None
 
-		return MapInfo(*objects_lists)
+	def iterate_layer(self, name: str):
+		'''Function which returns iterator of elements of the layer. Elements of view are transformed one by one, without storing the list'''
+		if name in self.layers or self.source is None:
+			return iter(self.get_layer(name))
 
+		return (element.get_transformed(self.transform) for element in self.source.get_layer(name))
+
+	def get_layer_arrays(self, name: str):
+		'''
+		Function to get coordinates of layer elements as arrays, with transform applied:
+		for lines - tuple (coordinates, lineclasses), where 'coordinates' is array with rows [x1, y1, x2, y2]
+		for circles - tuple (coordinates, fixed, circleclasses), where 'coordinates' is array with rows [x, y, radius], and 'fixed' is array of 'fixed_radius' flags
+		'''
+		if name in self.layers or (self.source is None and self.packed is None):
+			objects = self.get_layer(name)
+			if name in self.LINE_LAYERS:
+				coordinates = np.array([(line.point1.x, line.point1.y, line.point2.x, line.point2.y) for line in objects], dtype=float).reshape(-1, 4)
+				return coordinates, [line.lineclass for line in objects]
+
+			coordinates = np.array([(circle.center.x, circle.center.y, circle.radius) for circle in objects], dtype=float).reshape(-1, 3)
+			fixed = np.array([circle.fixed_radius for circle in objects], dtype=bool)
+			return coordinates, fixed, [circle.circleclass for circle in objects]
+
+		if self.source is None:
+			if name in self.LINE_LAYERS:
+				coordinates, classes = self.packed["layers"][name]
+				lineclasses = self.packed["lineclasses"]
+				return coordinates[:, :4], [lineclasses[index] for index in classes.tolist()]
+
+			coordinates, fixed, classes = self.packed["layers"][name]
+			circleclasses = self.packed["circleclasses"]
+			return coordinates, fixed, [circleclasses[index] for index in classes.tolist()]
+
+		if name in self.LINE_LAYERS:
+			coordinates, lineclasses = self.source.get_layer_arrays(name)
+			x1, y1 = self.transform.apply_to_coordinates(coordinates[:, 0], coordinates[:, 1])
+			x2, y2 = self.transform.apply_to_coordinates(coordinates[:, 2], coordinates[:, 3])
+			return np.stack([x1, y1, x2, y2], axis=-1).reshape(-1, 4), lineclasses
+
+		#Same as for MapCircle, only fixed radius is kept, other circles get radius of their class
+		coordinates, fixed, circleclasses = self.source.get_layer_arrays(name)
+		x, y = self.transform.apply_to_coordinates(coordinates[:, 0], coordinates[:, 1])
+		radius = coordinates[:, 2]
+		radius = np.where(fixed & (radius > 0), radius, np.array([circleclass.radius for circleclass in circleclasses], dtype=float))
+		return np.stack([x, y, radius], axis=-1).reshape(-1, 3), fixed, circleclasses
+
+	def get_line_array(self):
+		'''Function to get all lines (in order of 'get_lines') as tuple (lines, lineclasses), where 'lines' is BasicElements.LineArray'''
+		arrays = [self.get_layer_arrays(name) for name in self.LINE_LAYERS]
+		coordinates = np.concatenate([coordinates for coordinates, _ in arrays])
+		lines = BasicElements.LineArray(
+			BasicElements.PointArray(coordinates[:, 0], coordinates[:, 1]),
+			BasicElements.PointArray(coordinates[:, 2], coordinates[:, 3])
+		)
+		return lines, [lineclass for _, lineclasses in arrays for lineclass in lineclasses]
+
+	def get_circle_array(self):
+		'''Function to get all circles (in order of 'get_circles') as tuple (circles, circleclasses), where 'circles' is BasicElements.CircleArray'''
+		arrays = [self.get_layer_arrays(name) for name in self.CIRCLE_LAYERS]
+		coordinates = np.concatenate([coordinates for coordinates, _, _ in arrays])
+		circles = BasicElements.CircleArray(BasicElements.PointArray(coordinates[:, 0], coordinates[:, 1]), coordinates[:, 2])
+		return circles, [circleclass for _, _, circleclasses in arrays for circleclass in circleclasses]
+
+	def get_digest(self):
+		'''Function to get hexadecimal digest of coordinates and parameters of all elements, which is the same for maps with the same geometry'''
+		digest = hashlib.sha256()
+		classes = {}
+
+		lines, lineclasses = self.get_line_array()
+		circles, circleclasses = self.get_circle_array()
+		for array in [lines.point1.x, lines.point1.y, lines.point2.x, lines.point2.y, circles.center.x, circles.center.y, circles.radius]:
+			#Adding zero replaces negative zeros, so equal coordinates have equal bytes
+			digest.update(np.ascontiguousarray(array + 0.0, dtype="<f8").tobytes())
+
+		#Parameters are digested as table of distinct classes and indices of elements classes
+		for elementclasses in [lineclasses, circleclasses]:
+			indices = [classes.setdefault(id(elementclass), (len(classes), elementclass))[0] for elementclass in elementclasses]
+			digest.update(np.array(indices, dtype="<i4").tobytes())
+
+		table = [{"class": type(elementclass).__name__, **vars(elementclass)} for _, elementclass in classes.values()]
+		digest.update(json.dumps(table, sort_keys=True).encode())
+		return digest.hexdigest()
+
+	def apply_transform(self, transform: BasicElements.AffineTransform):
+		'''Function to generate view of this MapInfo with affine transform applied after current transform. Elements aren't copied'''
+		map_info = MapInfo.__new__(MapInfo)
+		map_info.packed = None
+
+		#View of view refers to the same source with composed transform, unless this view has materialized or reassigned layers
+		if self.source is not None and not self.layers:
+			map_info.source = self.source
+			map_info.transform = self.transform.compose(transform)
+		else:
+			map_info.source = self
+			map_info.transform = transform
+
+		map_info.spatial_index = None
+		map_info.layers = {}
+		return map_info
+
+	@Instrumentation.instrumented("MapInfo.move")
+	def move(self, offset: BasicElements.Point):
+		'''Function to generate updated MapInfo with moving all elements to the specific offset'''
+		return self.apply_transform(BasicElements.AffineTransform.from_translation(offset))
+
+	@Instrumentation.instrumented("MapInfo.scale")
 	def scale(self, factor: float = 1):
 		'''Function to generate updated MapInfo with scaling all elements to the specific factor'''
-		
-		objects_lists = []
-		
-		for objects in self.objects_lists:
-			element_lists = []
-
-			for element in objects:
-				new_element = element*factor
-				element_lists.append(new_element)
+		return self.apply_transform(BasicElements.AffineTransform.from_scale(factor))
 
-			objects_lists.append(element_lists)
+	def rotate(self, angle: float, center: BasicElements.Point = BasicElements.Point(0, 0)):
+		'''Function to generate updated MapInfo with rotating all elements counterclock-wise by angle in radians around the center'''
+		return self.apply_transform(BasicElements.AffineTransform.from_rotation(angle, center))
 
-		return MapInfo(*objects_lists)
+	def flip_y(self):
+		'''Function to generate updated MapInfo with inverted Y axis'''
+		return self.apply_transform(BasicElements.AffineTransform.from_flip_y())
 
 	def get_lines(self):
 		'''Function which returns iterator of all available lines'''
-		for lines in self.lines:
-			for line in lines:
+		for name in self.LINE_LAYERS:
+			for line in self.iterate_layer(name):
 				yield line
 
 	def get_circles(self):
 		'''Function which returns iterator of all available circles'''
-		for circles in self.circles:
-			for circle in circles:
+		for name in self.CIRCLE_LAYERS:
+			for circle in self.iterate_layer(name):
 				yield circle
 
 	def get_boundaries(self):
 		'''Function to get boundary points of the map'''
 		points = []
-		for circle in self.outside_circles:
+		for circle in self.iterate_layer("outside_circles"):
 			points.append(circle.center)
 
 		return points
 
+	def get_spatial_index(self, cell_size: float = None):
+		'''Function to get spatial index over all lines and circles, which is built on first request (or when other cell size is requested)'''
+		if self.spatial_index is None or (cell_size and cell_size != self.spatial_index.grid.cell_size):
+			self.spatial_index = SpatialIndex.SpatialIndex(self, cell_size)
+
+		return self.spatial_index
+
+	def classify_points(self, x, y, cell_size: float = None):
+		'''
+		Function to classify points by arrays of coordinates as outside of the map, inside of the map, on road or inside node
+		Returns tuple (labels, elements), see 'SpatialIndex.MembershipIndex.classify'. For many queries index should be created once
+		'''
+		return SpatialIndex.MembershipIndex(self, cell_size).classify(x, y)
+
+	def get_intersections(self, cell_size: float = None, tolerance: float = 1e-9, endpoints: bool = True):
+		'''
+		Function to get all intersections between lines and circles of the map (see 'Functions.Intersection.intersect_all')
+		Indices of elements are indices in order of 'get_lines' and 'get_circles'. Lines are intersected as sectors without thickness
+		'''
+		lines, _ = self.get_line_array()
+		circles, _ = self.get_circle_array()
+		return Functions.Intersection.intersect_all(lines, circles, cell_size, tolerance, endpoints)
+
+	def get_road_graph(self, tolerance: float = 1e-6):
+		'''
+		Function to get road network graph of the map lines (see 'RoadGraph.RoadGraph.from_map_info')
+		For many queries graph should be created once, because it caches shortest path trees
+		'''
+		return RoadGraph.RoadGraph.from_map_info(self, tolerance)
+
+	def pack(self):
+		'''
+		Function to pack all elements to compact arrays. Returns dictionary with keys:
+		- 'lineclasses', 'circleclasses': lists of distinct parameters of elements
+		- 'layers': dictionary of packed lists of elements by layer name:
+		  for lines - tuple (coordinates, classes), where 'coordinates' is array with rows [x1, y1, x2, y2, angle, distance], and 'classes' is array of indices in 'lineclasses'
+		  for circles - tuple (coordinates, fixed, classes), where 'coordinates' is array with rows [x, y, radius], and 'fixed' is array of 'fixed_radius' flags
+		'''
+		#Stored packed arrays are reused only if no layer was materialized or reassigned, otherwise layers are packed again
+		if self.packed is not None and not self.layers:
+			return self.packed
+
+		lineclasses = {}
+		circleclasses = {}
+		layers = {}
+
+		for name in self.LINE_LAYERS:
+			objects = self.get_layer(name)
+			coordinates = np.array(
+				[(line.point1.x, line.point1.y, line.point2.x, line.point2.y, line.angle, line.distance) for line in objects], 
+				dtype=float
+			).reshape(-1, 6)
+			classes = np.array([lineclasses.setdefault(id(line.lineclass), (len(lineclasses), line.lineclass))[0] for line in objects], dtype=np.int32)
+			layers[name] = (coordinates, classes)
+
+		for name in self.CIRCLE_LAYERS:
+			objects = self.get_layer(name)
+			coordinates = np.array([(circle.center.x, circle.center.y, circle.radius) for circle in objects], dtype=float).reshape(-1, 3)
+			fixed = np.array([circle.fixed_radius for circle in objects], dtype=bool)
+			classes = np.array([circleclasses.setdefault(id(circle.circleclass), (len(circleclasses), circle.circleclass))[0] for circle in objects], dtype=np.int32)
+			layers[name] = (coordinates, fixed, classes)
+
+		return {
+			"lineclasses": [lineclass for _, lineclass in lineclasses.values()],
+			"circleclasses": [circleclass for _, circleclass in circleclasses.values()],
+			"layers": layers,
+		}
+
+	@staticmethod
+	def unpack(packed: dict):
+		'''Function to generate MapInfo from elements packed by MapInfo.pack. Elements are created on first access to their list'''
+		map_info = MapInfo.__new__(MapInfo)
+		map_info.packed = packed
+		map_info.source = None
+		map_info.transform = BasicElements.AffineTransform()
+		map_info.spatial_index = None
+		map_info.layers = {}
+		return map_info
+
+	def unpack_layer(self, name: str):
+		'''Function to create list of elements of the layer from packed arrays'''
+		if name in self.LINE_LAYERS:
+			coordinates, classes = self.packed["layers"][name]
+			lineclasses = self.packed["lineclasses"]
+
+			lines = []
+			for (x1, y1, x2, y2, angle, distance), index in zip(coordinates.tolist(), classes.tolist()):
+				line = MapElements.MapLine.__new__(MapElements.MapLine)
+				line.point1 = BasicElements.Point(x1, y1)
+				line.point2 = BasicElements.Point(x2, y2)
+				line.angle = angle
+				line.distance = distance
+				line.lineclass = lineclasses[index]
+				lines.append(line)
+
+			return lines
+
+		coordinates, fixed, classes = self.packed["layers"][name]
+		circleclasses = self.packed["circleclasses"]
+
+		circles = []
+		for (x, y, radius), fixed_radius, index in zip(coordinates.tolist(), fixed.tolist(), classes.tolist()):
+			circle = MapElements.MapCircle.__new__(MapElements.MapCircle)
+			circle.center = BasicElements.Point(x, y)
+			circle.radius = radius
+			circle.circleclass = circleclasses[index]
+			circle.fixed_radius = fixed_radius
+			circles.append(circle)
+
+		return circles
+
+	#Other classic methods
+
+	def __reduce__(self):
+		'''Pickle map information as packed arrays instead of separate elements, which is much faster to send between processes'''
+		return (MapInfo.unpack, (self.pack(),))
+
+class GeneratorCache:
+	'''
+	GeneratorCache - class to memoize intermediate results of generator by name and arguments
+	Containing parameters:
+	- 'values': memoized values by keys (name, *arguments)
+	- 'hits': count of requests by name, which returned memoized value
+	- 'misses': count of requests by name, which computed value
+	'''
+
+	#Initializer
+	def __init__(self):
+		self.values = {}
+		self.hits = {}
+		self.misses = {}
+
+	#Getters
+
+	def get(self, name: str, function, *arguments):
+		'''Function to get memoized value by name and arguments, or compute it with 'function(*arguments)' on first request'''
+		key = (name, *arguments)
+		if key in self.values:
+			self.hits[name] = self.hits.get(name, 0) + 1
+			return self.values[key]
+
+		self.misses[name] = self.misses.get(name, 0) + 1
+		value = function(*arguments)
+		self.values[key] = value
+		return value
+
+	def get_statistics(self):
+		'''Function to get hits and misses by name: {name: {"hits": int, "misses": int}, ...}'''
+		names = set(self.hits) | set(self.misses)
+		return {name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)} for name in sorted(names)}
+
+	#Setters
+
+	def invalidate(self, names: list[str] = None):
+		'''Function to drop memoized values with specific names (by default - all values)'''
+		if names is None:
+			self.values = {}
+			return
+
+		self.values = {key: value for key, value in self.values.items() if key[0] not in names}
+
+	def reset_statistics(self):
+		self.hits = {}
+		self.misses = {}
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.values)
+
+	def __str__(self):
+		return f"GeneratorCache: Values - '{len(self.values)}', Hits - '{sum(self.hits.values())}', Misses - '{sum(self.misses.values())}'"
+
+	def __repr__(self):
+		return f"GeneratorCache{self.get_statistics()}"
+
 class Generator:
 	'''
 	Generator - class to generate specific map in 2d space
@@ -123,9 +451,70 @@ class Generator:
 	- 'generation_count: count of generations of inside lines
 	- 'noise_distance': function of one integer variable, which generates noise for distance between points
 	- 'noise_scale_length': function of one integer variable, which generates noise for scaling factor of generations
+	- 'backend': engine of generation, 'python' to generate elements one by one, or 'numpy' to generate all generations and subdivisions as batched array operations
+	- 'lazy': if True, layers are generated on first access (or by 'generate'), otherwise all layers are generated on initialization
 	This class generates map with equilateral sides polygon
 	'''
 
+	BACKENDS = ["python", "numpy"]
+
+	PARAMETERS = [
+		"outside_line",
+		"inside_line",
+		"central_line",
+		"connecting_line",
+		"outside_circle",
+		"inside_circle",
+		"inside_rings",
+		"connecting_circle",
+		"sides_count",
+		"rings_count",
+		"sector_subdivisions",
+		"generation_count",
+		"noise_distance",
+		"noise_scale_length",
+	]
+
+	MINIMAL_COUNTS = {
+		"sides_count": 3,
+		"rings_count": 0,
+		"sector_subdivisions": 0,
+		"generation_count": 1,
+	}
+
+	LAYERS = [
+		"outside_lines",
+		"inside_lines",
+		"central_lines",
+		"connecting_lines",
+		"sector_lines",
+		"outside_circles",
+		"inside_circle",
+		"inside_rings",
+		"connecting_circles",
+	]
+
+	#Parameters, which layers and memoized intermediate results (of both backends) depend on
+	DEPENDENCIES = {
+		"pivot_points": ["outside_line", "outside_circle", "sides_count"],
+		"inside_pivot_points": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length"],
+		"connecting_points": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length", "connecting_line"],
+		"pivot_points_array": ["outside_line", "outside_circle", "sides_count"],
+		"outside_lines_array": ["outside_line", "outside_circle", "sides_count"],
+		"inside_lines_array": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length"],
+		"previous_lines_array": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length"],
+		"connecting_points_array": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length", "connecting_line"],
+		"outside_lines": ["outside_line", "outside_circle", "sides_count"],
+		"inside_lines": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length"],
+		"central_lines": ["outside_line", "outside_circle", "sides_count", "central_line"],
+		"connecting_lines": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length", "connecting_line"],
+		"sector_lines": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length", "connecting_line", "sector_subdivisions"],
+		"outside_circles": ["outside_line", "outside_circle", "sides_count"],
+		"inside_circle": ["inside_circle"],
+		"inside_rings": ["inside_rings", "rings_count", "noise_scale_length"],
+		"connecting_circles": ["outside_line", "outside_circle", "sides_count", "inside_line", "generation_count", "noise_distance", "noise_scale_length", "connecting_circle"],
+	}
+
 	def __init__(self,
 			outside_line: Abstracts.AbstractMapLineParameters = Abstracts.AbstractMapLines.DEFAULTS["outside"],
 			inside_line: Abstracts.AbstractMapLineParameters = Abstracts.AbstractMapLines.DEFAULTS["inside"],
@@ -141,6 +530,8 @@ class Generator:
 			generation_count: int = 1,
 			noise_distance=lambda n: n,
 			noise_scale_length=lambda n: n,
+			backend: str = "python",
+			lazy: bool = False,
 	):
 		self.outside_line = outside_line
 		self.inside_line = inside_line
@@ -152,27 +543,161 @@ class Generator:
 		self.inside_rings = inside_rings
 		self.connecting_circle = connecting_circle
 
-		self.sides_count = max(int(sides_count), 3)
-		self.rings_count = max(int(rings_count), 0)
-		self.sector_subdivisions = max(int(sector_subdivisions), 0)
-		self.generation_count = max(int(generation_count), 1)
+		self.sides_count = max(int(sides_count), self.MINIMAL_COUNTS["sides_count"])
+		self.rings_count = max(int(rings_count), self.MINIMAL_COUNTS["rings_count"])
+		self.sector_subdivisions = max(int(sector_subdivisions), self.MINIMAL_COUNTS["sector_subdivisions"])
+		self.generation_count = max(int(generation_count), self.MINIMAL_COUNTS["generation_count"])
 
 		self.noise_distance = noise_distance
 		self.noise_scale_length = noise_scale_length
 
+		if backend not in self.BACKENDS:
+			raise ValueError(f"Unknown generator backend '{backend}', available backends: {self.BACKENDS}")
+
+		self.backend = backend
+		self.engine = None
+		self.lazy = lazy
+
+		#Generated layers, memoized by name, and memoized intermediate results
+		self.layers = {}
+		self.cache = GeneratorCache()
+
 		#Generation
-		self.g_outside_lines = self.generate_outside_lines()
-		self.g_inside_lines = [self.generate_inside_lines(i+1) for i in range(self.generation_count)]
-		self.g_central_lines = self.generate_central_lines()
-		self.g_connecting_lines = [self.generate_connecting_lines(i) for i in range(self.generation_count+1)]
-		self.g_sector_lines = [self.generate_sector_lines(i) for i in range(self.generation_count)]
-		self.g_outside_circles = self.generate_outside_circles()
-		self.g_inside_circle = self.generate_inside_circle()
-		self.g_inside_rings = [self.generate_inside_ring(i+1) for i in range(self.rings_count)]
-		self.g_connecting_circles = [self.generate_connecting_circles(i) for i in range(1, self.generation_count+1)]
+		if not self.lazy:
+			for name in self.LAYERS:
+				self.get_layer(name)
+
+	#Layers
+
+	g_outside_lines = layer_property("outside_lines")
+	g_inside_lines = layer_property("inside_lines")
+	g_central_lines = layer_property("central_lines")
+	g_connecting_lines = layer_property("connecting_lines")
+	g_sector_lines = layer_property("sector_lines")
+	g_outside_circles = layer_property("outside_circles")
+	g_inside_circle = layer_property("inside_circle")
+	g_inside_rings = layer_property("inside_rings")
+	g_connecting_circles = layer_property("connecting_circles")
+
+	def get_layer(self, name: str):
+		'''Function to get generated layer by name, layer is generated on first access and memoized'''
+		if name not in self.layers:
+			self.layers[name] = self.generate_layer(name)
+
+		return self.layers[name]
+
+	def set_layer(self, name: str, elements: list):
+		'''Function to replace generated layer by name'''
+		self.layers[name] = elements
+
+	def get_engine(self):
+		'''Function to get vectorized engine for 'numpy' backend'''
+		if self.engine is None:
+			self.engine = NumpyGenerator.NumpyGenerator(self)
+
+		return self.engine
+
+	def generate_layer(self, name: str):
+		'''Function to generate layer by name with selected backend'''
+		if name not in self.LAYERS:
+			raise ValueError(f"Unknown layer '{name}', available layers: {self.LAYERS}")
+
+		with Instrumentation.stage(f"Generator.layer.{name}") as stage:
+			layer = self.generate_layer_by_backend(name)
+			stage.set_elements(Instrumentation.count_elements(layer) if isinstance(layer, list) else 1)
+
+		return layer
+
+	def generate_layer_by_backend(self, name: str):
+		'''Function to generate layer by name with 'numpy' engine or with python generators'''
+		if self.backend == "numpy":
+			return getattr(self.get_engine(), f"generate_{name}")()
+
+		generators = {
+			"outside_lines": lambda: self.generate_outside_lines(),
+			"inside_lines": lambda: [self.generate_inside_lines(i+1) for i in range(self.generation_count)],
+			"central_lines": lambda: self.generate_central_lines(),
+			"connecting_lines": lambda: [self.generate_connecting_lines(i) for i in range(self.generation_count+1)],
+			"sector_lines": lambda: [self.generate_sector_lines(i) for i in range(self.generation_count)],
+			"outside_circles": lambda: self.generate_outside_circles(),
+			"inside_circle": lambda: self.generate_inside_circle(),
+			"inside_rings": lambda: [self.generate_inside_ring(i+1) for i in range(self.rings_count)],
+			"connecting_circles": lambda: [self.generate_connecting_circles(i) for i in range(1, self.generation_count+1)],
+		}
+		return generators[name]()
+
+	def get_boundaries(self):
+		'''Function to get boundary points of the map, without generating any layer'''
+		return self.get_pivot_points()
+
+	#Intermediate results
+
+	def get_pivot_points(self):
+		'''Function to get memoized pivot points'''
+		return self.cache.get("pivot_points", self.generate_pivot_points)
+
+	def get_connecting_points(self, generation: int = 0):
+		'''Function to get memoized connecting points on specific generation'''
+		return self.cache.get("connecting_points", self.generate_connecting_points, generation)
+
+	def get_inside_pivot_points(self, generation: int = 1):
+		'''Function to get memoized pivot points inside polygon by specific generation'''
+		return self.cache.get("inside_pivot_points", self.generate_inside_pivot_points, generation)
+
+	#Parameters
+
+	def set_parameters(self, **parameters):
+		'''
+		Function to change generator parameters by their names (same as initializer arguments)
+		Invalidates all memoized intermediate results and layers, and regenerates layers if generator isn't lazy
+		'''
+		self.assign_parameters(parameters)
+
+		self.invalidate()
+		if not self.lazy:
+			for name in self.LAYERS:
+				self.get_layer(name)
+
+	@Instrumentation.instrumented("Generator.regenerate")
+	def regenerate(self, **parameters):
+		'''
+		Function to change generator parameters by their names (same as initializer arguments) and get updated map information
+		Only layers and memoized intermediate results, which depend on changed parameters (see 'DEPENDENCIES'), are generated again
+		Parameter objects changed in place (for example 'connecting_line.distance') must also be passed to be regenerated
+		'''
+		self.assign_parameters(parameters)
+		self.invalidate(self.get_dependent_names(parameters))
+		return self.generate()
+
+	def assign_parameters(self, parameters: dict):
+		'''Function to validate and assign generator parameters by their names'''
+		for name in parameters:
+			if name not in self.PARAMETERS:
+				raise ValueError(f"Unknown generator parameter '{name}', available parameters: {self.PARAMETERS}")
+
+		for name, value in parameters.items():
+			if name in self.MINIMAL_COUNTS:
+				value = max(int(value), self.MINIMAL_COUNTS[name])
+
+			setattr(self, name, value)
+
+	def get_dependent_names(self, parameters: list[str]):
+		'''Function to get names of layers and memoized intermediate results, which depend on any of parameters'''
+		return [name for name, dependencies in self.DEPENDENCIES.items() if any(parameter in dependencies for parameter in parameters)]
+
+	def invalidate(self, names: list[str] = None):
+		'''Function to drop memoized intermediate results and layers with specific names (by default - all of them)'''
+		if names is None:
+			self.cache.invalidate()
+			self.layers = {}
+			return
+
+		self.cache.invalidate(names)
+		self.layers = {name: layer for name, layer in self.layers.items() if name not in names}
 
 	#Generators
 
+	@Instrumentation.instrumented("Generator.generate_pivot_points")
 	def generate_pivot_points(self):
 		'''Function to generate pivot points, depends of outside line length and outside circle radius'''
 		
@@ -196,10 +721,11 @@ class Generator:
 
 		return points
 
+	@Instrumentation.instrumented("Generator.generate_outside_lines")
 	def generate_outside_lines(self):
 		'''Function to generate outside lines by pivot points'''
 		lines = []
-		points = self.generate_pivot_points()
+		points = self.get_pivot_points()
 		
 		for i, point in enumerate(points):
 			#Connect two points
@@ -208,6 +734,7 @@ class Generator:
 
 		return lines
 
+	@Instrumentation.instrumented("Generator.generate_inside_pivot_points")
 	def generate_inside_pivot_points(self, generation: int = 1):
 		'''
 		Function to generate pivot points inside polygon by specific generation
@@ -224,6 +751,7 @@ class Generator:
 
 		return points
 
+	@Instrumentation.instrumented("Generator.generate_inside_lines")
 	def generate_inside_lines(self, generation: int = 1):
 		'''
 		Function to generate lines inside polygon by specific generation
@@ -250,10 +778,11 @@ class Generator:
 
 		return gen_lines
 
+	@Instrumentation.instrumented("Generator.generate_central_lines")
 	def generate_central_lines(self):
 		'''Function to generate central connecting lines by pivot points'''
 		lines = []
-		points = self.generate_pivot_points()
+		points = self.get_pivot_points()
 		
 		for i, point in enumerate(points):
 			#Connect two points
@@ -262,6 +791,7 @@ class Generator:
 
 		return lines
 
+	@Instrumentation.instrumented("Generator.generate_connecting_points")
 	def generate_connecting_points(self, generation: int = 0):
 		'''
 		Function to generate connecting points on specific generation
@@ -280,12 +810,13 @@ class Generator:
 			#If it's last generation then generate only central points
 			return [tuple([line.get_central_point()]) for line in lines]
 
+	@Instrumentation.instrumented("Generator.generate_connecting_lines")
 	def generate_connecting_lines(self, generation: int = 0):
 		'''Function to generate connecting lines'''
 		
 		#Generate list of points
-		outside_points = self.generate_connecting_points(generation)
-		inside_points = self.generate_inside_pivot_points(generation+1)
+		outside_points = self.get_connecting_points(generation)
+		inside_points = self.get_inside_pivot_points(generation+1)
 
 		lines = []
 		for list_index, outside_pair in enumerate(outside_points):
@@ -308,10 +839,11 @@ class Generator:
 
 		return lines
 
+	@Instrumentation.instrumented("Generator.generate_sector_lines")
 	def generate_sector_lines(self, generation: int = 0):
 		'''Function to generate sector lines. Generation must be less than possible count of generations'''
-		outside_points = self.generate_connecting_points(generation)
-		inside_points = self.generate_inside_pivot_points(generation+1)
+		outside_points = self.get_connecting_points(generation)
+		inside_points = self.get_inside_pivot_points(generation+1)
 
 		outside_lines = []
 		inside_lines = []
@@ -347,29 +879,33 @@ class Generator:
 
 		return lines
 
+	@Instrumentation.instrumented("Generator.generate_outside_circles")
 	def generate_outside_circles(self):
 		'''Function to generate outside circles by pivot points'''
 		circles = []
-		points = self.generate_pivot_points()
+		points = self.get_pivot_points()
 		for point in points:
 			circle = MapElements.MapCircle(point, self.outside_circle)
 			circles.append(circle)
 
 		return circles
 
+	@Instrumentation.instrumented("Generator.generate_inside_circle")
 	def generate_inside_circle(self):
 		'''Function to generate inside circle in center of the coordinate system'''
 		return MapElements.MapCircle(BasicElements.Point(0, 0), self.inside_circle)
 
+	@Instrumentation.instrumented("Generator.generate_inside_ring")
 	def generate_inside_ring(self, generation: int = 1):
 		'''Function to generate ring inside map with generation parameters'''
 		circle = MapElements.MapCircle(BasicElements.Point(0, 0), self.inside_rings, True)
 		circle.scale(self.noise_scale_length(generation))
 		return circle
 
+	@Instrumentation.instrumented("Generator.generate_connecting_circles")
 	def generate_connecting_circles(self, generation: int = 1):
 		'''Function to generate connecting circles'''
-		boundary_points = self.generate_inside_pivot_points(generation)
+		boundary_points = self.get_inside_pivot_points(generation)
 
 		circles = []
 		for _, list_boundary_points in enumerate(boundary_points):
@@ -379,17 +915,106 @@ class Generator:
 
 		return circles
 
-	def generate(self):
-		'''Function to combine all information in specific format to visualize'''
-
-		outside_lines = self.g_outside_lines
-		inside_lines = [line for lines in self.g_inside_lines for line in lines]
-		central_lines = self.g_central_lines
-		connecting_lines = [line for lines in self.g_connecting_lines for line in lines]
-		sector_lines = [line for lines in self.g_sector_lines for line in lines]
-		outside_circles = self.g_outside_circles
-		inside_rings = self.g_inside_rings[::-1]
-		inside_circles = [self.g_inside_circle]
-		connecting_circles = [circle for circles in self.g_connecting_circles for circle in circles]
+	@Instrumentation.instrumented("Generator.generate")
+	def generate(self, layers: list[str] = None):
+		'''
+		Function to combine all information in specific format to visualize
+		- 'layers': list of layer names to generate (by default - all layers), other layers are empty
+		'''
+		layers = self.LAYERS if layers is None else layers
+		for name in layers:
+			if name not in self.LAYERS:
+				raise ValueError(f"Unknown layer '{name}', available layers: {self.LAYERS}")
+
+		def get(name: str):
+			return self.get_layer(name) if name in layers else []
+
+		outside_lines = get("outside_lines")
+		inside_lines = [line for lines in get("inside_lines") for line in lines]
+		central_lines = get("central_lines")
+		connecting_lines = [line for lines in get("connecting_lines") for line in lines]
+		sector_lines = [line for lines in get("sector_lines") for line in lines]
+		outside_circles = get("outside_circles")
+		inside_rings = get("inside_rings")[::-1]
+		inside_circles = [get("inside_circle")] if "inside_circle" in layers else []
+		connecting_circles = [circle for circles in get("connecting_circles") for circle in circles]
 
 		return MapInfo(outside_lines, inside_lines, central_lines, connecting_lines, sector_lines, outside_circles, inside_rings, inside_circles, connecting_circles)
+
+
+#Parameter sets of the batch, inherited by worker processes on initialization
+WORKER_PARAMETER_SETS = []
+
+def initialize_worker(parameter_sets: list[dict]):
+	'''Function to initialize worker process with parameter sets of the batch'''
+	global WORKER_PARAMETER_SETS
+	WORKER_PARAMETER_SETS = parameter_sets
+
+def generate_worker_maps(indices: list[int]):
+	'''Function to generate maps in worker process by indices of parameter sets. Returns list of tuples [(index, MapInfo), ...]'''
+	return [(index, Generator(**WORKER_PARAMETER_SETS[index]).generate()) for index in indices]
+
+def get_process_context():
+	'''
+	Function to get multiprocessing context for worker pools
+	Prefers 'fork', because forked workers inherit parameter sets without pickling, so noise functions can be lambdas
+	'''
+	if "fork" in multiprocessing.get_all_start_methods():
+		return multiprocessing.get_context("fork")
+
+	return multiprocessing.get_context()
+
+def check_parameter_sets_picklable(parameter_sets: list[dict]):
+	'''Function to check, that parameter sets can be sent to worker processes, which are not forked'''
+	for index, parameters in enumerate(parameter_sets):
+		try:
+			pickle.dumps(parameters)
+		except (pickle.PicklingError, AttributeError, TypeError) as error:
+			raise ValueError(
+				f"Parameter set {index} can't be sent to worker process: {error}. "
+				"Without 'fork' start method noise functions must be picklable (module level functions or functools.partial)"
+			) from error
+
+def generate_many(parameter_sets: list[dict], workers: int = None, ordered: bool = True, chunksize: int = None):
+	'''
+	Function to generate maps for many sets of generator parameters in a process pool. Yields results as soon as they are ready
+	- 'parameter_sets': list of dictionaries with Generator initializer arguments
+	- 'workers': count of worker processes (by default - count of CPUs), with 0 or 1 maps are generated in current process
+	- 'ordered': if True, yields MapInfo in order of parameter sets, otherwise yields tuples (index, MapInfo) in order of completion
+	- 'chunksize': count of maps generated by worker per task (by default - about four tasks per worker)
+	'''
+	parameter_sets = list(parameter_sets)
+	workers = (os.cpu_count() or 1) if workers is None else workers
+
+	if workers <= 1 or len(parameter_sets) <= 1:
+		for index, parameters in enumerate(parameter_sets):
+			map_info = Generator(**parameters).generate()
+			yield map_info if ordered else (index, map_info)
+		return
+
+	context = get_process_context()
+	if context.get_start_method() != "fork":
+		check_parameter_sets_picklable(parameter_sets)
+
+	if chunksize is None:
+		chunksize = max(1, math.ceil(len(parameter_sets)/(workers*4)))
+
+	chunks = [range(start, min(start+chunksize, len(parameter_sets))) for start in range(0, len(parameter_sets), chunksize)]
+
+	executor = concurrent.futures.ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=context,
+		initializer=initialize_worker,
+		initargs=(parameter_sets,)
+	)
+	try:
+		if ordered:
+			for results in executor.map(generate_worker_maps, chunks):
+				for _, map_info in results:
+					yield map_info
+		else:
+			futures = [executor.submit(generate_worker_maps, chunk) for chunk in chunks]
+			for future in concurrent.futures.as_completed(futures):
+				yield from future.result()
+	finally:
+		executor.shutdown(wait=True, cancel_futures=True)
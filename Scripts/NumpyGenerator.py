@@ -0,0 +1,208 @@
+import math
+
+import numpy as np
+
+from . import BasicElements
+from . import MapElements
+
+class NumpyGenerator:
+	'''
+	NumpyGenerator - vectorized engine for MapGenerator.Generator, which computes every generation and every subdivision as batched array operations
+	Containing parameters:
+	- 'generator': generator with map parameters [MapGenerator.Generator]
+	Layers are returned in the same format as generator attributes 'g_*', so generated MapInfo is the same as for python engine
+	Intermediate arrays (pivot points, outside and inside lines, connecting points) are memoized in generator cache
+	'''
+
+	#Initializer
+	def __init__(self, generator):
+		self.generator = generator
+
+	#Getters
+
+	def get_array(self, name: str):
+		'''Function to get intermediate array by name, computing it on first request'''
+		return self.generator.cache.get(f"{name}_array", getattr(self, f"generate_{name}_array"))
+
+	def get_noise(self, function, count: int, start: int = 1):
+		'''Function to get noise values for generations as column vector, to broadcast them over sides'''
+		return np.array([function(generation) for generation in range(start, start+count)], dtype=float)[:, None]
+
+	#Array generators
+
+	def generate_pivot_points_array(self):
+		'''Function to generate pivot points, depends of outside line length and outside circle radius. Returns PointArray of shape (sides)'''
+		generator = self.generator
+
+		#Calculate real side length using line length and circle radius
+		side_length = generator.outside_line.length + 2*generator.outside_circle.radius
+		angle = 2*math.pi/generator.sides_count
+		central_radius = (side_length/2)/math.sin(angle/2)
+
+		#Reverse X and Y parameters, which made points counterclock-wise, but with point on the top of the map
+		angles = np.arange(generator.sides_count)*angle
+		return BasicElements.PointArray(
+			np.round(central_radius*np.sin(angles), 10),
+			np.round(central_radius*np.cos(angles), 10)
+		)
+
+	def generate_outside_lines_array(self):
+		'''Function to generate outside lines connecting neighbour pivot points. Returns LineArray of shape (sides)'''
+		points = self.get_array("pivot_points")
+		next_points = BasicElements.PointArray(np.roll(points.x, -1), np.roll(points.y, -1))
+		return BasicElements.LineArray(points, next_points)
+
+	def generate_inside_lines_array(self):
+		'''Function to generate inside lines for all generations at once. Returns LineArray of shape (generations, sides)'''
+		generator = self.generator
+		outside_lines = self.get_array("outside_lines")
+
+		#Centers of outside lines and distances between them and axis center
+		center = outside_lines.get_central_point()
+		distance = center.get_distance()
+
+		#Calculate new distances using real inside_line distance with noise, and then calculate points scaling factors
+		noise_distance = self.get_noise(generator.noise_distance, generator.generation_count)
+		factor = (distance - noise_distance*generator.inside_line.distance)/distance
+
+		#Half-lengths of inside lines by generation with noising this distance factor
+		halflength = generator.inside_line.length/(2*self.get_noise(generator.noise_scale_length, generator.generation_count))
+
+		#Generate parallel lines
+		center = center*factor
+		point1 = center.get_second_point_from_angle_distance(outside_lines.angle, halflength)
+		point2 = center.get_second_point_from_angle_distance(outside_lines.angle, -halflength)
+		return BasicElements.LineArray(point1, point2)
+
+	def generate_previous_lines_array(self):
+		'''Function to generate lines subdivided by connecting points for each generation except last: outside lines, and then inside lines. Returns LineArray of shape (generations, sides)'''
+		outside_lines = self.get_array("outside_lines")
+		inside_lines = self.get_array("inside_lines")
+
+		point1 = BasicElements.PointArray(
+			np.concatenate([outside_lines.point1.x[None], inside_lines.point1.x[:-1]]),
+			np.concatenate([outside_lines.point1.y[None], inside_lines.point1.y[:-1]])
+		)
+		point2 = BasicElements.PointArray(
+			np.concatenate([outside_lines.point2.x[None], inside_lines.point2.x[:-1]]),
+			np.concatenate([outside_lines.point2.y[None], inside_lines.point2.y[:-1]])
+		)
+		return BasicElements.LineArray(point1, point2)
+
+	def generate_connecting_points_array(self):
+		'''
+		Function to generate pairs of connecting points for each generation except last
+		Returns LineArray of shape (generations, sides), where boundaries of each line are connecting points
+		'''
+		generator = self.generator
+		lines = self.get_array("previous_lines")
+
+		#For outside lines (first generation) distance is separated from outside circles
+		distance = np.full((generator.generation_count, 1), generator.connecting_line.distance, dtype=float)
+		distance[0] += generator.outside_circle.radius
+
+		return BasicElements.LineArray(*lines.get_points_by_distance_on_line(distance))
+
+	#Layer generators
+
+	def generate_outside_lines(self):
+		'''Function to generate outside lines by pivot points'''
+		return MapElements.MapLine.from_line_array(self.get_array("outside_lines"), self.generator.outside_line)
+
+	def generate_inside_lines(self):
+		'''Function to generate list of inside lines for each generation'''
+		lines = self.get_array("inside_lines")
+		return [MapElements.MapLine.from_line_array(lines[generation], self.generator.inside_line) for generation in range(len(lines))]
+
+	def generate_central_lines(self):
+		'''Function to generate central connecting lines by pivot points'''
+		points = self.get_array("pivot_points")
+		center = BasicElements.PointArray.from_point(BasicElements.Point(0, 0), points.get_shape())
+		return MapElements.MapLine.from_line_array(BasicElements.LineArray(points, center), self.generator.central_line)
+
+	def generate_connecting_lines(self):
+		'''Function to generate list of connecting lines for each generation'''
+		generator = self.generator
+		outside_points = self.get_array("connecting_points")
+		inside_lines = self.get_array("inside_lines")
+
+		#Orientate inside lines in the same direction as lines between connecting points
+		inside_lines = BasicElements.LineArray(inside_lines.point1, inside_lines.point2)
+		inside_lines.reverse_direction(~outside_points.is_lines_in_one_direction(inside_lines))
+
+		#For each side connect first points and second points, with shape (generations, sides, 2)
+		point1 = BasicElements.PointArray(
+			np.stack([outside_points.point1.x, outside_points.point2.x], axis=-1),
+			np.stack([outside_points.point1.y, outside_points.point2.y], axis=-1)
+		)
+		point2 = BasicElements.PointArray(
+			np.stack([inside_lines.point1.x, inside_lines.point2.x], axis=-1),
+			np.stack([inside_lines.point1.y, inside_lines.point2.y], axis=-1)
+		)
+		lines = BasicElements.LineArray(point1, point2)
+		generations = [MapElements.MapLine.from_line_array(lines[generation], generator.connecting_line) for generation in range(len(lines))]
+
+		#Last generation connects central points of last inside lines with axis center
+		central_points = self.get_array("inside_lines")[-1].get_central_point()
+		center = BasicElements.PointArray.from_point(BasicElements.Point(0, 0), central_points.get_shape())
+		generations.append(MapElements.MapLine.from_line_array(BasicElements.LineArray(central_points, center), generator.connecting_line))
+
+		return generations
+
+	def generate_sector_lines(self):
+		'''Function to generate list of sector lines for each generation'''
+		generator = self.generator
+		outside_points = self.get_array("connecting_points")
+		inside_lines = self.get_array("inside_lines")
+
+		#Subdivision points with shape (generations, sides, subdivisions-1)
+		outside_sector_points = outside_points.get_subdivision_points(generator.sector_subdivisions)
+		inside_sector_points = inside_lines.get_subdivision_points(generator.sector_subdivisions)
+
+		if outside_sector_points.get_shape()[-1] > 1:
+			#Orientate inside points in the same direction as outside points by first and last points
+			outside_direction = np.sign(outside_sector_points.x[..., -1] - outside_sector_points.x[..., 0])
+			inside_direction = np.sign(inside_sector_points.x[..., -1] - inside_sector_points.x[..., 0])
+			reverse = (outside_direction != inside_direction)[..., None]
+			inside_sector_points = BasicElements.PointArray(
+				np.where(reverse, inside_sector_points.x[..., ::-1], inside_sector_points.x),
+				np.where(reverse, inside_sector_points.y[..., ::-1], inside_sector_points.y)
+			)
+
+		lines = BasicElements.LineArray(outside_sector_points, inside_sector_points)
+		return [MapElements.MapLine.from_line_array(lines[generation], generator.connecting_line) for generation in range(len(lines))]
+
+	def generate_outside_circles(self):
+		'''Function to generate outside circles by pivot points'''
+		points = self.get_array("pivot_points").to_points()
+		return [MapElements.MapCircle(point, self.generator.outside_circle) for point in points]
+
+	def generate_inside_circle(self):
+		'''Function to generate inside circle in center of the coordinate system'''
+		return MapElements.MapCircle(BasicElements.Point(0, 0), self.generator.inside_circle)
+
+	def generate_inside_rings(self):
+		'''Function to generate list of rings inside map for each generation'''
+		generator = self.generator
+		rings = []
+		for generation in range(1, generator.rings_count+1):
+			circle = MapElements.MapCircle(BasicElements.Point(0, 0), generator.inside_rings, True)
+			circle.scale(generator.noise_scale_length(generation))
+			rings.append(circle)
+
+		return rings
+
+	def generate_connecting_circles(self):
+		'''Function to generate list of connecting circles for each generation'''
+		generator = self.generator
+		inside_lines = self.get_array("inside_lines")
+
+		#For each side circles at both boundaries of inside line, with shape (generations, sides, 2)
+		points = BasicElements.PointArray(
+			np.stack([inside_lines.point1.x, inside_lines.point2.x], axis=-1),
+			np.stack([inside_lines.point1.y, inside_lines.point2.y], axis=-1)
+		)
+		return [
+			[MapElements.MapCircle(point, generator.connecting_circle) for point in points[generation].to_points()]
+			for generation in range(len(points))
+		]
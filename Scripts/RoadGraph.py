@@ -0,0 +1,290 @@
+import collections
+import heapq
+import math
+
+import numpy as np
+
+from . import BasicElements
+from . import Functions
+
+class RoadGraph:
+	'''
+	RoadGraph - class of road network of the map, stored as graph in compressed sparse rows (CSR) arrays
+	Containing parameters:
+	- 'x', 'y': coordinates of nodes (numpy arrays)
+	- 'offsets': offsets of edges of each node in edges arrays (numpy array with length of count of nodes + 1)
+	- 'targets': target nodes of edges (numpy array)
+	- 'weights': lengths of edges (numpy array)
+	- 'lines': indices of map lines (in order of 'MapInfo.get_lines()'), which contain edges (numpy array)
+	- 'circles': indices of map circles (in order of 'MapInfo.get_circles()') at nodes, or -1 (numpy array)
+	- 'cache_size': count of shortest path trees of sources, which are kept for next queries
+	Each road part between two nodes is stored as two directed edges. Lengths of edges are distances between their nodes,
+	so euclidean distance between nodes (as 'Point.get_distance') is admissible heuristic for A* search
+	'''
+
+	#Initializer
+	def __init__(self, x, y, offsets, targets, weights, lines, circles, cache_size: int = 64):
+		self.x = np.asarray(x, dtype=float)
+		self.y = np.asarray(y, dtype=float)
+		self.offsets = np.asarray(offsets, dtype=np.int64)
+		self.targets = np.asarray(targets, dtype=np.int64)
+		self.weights = np.asarray(weights, dtype=float)
+		self.lines = np.asarray(lines, dtype=np.int64)
+		self.circles = np.asarray(circles, dtype=np.int64)
+		self.cache_size = max(int(cache_size), 0)
+
+		#Searches run in Python, so adjacency is also kept as lists, which are faster to index by Python integers
+		self.adjacency = (self.x.tolist(), self.y.tolist(), self.offsets.tolist(), self.targets.tolist(), self.weights.tolist())
+		self.trees = collections.OrderedDict()
+
+	@staticmethod
+	def from_map_info(map_info, tolerance: float = 1e-6, cache_size: int = 64):
+		'''
+		Generate road graph from lines of map information:
+		- 'tolerance': distance, in which ends of road parts and circles centers are snapped to one node
+		Lines are split at all points, where they touch or cross other lines, so roads are connected at junctions in the middle of lines
+		'''
+		if tolerance <= 0:
+			raise ValueError(f"Tolerance of snapping '{tolerance}' must be positive")
+
+		lines, _ = map_info.get_line_array()
+		circle_array, _ = map_info.get_circle_array()
+
+		#Parameters of split points on lines: boundary points and intersections with other lines
+		pairs, points = Functions.Intersection.intersect_all(lines, BasicElements.CircleArray()).line_line
+		indices = np.concatenate([np.arange(len(lines)), np.arange(len(lines)), pairs[:, 0], pairs[:, 1]])
+		x1, y1 = lines.point1.x[indices], lines.point1.y[indices]
+		dx, dy = lines.point2.x[indices] - x1, lines.point2.y[indices] - y1
+		px, py = np.concatenate([lines.point1.x, lines.point2.x, points.x, points.x]), np.concatenate([lines.point1.y, lines.point2.y, points.y, points.y])
+		length = dx*dx + dy*dy
+		factors = np.clip(((px - x1)*dx + (py - y1)*dy)/np.where(length > 0, length, 1), 0, 1)
+
+		#Parts of lines between consecutive split points
+		order = np.lexsort((factors, indices))
+		indices, factors = indices[order], factors[order]
+		part = np.flatnonzero(indices[1:] == indices[:-1])
+		part_lines = indices[part]
+		x1, y1 = lines.point1.x[part_lines], lines.point1.y[part_lines]
+		dx, dy = lines.point2.x[part_lines] - x1, lines.point2.y[part_lines] - y1
+		start_x, start_y = x1 + dx*factors[part], y1 + dy*factors[part]
+		end_x, end_y = x1 + dx*factors[part + 1], y1 + dy*factors[part + 1]
+
+		#Circles centers are snapped first, so nodes at circles are placed at their centers
+		snap_x = np.concatenate([circle_array.center.x, start_x, end_x])
+		snap_y = np.concatenate([circle_array.center.y, start_y, end_y])
+		nodes, nodes_x, nodes_y = RoadGraph.snap_points(snap_x, snap_y, tolerance)
+
+		circles_count = circle_array.center.x.size
+		circles = np.full(len(nodes_x), -1, dtype=np.int64)
+		circles[nodes[:circles_count][::-1]] = np.arange(circles_count)[::-1]
+
+		starts, ends = nodes[circles_count:circles_count + len(part)], nodes[circles_count + len(part):]
+		different = starts != ends
+		return RoadGraph.from_edges(nodes_x, nodes_y, starts[different], ends[different], part_lines[different], circles, cache_size)
+
+	@staticmethod
+	def from_edges(x, y, starts, ends, lines, circles, cache_size: int = 64):
+		'''Generate road graph from coordinates of nodes and undirected edges between nodes 'starts' and 'ends', which are parts of 'lines' '''
+		x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+		sources = np.concatenate([starts, ends]).astype(np.int64)
+		targets = np.concatenate([ends, starts]).astype(np.int64)
+		lines = np.concatenate([lines, lines]).astype(np.int64)
+
+		order = np.argsort(sources, kind="stable")
+		sources, targets, lines = sources[order], targets[order], lines[order]
+		offsets = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=len(x)))])
+		weights = np.hypot(x[targets] - x[sources], y[targets] - y[sources])
+		return RoadGraph(x, y, offsets, targets, weights, lines, circles, cache_size)
+
+	@staticmethod
+	def snap_points(x, y, tolerance: float):
+		'''
+		Function to snap points to nodes with hash grid of cells of tolerance size. Each point is snapped to first node
+		in the distance of tolerance, or creates new node. Returns tuple (nodes of points, nodes x coordinates, nodes y coordinates)
+		'''
+		cells = {}
+		nodes_x, nodes_y = [], []
+		nodes = np.empty(len(x), dtype=np.int64)
+		squared = tolerance*tolerance
+
+		for index, (px, py) in enumerate(zip(x.tolist(), y.tolist())):
+			cell_x, cell_y = math.floor(px/tolerance), math.floor(py/tolerance)
+			found = -1
+			for key in [(cell_x + i, cell_y + j) for i in (-1, 0, 1) for j in (-1, 0, 1)]:
+				for node in cells.get(key, ()):
+					if (nodes_x[node] - px)**2 + (nodes_y[node] - py)**2 <= squared:
+						found = node
+						break
+				if found >= 0:
+					break
+
+			if found < 0:
+				found = len(nodes_x)
+				nodes_x.append(px)
+				nodes_y.append(py)
+				cells.setdefault((cell_x, cell_y), []).append(found)
+
+			nodes[index] = found
+
+		return nodes, np.array(nodes_x, dtype=float), np.array(nodes_y, dtype=float)
+
+	#Getters
+
+	def get_nodes_count(self):
+		return len(self.x)
+
+	def get_edges_count(self):
+		'''Function to get count of undirected edges'''
+		return len(self.targets)//2
+
+	def get_node_point(self, node: int):
+		return BasicElements.Point(float(self.x[node]), float(self.y[node]))
+
+	def get_nearest_node(self, point: BasicElements.Point):
+		'''Function to get node nearest to the point, or -1 if graph is empty'''
+		if len(self.x) == 0:
+			return -1
+
+		return int(np.argmin((self.x - point.x)**2 + (self.y - point.y)**2))
+
+	def get_tree(self, source: int):
+		'''
+		Function to get shortest path tree of the source node as tuple (distances, predecessors) of arrays for all nodes
+		Unreachable nodes have infinite distance, and predecessor -1. Trees of recent sources are cached
+		'''
+		if source in self.trees:
+			self.trees.move_to_end(source)
+			return self.trees[source]
+
+		tree = self.search(source)
+		if self.cache_size > 0:
+			self.trees[source] = tree
+			while len(self.trees) > self.cache_size:
+				self.trees.popitem(last=False)
+
+		return tree
+
+	def search(self, source: int, target: int = None):
+		'''
+		Function to search shortest paths from source node by Dijkstra algorithm, or by A* algorithm if target is given
+		Returns tuple (distances, predecessors) of arrays, which are final for all nodes for Dijkstra, and for path to target for A*
+		'''
+		x, y, offsets, targets, weights = self.adjacency
+		count = len(x)
+		distances = [math.inf]*count
+		predecessors = [-1]*count
+		closed = [False]*count
+
+		#Heuristic of A* is distance to target, which is zero for Dijkstra
+		if target is None:
+			heuristic = lambda node: 0
+		else:
+			target_x, target_y = x[target], y[target]
+			heuristic = lambda node: math.hypot(x[node] - target_x, y[node] - target_y)
+
+		distances[source] = 0
+		queue = [(heuristic(source), 0, source)]
+		while queue:
+			_, distance, node = heapq.heappop(queue)
+			if closed[node]:
+				continue
+
+			closed[node] = True
+			if node == target:
+				break
+
+			for edge in range(offsets[node], offsets[node + 1]):
+				neighbour = targets[edge]
+				candidate = distance + weights[edge]
+				if candidate < distances[neighbour]:
+					distances[neighbour] = candidate
+					predecessors[neighbour] = node
+					heapq.heappush(queue, (candidate + heuristic(neighbour), candidate, neighbour))
+
+		return np.array(distances, dtype=float), np.array(predecessors, dtype=np.int64)
+
+	def get_path(self, predecessors, source: int, target: int):
+		'''Function to get list of nodes of path from source to target by predecessors, or empty list if target is unreachable'''
+		path = [target]
+		while path[-1] != source:
+			node = int(predecessors[path[-1]])
+			if node < 0:
+				return []
+			path.append(node)
+
+		return path[::-1]
+
+	def get_shortest_path(self, source: int, target: int):
+		'''
+		Function to get shortest path between nodes as tuple (distance, list of nodes), or (inf, []) if target is unreachable
+		Cached tree of source is used if it exists, otherwise path is searched by A*
+		'''
+		if source in self.trees:
+			distances, predecessors = self.get_tree(source)
+		else:
+			distances, predecessors = self.search(source, target)
+
+		return float(distances[target]), self.get_path(predecessors, source, target)
+
+	def get_distances(self, sources, targets):
+		'''
+		Function to get array of shortest distances between pairs of nodes from arrays 'sources' and 'targets'
+		Queries are grouped by sources, so one shortest path tree is searched for each distinct source
+		'''
+		sources, targets = np.broadcast_arrays(np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64))
+		result = np.empty(sources.shape, dtype=float)
+		flat_sources, flat_targets, flat_result = sources.ravel(), targets.ravel(), result.reshape(-1)
+
+		order = np.argsort(flat_sources, kind="stable")
+		unique, starts = np.unique(flat_sources[order], return_index=True)
+		ends = np.append(starts[1:], len(order))
+		for source, start, end in zip(unique.tolist(), starts.tolist(), ends.tolist()):
+			distances, _ = self.get_tree(source)
+			queries = order[start:end]
+			flat_result[queries] = distances[flat_targets[queries]]
+
+		return result
+
+	def get_all_pairs_distances(self, nodes = None):
+		'''Function to get matrix of shortest distances between all pairs of given nodes (by default - all nodes of graph)'''
+		nodes = np.arange(len(self.x)) if nodes is None else np.asarray(nodes, dtype=np.int64).reshape(-1)
+		matrix = np.empty((len(nodes), len(nodes)), dtype=float)
+
+		#Trees are searched without cache, because each of them is used once
+		for row, source in enumerate(nodes.tolist()):
+			distances, _ = self.trees[source] if source in self.trees else self.search(source)
+			matrix[row] = distances[nodes]
+
+		return matrix
+
+	def get_components(self):
+		'''Function to get array of indices of connected components of nodes'''
+		components = np.full(len(self.x), -1, dtype=np.int64)
+		_, _, offsets, targets, _ = self.adjacency
+		count = 0
+		for start in range(len(self.x)):
+			if components[start] >= 0:
+				continue
+
+			components[start] = count
+			stack = [start]
+			while stack:
+				node = stack.pop()
+				for neighbour in targets[offsets[node]:offsets[node + 1]]:
+					if components[neighbour] < 0:
+						components[neighbour] = count
+						stack.append(neighbour)
+			count += 1
+
+		return components
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.x)
+
+	def __str__(self):
+		return f"RoadGraph: Nodes - '{self.get_nodes_count()}', Edges - '{self.get_edges_count()}'"
+
+	def __repr__(self):
+		return f"RoadGraph{{nodes={self.get_nodes_count()}, edges={self.get_edges_count()}, cached_trees={len(self.trees)}}}"
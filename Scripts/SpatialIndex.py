@@ -0,0 +1,416 @@
+import math
+
+import numpy as np
+
+from . import BasicElements
+from . import Functions
+
+class UniformGrid:
+	'''
+	UniformGrid - class of uniform grid over boxes of elements, to find elements near points and boxes
+	Containing parameters:
+	- 'boxes': array of boxes of elements with rows [xmin, ymin, xmax, ymax]
+	- 'cell_size': size of grid cell (by default - chosen from count and sizes of boxes)
+	Each element is stored in every cell, which its box intersects. Cells are stored as sorted keys with offsets to elements (CSR)
+	'''
+
+	__slots__ = ("boxes", "cell_size", "origin", "columns", "rows", "keys", "offsets", "elements")
+
+	#Initializer
+	def __init__(self, boxes, cell_size: float = None):
+		self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+		self.cell_size = cell_size if cell_size else self.get_default_cell_size()
+
+		if len(self.boxes) == 0:
+			self.origin = (0.0, 0.0)
+		else:
+			self.origin = (float(self.boxes[:, 0].min()), float(self.boxes[:, 1].min()))
+
+		xmin, ymin, xmax, ymax = self.get_cells_ranges(self.boxes)
+		self.columns = int(xmax.max()) + 1 if len(self.boxes) else 1
+		self.rows = int(ymax.max()) + 1 if len(self.boxes) else 1
+
+		#Pairs (cell key, element) for each cell covered by element box
+		widths = xmax - xmin + 1
+		counts = widths*(ymax - ymin + 1)
+		elements = np.repeat(np.arange(len(self.boxes)), counts)
+		local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		cells_x = np.repeat(xmin, counts) + local%np.repeat(widths, counts)
+		cells_y = np.repeat(ymin, counts) + local//np.repeat(widths, counts)
+		keys = cells_y*self.columns + cells_x
+
+		order = np.argsort(keys, kind="stable")
+		keys = keys[order]
+		self.elements = elements[order]
+		self.keys, starts = np.unique(keys, return_index=True)
+		self.offsets = np.append(starts, len(keys))
+
+	def get_default_cell_size(self):
+		'''Function to get cell size, so average element covers few cells and count of cells is about count of elements'''
+		if len(self.boxes) == 0:
+			return 1.0
+
+		sizes = np.maximum(self.boxes[:, 2] - self.boxes[:, 0], self.boxes[:, 3] - self.boxes[:, 1])
+		width = self.boxes[:, 2].max() - self.boxes[:, 0].min()
+		height = self.boxes[:, 3].max() - self.boxes[:, 1].min()
+		size = max(float(np.median(sizes)), math.sqrt(width*height/len(self.boxes)))
+		return size if size > 0 else 1.0
+
+	#Getters
+
+	def get_cells_ranges(self, boxes):
+		'''Function to get ranges of cells indices (xmin, ymin, xmax, ymax) covered by boxes'''
+		boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+		xmin = np.floor((boxes[:, 0] - self.origin[0])/self.cell_size).astype(np.int64)
+		ymin = np.floor((boxes[:, 1] - self.origin[1])/self.cell_size).astype(np.int64)
+		xmax = np.floor((boxes[:, 2] - self.origin[0])/self.cell_size).astype(np.int64)
+		ymax = np.floor((boxes[:, 3] - self.origin[1])/self.cell_size).astype(np.int64)
+		return xmin, ymin, xmax, ymax
+
+	def get_cell_elements(self, key: int):
+		'''Function to get indices of elements stored in cell by its key'''
+		position = np.searchsorted(self.keys, key)
+		if position == len(self.keys) or self.keys[position] != key:
+			return self.elements[:0]
+
+		return self.elements[self.offsets[position]:self.offsets[position+1]]
+
+	def query_box(self, xmin: float, ymin: float, xmax: float, ymax: float):
+		'''Function to get sorted indices of elements, which boxes intersect given box'''
+		(cell_xmin,), (cell_ymin,), (cell_xmax,), (cell_ymax,) = self.get_cells_ranges([xmin, ymin, xmax, ymax])
+		cell_xmin, cell_ymin = max(cell_xmin, 0), max(cell_ymin, 0)
+		cell_xmax, cell_ymax = min(cell_xmax, self.columns - 1), min(cell_ymax, self.rows - 1)
+		if cell_xmin > cell_xmax or cell_ymin > cell_ymax:
+			return self.elements[:0]
+
+		#Find stored cells of each row of the box by binary search
+		found = []
+		for row in range(cell_ymin, cell_ymax + 1):
+			start = np.searchsorted(self.keys, row*self.columns + cell_xmin)
+			end = np.searchsorted(self.keys, row*self.columns + cell_xmax, side="right")
+			if start < end:
+				found.append(self.elements[self.offsets[start]:self.offsets[end]])
+
+		if not found:
+			return self.elements[:0]
+
+		candidates = np.unique(np.concatenate(found))
+		boxes = self.boxes[candidates]
+		inside = (boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) & (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin)
+		return candidates[inside]
+
+	def query_point(self, x: float, y: float):
+		'''Function to get sorted indices of elements, which boxes contain given point'''
+		return self.query_box(x, y, x, y)
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.boxes)
+
+	def __str__(self):
+		return f"UniformGrid: Elements - '{len(self.boxes)}', Cell size - '{self.cell_size}', Cells - '{len(self.keys)}'"
+
+	def __repr__(self):
+		return f"UniformGrid{{elements={len(self.boxes)}, cell_size={self.cell_size}, columns={self.columns}, rows={self.rows}}}"
+
+
+class SpatialIndex:
+	'''
+	SpatialIndex - class of spatial index over lines and circles of map information, for culling and hit-testing
+	Containing parameters:
+	- 'map_info': map information [MapGenerator.MapInfo]
+	- 'cell_size': size of grid cell (by default - chosen by UniformGrid)
+	Elements are indexed in order of 'MapInfo.get_lines()' and then 'MapInfo.get_circles()'
+	Boxes of lines are extended by half of the line thickness
+	'''
+
+	#Initializer
+	def __init__(self, map_info, cell_size: float = None):
+		self.map_info = map_info
+		self.lines = list(map_info.get_lines())
+		self.circles = list(map_info.get_circles())
+		self.elements = self.lines + self.circles
+		self.grid = UniformGrid(self.get_boxes(), cell_size)
+
+	def get_boxes(self):
+		'''Function to get boxes of all elements with rows [xmin, ymin, xmax, ymax]'''
+		boxes = []
+		for line in self.lines:
+			lower, upper = line.get_boundary_box()
+			halfthickness = line.get_thickness()/2
+			boxes.append((lower.x - halfthickness, lower.y - halfthickness, upper.x + halfthickness, upper.y + halfthickness))
+
+		for circle in self.circles:
+			lower, upper = circle.get_boundary_box()
+			boxes.append((lower.x, lower.y, upper.x, upper.y))
+
+		return np.array(boxes, dtype=float).reshape(-1, 4)
+
+	#Getters
+
+	def query_range(self, point_min: BasicElements.Point, point_max: BasicElements.Point):
+		'''Function to get list of elements, which boxes intersect box between bottom left and top right points'''
+		return [self.elements[index] for index in self.grid.query_box(point_min.x, point_min.y, point_max.x, point_max.y)]
+
+	def get_elements_at(self, point: BasicElements.Point, tolerance: float = 0):
+		'''
+		Function to get list of elements located at the point
+		Lines are checked with 'Line.is_point_on_object', circles with 'Circle.is_point_inside' and 'Circle.is_point_on_object'
+		With positive tolerance also elements at distance not more than tolerance are returned
+		'''
+		elements = []
+		delta = BasicElements.Point(tolerance, tolerance)
+		for element in self.query_range(point - delta, point + delta):
+			if isinstance(element, BasicElements.Line):
+				found = element.is_point_on_object(point)
+			else:
+				found = element.is_point_inside(point) or element.is_point_on_object(point)
+
+			if found or (tolerance > 0 and element.get_distance_to_point(point) <= tolerance):
+				elements.append(element)
+
+		return elements
+
+	def get_nearest(self, point: BasicElements.Point, max_distance: float = None):
+		'''
+		Function to get nearest element to the point and distance to it, as tuple (element, distance)
+		Distance is measured to line sectors and circles areas, returns (None, None) if there is no element in 'max_distance'
+		'''
+		if not self.elements:
+			return None, None
+
+		#Expand search box until nearest found element is inside it, then any nearer element must intersect this box
+		radius = self.grid.cell_size
+		while True:
+			if max_distance is not None:
+				radius = min(radius, max_distance)
+
+			delta = BasicElements.Point(radius, radius)
+			candidates = self.query_range(point - delta, point + delta)
+
+			nearest, distance = None, None
+			for element in candidates:
+				element_distance = element.get_distance_to_point(point)
+				if distance is None or element_distance < distance:
+					nearest, distance = element, element_distance
+
+			if distance is not None and distance <= radius:
+				return nearest, distance
+
+			if max_distance is not None and radius >= max_distance:
+				return None, None
+
+			radius *= 2
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.elements)
+
+	def __str__(self):
+		return f"SpatialIndex: Lines - '{len(self.lines)}', Circles - '{len(self.circles)}', Cell size - '{self.grid.cell_size}'"
+
+	def __repr__(self):
+		return f"SpatialIndex{{lines={len(self.lines)}, circles={len(self.circles)}, grid={self.grid!r}}}"
+
+
+class MembershipIndex:
+	'''
+	MembershipIndex - class of index over map information, to classify many points by elements of the map at once
+	Containing parameters:
+	- 'map_info': map information [MapGenerator.MapInfo]
+	- 'cell_size': size of grid cell (by default - about sixteen cells per element)
+	- 'chunk_size': count of points, which are classified at once
+	Points are labeled as: OUTSIDE - outside of map polygon ('MapInfo.get_boundaries'), MAP - inside of map polygon,
+	ROAD - on line with its thickness (not farther than half of thickness from line sector), NODE - inside circle
+	Labels have priority from NODE to OUTSIDE. Elements are indexed in order of 'MapInfo.get_lines()' and then 'MapInfo.get_circles()'
+	Lines, circles and edges of map polygon are stored in cells of uniform grid (CSR), lines and edges - only in cells they cross.
+	For cells, status of their center in map polygon is precomputed, and for points in cells with edges it's changed by parity of
+	crossings of edges with sector from the center to the point
+	'''
+
+	OUTSIDE = 0
+	MAP = 1
+	ROAD = 2
+	NODE = 3
+
+	#Initializer
+	def __init__(self, map_info, cell_size: float = None, chunk_size: int = 2**18):
+		self.map_info = map_info
+		self.chunk_size = max(int(chunk_size), 1)
+
+		line_array, lineclasses = map_info.get_line_array()
+		circle_array, _ = map_info.get_circle_array()
+		self.lines = BasicElements.LineArray(line_array.point1.reshape(-1), line_array.point2.reshape(-1))
+		self.halfwidths = np.array([lineclass.thickness for lineclass in lineclasses], dtype=float).reshape(-1)/2
+		self.circles = BasicElements.CircleArray(circle_array.center.reshape(-1), circle_array.radius.reshape(-1))
+
+		polygon = BasicElements.PointArray.from_points(map_info.get_boundaries())
+		if len(polygon) < 3:
+			polygon = BasicElements.PointArray()
+		self.edges = BasicElements.LineArray(polygon, BasicElements.PointArray(np.roll(polygon.x, -1), np.roll(polygon.y, -1)))
+
+		self.build_grid(cell_size)
+
+	def build_grid(self, cell_size: float = None):
+		'''Function to build grid of lines, circles and edges, and statuses of cells centers in map polygon'''
+		line_lower, line_upper = self.lines.get_boundary_box()
+		circle_lower, circle_upper = self.circles.get_boundary_box()
+		edge_lower, edge_upper = self.edges.get_boundary_box()
+		xmin = np.concatenate([line_lower.x - self.halfwidths, circle_lower.x, edge_lower.x])
+		ymin = np.concatenate([line_lower.y - self.halfwidths, circle_lower.y, edge_lower.y])
+		xmax = np.concatenate([line_upper.x + self.halfwidths, circle_upper.x, edge_upper.x])
+		ymax = np.concatenate([line_upper.y + self.halfwidths, circle_upper.y, edge_upper.y])
+		count = len(xmin)
+
+		if count == 0:
+			self.cell_size = cell_size or 1.0
+			self.origin = (0.0, 0.0)
+		else:
+			width, height = float(xmax.max() - xmin.min()), float(ymax.max() - ymin.min())
+			#Queried points are usually much more than elements, so cells are smaller than for one element per cell
+			self.cell_size = cell_size or (width*height/count)**(1/2)/4 or max(width, height, 1.0)
+			#Grid has one more cell around elements, so cells of elements on its border aren't outside of grid
+			self.origin = (float(xmin.min()) - self.cell_size, float(ymin.min()) - self.cell_size)
+
+		lines = Functions.Intersection.get_lines_cells(self.lines, self.origin, self.cell_size, self.halfwidths)
+		circles = Functions.Intersection.get_circles_cells(self.circles, self.origin, self.cell_size)
+		edges = Functions.Intersection.get_lines_cells(self.edges, self.origin, self.cell_size)
+		elements = np.concatenate([lines[0], circles[0] + len(self.lines), edges[0] + len(self.lines) + len(self.circles)])
+		columns = np.concatenate([lines[1], circles[1], edges[1]])
+		rows = np.concatenate([lines[2], circles[2], edges[2]])
+
+		self.columns = int(columns.max()) + 2 if len(columns) else 1
+		self.rows = int(rows.max()) + 2 if len(rows) else 1
+
+		keys = rows*self.columns + columns
+		order = np.argsort(keys, kind="stable")
+		keys = keys[order]
+		self.elements = elements[order]
+		self.keys, starts = np.unique(keys, return_index=True)
+		self.offsets = np.append(starts, len(keys))
+
+		#Ranges of stored elements for all cells of grid, so cells of points are found without search
+		self.cells_starts = np.zeros(self.rows*self.columns, dtype=np.int64)
+		self.cells_ends = np.zeros(self.rows*self.columns, dtype=np.int64)
+		self.cells_starts[self.keys] = self.offsets[:-1]
+		self.cells_ends[self.keys] = self.offsets[1:]
+
+		rows, columns = np.divmod(np.arange(self.rows*self.columns), self.columns)
+		self.cells_inside = self.is_inside_polygon(self.origin[0] + (columns + 0.5)*self.cell_size, self.origin[1] + (rows + 0.5)*self.cell_size)
+
+	#Getters
+
+	def is_inside_polygon(self, x, y):
+		'''Function to check for arrays of coordinates, are points inside map polygon, by parity of crossings of ray to positive X direction with edges'''
+		inside = np.zeros(np.shape(x), dtype=bool)
+		edges = zip(self.edges.point1.x.tolist(), self.edges.point1.y.tolist(), self.edges.point2.x.tolist(), self.edges.point2.y.tolist())
+		for x1, y1, x2, y2 in edges:
+			if y1 == y2:
+				continue
+
+			#Ends of edges are included only from one side, so ray through vertex crosses only one edge
+			crossed = ((y1 > y) != (y2 > y)) & (x < x1 + (y - y1)*(x2 - x1)/(y2 - y1))
+			inside ^= crossed
+
+		return inside
+
+	def get_crossings(self, x1, y1, x2, y2, edges):
+		'''Function to check for arrays of sectors from (x1, y1) to (x2, y2), are they crossed by edges of map polygon with given indices'''
+		ex1, ey1 = self.edges.point1.x[edges], self.edges.point1.y[edges]
+		ex2, ey2 = self.edges.point2.x[edges], self.edges.point2.y[edges]
+
+		#Ends of each sector are on different sides of other sector line (points on line are at the same side, as points below it)
+		side = lambda ax, ay, bx, by, px, py: (bx - ax)*(py - ay) - (by - ay)*(px - ax) > 0
+		return (
+			(side(ex1, ey1, ex2, ey2, x1, y1) != side(ex1, ey1, ex2, ey2, x2, y2)) &
+			(side(x1, y1, x2, y2, ex1, ey1) != side(x1, y1, x2, y2, ex2, ey2))
+		)
+
+	def classify_chunk(self, x, y):
+		'''Function to classify points with flat arrays of coordinates, returns tuple (labels, elements)'''
+		columns = np.floor((x - self.origin[0])/self.cell_size)
+		rows = np.floor((y - self.origin[1])/self.cell_size)
+		in_grid = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+		keys = np.where(in_grid, rows*self.columns + columns, 0).astype(np.int64)
+
+		labels = np.where(in_grid & self.cells_inside[keys], self.MAP, self.OUTSIDE).astype(np.uint8)
+		elements = np.full(len(x), -1, dtype=np.int64)
+
+		#Pairs of points and elements in cells of points
+		points = np.flatnonzero(in_grid)
+		pairs, entries = Functions.Intersection.expand_ranges(self.cells_starts[keys[points]], self.cells_ends[keys[points]] - 1)
+		points, candidates = points[pairs], self.elements[entries]
+		px, py = x[points], y[points]
+
+		lines_count, circles_count = len(self.lines), len(self.circles)
+		is_line = candidates < lines_count
+		is_circle = ~is_line & (candidates < lines_count + circles_count)
+		is_edge = candidates >= lines_count + circles_count
+
+		#Polygon status is changed, if sector from cell center to point crosses odd count of edges
+		edges = candidates[is_edge] - lines_count - circles_count
+		centers_x = self.origin[0] + (np.floor((px[is_edge] - self.origin[0])/self.cell_size) + 0.5)*self.cell_size
+		centers_y = self.origin[1] + (np.floor((py[is_edge] - self.origin[1])/self.cell_size) + 0.5)*self.cell_size
+		crossed = self.get_crossings(centers_x, centers_y, px[is_edge], py[is_edge], edges)
+		parity = np.bincount(points[is_edge][crossed], minlength=len(x))%2 == 1
+		labels[parity] = np.where(labels[parity] == self.MAP, self.OUTSIDE, self.MAP)
+
+		#Pairs are sorted by points and elements, so first found pair of point has element with minimal index
+		lines = candidates[is_line]
+		found = self.get_distances_to_lines(lines, px[is_line], py[is_line]) <= self.halfwidths[lines]
+		found_points, first = np.unique(points[is_line][found], return_index=True)
+		labels[found_points] = self.ROAD
+		elements[found_points] = lines[found][first]
+
+		circles = candidates[is_circle] - lines_count
+		dx = px[is_circle] - self.circles.center.x[circles]
+		dy = py[is_circle] - self.circles.center.y[circles]
+		found = dx*dx + dy*dy <= self.circles.radius[circles]**2
+		found_points, first = np.unique(points[is_circle][found], return_index=True)
+		labels[found_points] = self.NODE
+		elements[found_points] = circles[found][first] + lines_count
+
+		return labels, elements
+
+	def get_distances_to_lines(self, lines, x, y):
+		'''Function to get distances from points with coordinates x, y to line sectors with given indices (one point for each sector)'''
+		x1, y1 = self.lines.point1.x[lines], self.lines.point1.y[lines]
+		dx, dy = self.lines.point2.x[lines] - x1, self.lines.point2.y[lines] - y1
+		px, py = x - x1, y - y1
+		length = dx*dx + dy*dy
+		factor = np.clip((px*dx + py*dy)/np.where(length > 0, length, 1), 0, 1)
+		return np.hypot(px - dx*factor, py - dy*factor)
+
+	def classify(self, x, y):
+		'''
+		Function to classify points by arrays of coordinates (of any shape), returns tuple (labels, elements) of arrays of the same shape:
+		'labels' - labels of points (OUTSIDE, MAP, ROAD, NODE), 'elements' - index of circle for NODE, index of line for ROAD, otherwise -1
+		'''
+		x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+		shape = x.shape
+		x, y = x.ravel(), y.ravel()
+
+		labels = np.empty(len(x), dtype=np.uint8)
+		elements = np.empty(len(x), dtype=np.int64)
+		for start in range(0, len(x), self.chunk_size):
+			end = start + self.chunk_size
+			labels[start:end], elements[start:end] = self.classify_chunk(x[start:end], y[start:end])
+
+		return labels.reshape(shape), elements.reshape(shape)
+
+	def classify_points(self, points: BasicElements.PointArray):
+		'''Function to classify points of PointArray (see 'classify')'''
+		return self.classify(points.x, points.y)
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.lines) + len(self.circles)
+
+	def __str__(self):
+		return f"MembershipIndex: Lines - '{len(self.lines)}', Circles - '{len(self.circles)}', Edges - '{len(self.edges)}', Cell size - '{self.cell_size}'"
+
+	def __repr__(self):
+		return f"MembershipIndex{{lines={len(self.lines)}, circles={len(self.circles)}, edges={len(self.edges)}, cell_size={self.cell_size}, columns={self.columns}, rows={self.rows}}}"
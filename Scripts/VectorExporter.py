@@ -0,0 +1,363 @@
+"""
+Module for export of map information to vector formats (SVG and PDF)
+Documents are written to the output by batches of elements, so whole document is never built in memory
+"""
+
+import os
+import zlib
+
+import numpy as np
+
+from . import MapGenerator
+from . import Visualizer
+
+class VectorExporter:
+	'''
+	VectorExporter - class to export lines and circles of map information to vector image
+	Containing parameters:
+	- 'map_info': map information [MapGenerator.MapInfo]
+	- 'precision': count of decimal signs of coordinates in output
+	- 'merge_paths': if True, elements of each class are written as one path, where connected lines are joined to polylines
+	- 'scale': size of map unit in output units (pixels for SVG, points for PDF)
+	- 'batch_size': count of elements, which are formatted and written at once
+	Coordinates are written in map units, Y axis of SVG is inverted so map isn't mirrored. Styles of elements classes are written once:
+	as CSS classes in SVG, and as line width of group of paths in PDF
+	'''
+
+	FORMATS = ["svg", "pdf"]
+
+	#Factor of control points distance for approximation of quarter of circle by cubic Bezier curve
+	BEZIER_CIRCLE = 0.5522847498
+
+	#Initializer
+	def __init__(self, map_info: MapGenerator.MapInfo, precision: int = 2, merge_paths: bool = False, scale: float = 1, batch_size: int = 4096):
+		self.map_info = map_info
+		self.precision = max(int(precision), 0)
+		self.merge_paths = merge_paths
+		self.scale = scale
+		self.batch_size = max(int(batch_size), 1)
+
+	#Getters
+
+	def get_elements(self):
+		'''
+		Function to get elements of the map as tuple (lines, lineclasses, circles, circleclasses), where
+		'lines' is array with rows [x1, y1, x2, y2], 'circles' is array with rows [x, y, radius],
+		and classes are tuples (list of distinct classes, array of classes indices of elements)
+		'''
+		line_array, lineclasses = self.map_info.get_line_array()
+		circle_array, circleclasses = self.map_info.get_circle_array()
+
+		lines = np.stack([line_array.point1.x, line_array.point1.y, line_array.point2.x, line_array.point2.y], axis=-1).reshape(-1, 4)
+		circles = np.stack([circle_array.center.x, circle_array.center.y, circle_array.radius], axis=-1).reshape(-1, 3)
+		return lines, self.get_classes(lineclasses), circles, self.get_classes(circleclasses)
+
+	def get_classes(self, elementclasses: list):
+		'''Function to get tuple (list of distinct classes, array of classes indices of elements)'''
+		classes = {}
+		indices = [classes.setdefault(id(elementclass), (len(classes), elementclass))[0] for elementclass in elementclasses]
+		return [elementclass for _, elementclass in classes.values()], np.array(indices, dtype=np.int64)
+
+	def get_bounds(self, lines, lineclasses: tuple, circles):
+		'''Function to get box (left, bottom, right, top) in map units, covering all elements with their thickness'''
+		classes, indices = lineclasses
+		thickness = np.array([lineclass.thickness for lineclass in classes], dtype=float)
+		halfwidths = (thickness[indices] if len(indices) else np.zeros(0))/2
+
+		boxes = np.concatenate([
+			np.stack([
+				np.minimum(lines[:, 0], lines[:, 2]) - halfwidths, np.minimum(lines[:, 1], lines[:, 3]) - halfwidths,
+				np.maximum(lines[:, 0], lines[:, 2]) + halfwidths, np.maximum(lines[:, 1], lines[:, 3]) + halfwidths,
+			], axis=-1).reshape(-1, 4),
+			np.stack([
+				circles[:, 0] - circles[:, 2], circles[:, 1] - circles[:, 2],
+				circles[:, 0] + circles[:, 2], circles[:, 1] + circles[:, 2],
+			], axis=-1).reshape(-1, 4),
+		])
+		if len(boxes) == 0:
+			return 0.0, 0.0, 1.0, 1.0
+
+		return float(boxes[:, 0].min()), float(boxes[:, 1].min()), float(boxes[:, 2].max()), float(boxes[:, 3].max())
+
+	def get_numbers(self, values):
+		'''Function to get array of strings of numbers, rounded to precision and without trailing zeros'''
+		#Adding zero replaces negative zeros after rounding
+		values = np.round(np.asarray(values, dtype=float), self.precision) + 0.0
+		numbers = np.char.mod(f"%.{self.precision}f", values)
+		if self.precision > 0:
+			numbers = np.char.rstrip(np.char.rstrip(numbers, "0"), ".")
+
+		return numbers
+
+	def get_chains(self, lines):
+		'''
+		Function which returns iterator of batches of polylines of connected lines, where each batch is list of arrays of strings of vertices coordinates [[x, y], ...]
+		Lines are connected, if coordinates of their points are equal after rounding to precision. Vertices are formatted only for current batch of polylines
+		'''
+		if len(lines) == 0:
+			return
+
+		factor = 10**self.precision
+		points = np.round(lines*factor).astype(np.int64)
+		order, starts = Visualizer.LineCommands(points, [], []).get_chains_order(points)
+		ends = np.append(starts[1:], len(order))
+
+		for batch in self.get_batches(len(starts)):
+			#Lines of polylines of the batch are consecutive in order, positions are relative to the first of them
+			first = starts[batch][0]
+			batch_starts, batch_ends = starts[batch] - first, ends[batch] - first
+			numbers = self.get_numbers(lines[order[first:first + batch_ends[-1]]]).reshape(-1, 4)
+
+			vertices = np.insert(numbers[:, :2], batch_ends, numbers[batch_ends - 1, 2:], axis=0)
+			bounds = np.append(batch_starts, batch_ends[-1]) + np.arange(len(batch_starts) + 1)
+			yield [vertices[start:end] for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+
+	def get_batches(self, count: int):
+		'''Function which returns iterator of slices of elements with batch size'''
+		for start in range(0, count, self.batch_size):
+			yield slice(start, min(start + self.batch_size, count))
+
+	#SVG
+
+	def get_svg_styles(self, lineclasses: tuple, circleclasses: tuple):
+		'''Function to get CSS rules of classes of lines (named 'l<index>') and circles (named 'c<index>')'''
+		rules = []
+		for index, lineclass in enumerate(lineclasses[0]):
+			rules.append(f".l{index}{{stroke-width:{self.get_numbers(lineclass.thickness)}}}")
+
+		for index, circleclass in enumerate(circleclasses[0]):
+			if circleclass.thickness > 0:
+				rules.append(f".c{index}{{fill:none;stroke:#000;stroke-width:{self.get_numbers(circleclass.thickness)}}}")
+			else:
+				rules.append(f".c{index}{{fill:#000}}")
+
+		return "".join(rules)
+
+	def get_svg_circles(self, circles, circleclasses: tuple):
+		'''
+		Function which returns iterator of batches of SVG elements of circles with Y axis inverted
+		Rings are drawn inside circles, same as in Visualizer, so stroke of ring is at half of thickness inside the circle
+		'''
+		classes, indices = circleclasses
+		thickness = np.array([circleclass.thickness for circleclass in classes], dtype=float)
+		thickness = thickness[indices] if len(indices) else np.zeros(0)
+		radius = circles[:, 2] - thickness/2
+
+		if self.merge_paths:
+			#Each circle is path of two arcs
+			for index in range(len(classes)):
+				selected = np.flatnonzero(indices == index)
+				yield f'<path class="c{index}" d="'
+				for batch in self.get_batches(len(selected)):
+					batch_circles, batch_radius = circles[selected[batch]], radius[selected[batch]]
+					x, y = self.get_numbers(batch_circles[:, 0] - batch_radius), self.get_numbers(-batch_circles[:, 1])
+					r, d = self.get_numbers(batch_radius), self.get_numbers(2*batch_radius)
+					yield "".join(
+						f"M{x0} {y0}a{r0} {r0} 0 1 0 {d0} 0a{r0} {r0} 0 1 0 -{d0} 0"
+						for x0, y0, r0, d0 in zip(x.tolist(), y.tolist(), r.tolist(), d.tolist())
+					)
+				yield '"/>\n'
+			return
+
+		for batch in self.get_batches(len(circles)):
+			x, y, r = self.get_numbers(circles[batch, 0]), self.get_numbers(-circles[batch, 1]), self.get_numbers(radius[batch])
+			yield "".join(
+				f'<circle class="c{index}" cx="{x0}" cy="{y0}" r="{r0}"/>\n'
+				for x0, y0, r0, index in zip(x.tolist(), y.tolist(), r.tolist(), indices[batch].tolist())
+			)
+
+	def get_svg_lines(self, lines, lineclasses: tuple):
+		'''Function which returns iterator of batches of SVG elements of lines with Y axis inverted'''
+		classes, indices = lineclasses
+		lines = lines*[1, -1, 1, -1]
+
+		if self.merge_paths:
+			for index in range(len(classes)):
+				yield f'<path class="l{index}" d="'
+				for chains in self.get_chains(lines[indices == index]):
+					yield "".join("M" + "L".join(f"{x} {y}" for x, y in chain.tolist()) for chain in chains)
+				yield '"/>\n'
+			return
+
+		for batch in self.get_batches(len(lines)):
+			yield "".join(
+				f'<path class="l{index}" d="M{x1} {y1}L{x2} {y2}"/>\n'
+				for (x1, y1, x2, y2), index in zip(self.get_numbers(lines[batch]).tolist(), indices[batch].tolist())
+			)
+
+	def iterate_svg(self):
+		'''Function which returns iterator of parts of SVG document'''
+		lines, lineclasses, circles, circleclasses = self.get_elements()
+		left, bottom, right, top = self.get_bounds(lines, lineclasses, circles)
+		x, y, width, height = self.get_numbers([left, -top, right - left, top - bottom])
+		pixels_width, pixels_height = self.get_numbers([(right - left)*self.scale, (top - bottom)*self.scale])
+
+		yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+		yield f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels_width}" height="{pixels_height}" viewBox="{x} {y} {width} {height}">\n'
+		yield f"<style>{self.get_svg_styles(lineclasses, circleclasses)}</style>\n"
+
+		#Elements are drawn in the same order as in Visualizer: circles, and then lines
+		yield "<g>\n"
+		yield from self.get_svg_circles(circles, circleclasses)
+		yield '</g>\n<g fill="none" stroke="#000">\n'
+		yield from self.get_svg_lines(lines, lineclasses)
+		yield "</g>\n</svg>\n"
+
+	#PDF
+
+	def get_pdf_circles(self, circles, circleclasses: tuple):
+		'''Function which returns iterator of batches of PDF content operators of circles, grouped by classes'''
+		classes, indices = circleclasses
+		for index, circleclass in enumerate(classes):
+			selected = circles[indices == index]
+
+			yield f"{self.get_numbers(circleclass.thickness)} w\n" if circleclass.thickness > 0 else ""
+			for batch in self.get_batches(len(selected)):
+				radius = selected[batch, 2] - circleclass.thickness/2
+				control = radius*self.BEZIER_CIRCLE
+				x, y = selected[batch, 0], selected[batch, 1]
+
+				#Circle of four cubic Bezier curves counterclock-wise from the rightmost point
+				numbers = self.get_numbers(np.stack([
+					x + radius, y,
+					x + radius, y + control, x + control, y + radius, x, y + radius,
+					x - control, y + radius, x - radius, y + control, x - radius, y,
+					x - radius, y - control, x - control, y - radius, x, y - radius,
+					x + control, y - radius, x + radius, y - control, x + radius, y,
+				], axis=-1).reshape(-1, 26))
+				yield "".join(
+					"{} {} m\n{} {} {} {} {} {} c\n{} {} {} {} {} {} c\n{} {} {} {} {} {} c\n{} {} {} {} {} {} c\n".format(*row)
+					for row in numbers.tolist()
+				)
+			yield "S\n" if circleclass.thickness > 0 else "f\n"
+
+	def get_pdf_lines(self, lines, lineclasses: tuple):
+		'''Function which returns iterator of batches of PDF content operators of lines, grouped by classes'''
+		classes, indices = lineclasses
+		for index, lineclass in enumerate(classes):
+			yield f"{self.get_numbers(lineclass.thickness)} w\n"
+			if self.merge_paths:
+				for chains in self.get_chains(lines[indices == index]):
+					yield "".join(
+						" l\n".join(f"{x} {y}" for x, y in chain.tolist()).replace(" l\n", " m\n", 1) + " l\n"
+						for chain in chains
+					)
+			else:
+				selected = lines[indices == index]
+				for batch in self.get_batches(len(selected)):
+					yield "".join(f"{x1} {y1} m\n{x2} {y2} l\n" for x1, y1, x2, y2 in self.get_numbers(selected[batch]).tolist())
+			yield "S\n"
+
+	def iterate_pdf_content(self, bounds: tuple, elements: tuple):
+		'''Function which returns iterator of parts of PDF page content, where map units are scaled and moved to page box'''
+		lines, lineclasses, circles, circleclasses = elements
+		left, bottom, _, _ = bounds
+		scale, x, y = self.get_numbers([self.scale, -left*self.scale, -bottom*self.scale])
+
+		yield f"{scale} 0 0 {scale} {x} {y} cm\n0 g\n0 G\n"
+		yield from self.get_pdf_circles(circles, circleclasses)
+		yield from self.get_pdf_lines(lines, lineclasses)
+
+	def write_pdf(self, writer: 'CountingWriter'):
+		'''Function to write PDF document with one page, where page content is compressed by parts'''
+		elements = self.get_elements()
+		bounds = self.get_bounds(*elements[:3])
+		left, bottom, right, top = bounds
+		width, height = self.get_numbers([(right - left)*self.scale, (top - bottom)*self.scale])
+
+		offsets = []
+		def write_object(content: str):
+			offsets.append(writer.count)
+			writer.write(f"{len(offsets)} 0 obj\n{content}\nendobj\n".encode())
+
+		writer.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+		write_object("<< /Type /Catalog /Pages 2 0 R >>")
+		write_object("<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
+		write_object(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] /Contents 4 0 R >>")
+
+		#Length of content stream isn't known before writing, so it's written as separate object after stream
+		offsets.append(writer.count)
+		writer.write(b"4 0 obj\n<< /Length 5 0 R /Filter /FlateDecode >>\nstream\n")
+		start = writer.count
+		compressor = zlib.compressobj()
+		for part in self.iterate_pdf_content(bounds, elements):
+			writer.write(compressor.compress(part.encode()))
+		writer.write(compressor.flush())
+		length = writer.count - start
+		writer.write(b"\nendstream\nendobj\n")
+		write_object(str(length))
+
+		xref = writer.count
+		writer.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+		writer.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+		writer.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+	#Writers
+
+	def export(self, target, format: str = "svg"):
+		'''
+		Function to export map to vector image
+		- 'target': name of the file, binary file-like object (with 'write'), or socket-like object (with 'sendall')
+		- 'format': 'svg' or 'pdf'
+		'''
+		if format not in self.FORMATS:
+			raise ValueError(f"Unknown vector format '{format}', available formats: {self.FORMATS}")
+
+		with CountingWriter(target) as writer:
+			if format == "pdf":
+				self.write_pdf(writer)
+			else:
+				for part in self.iterate_svg():
+					writer.write(part.encode())
+
+	def save_svg(self, target):
+		'''Function to export map to SVG image (see 'export' for targets)'''
+		self.export(target, "svg")
+
+	def save_pdf(self, target):
+		'''Function to export map to PDF document with one page (see 'export' for targets)'''
+		self.export(target, "pdf")
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"VectorExporter: Precision - '{self.precision}', Merge paths - '{self.merge_paths}', Scale - '{self.scale}'"
+
+	def __repr__(self):
+		return f"VectorExporter{{precision={self.precision}, merge_paths={self.merge_paths}, scale={self.scale}, batch_size={self.batch_size}}}"
+
+
+class CountingWriter:
+	'''
+	CountingWriter - class to write binary data to file, file-like or socket-like object, with count of written bytes
+	Containing parameters:
+	- 'target': name of the file, binary file-like object, or socket-like object
+	'''
+
+	#Initializer
+	def __init__(self, target):
+		self.own_file = isinstance(target, (str, os.PathLike))
+		self.file = open(target, "wb") if self.own_file else Visualizer.get_writer(target)
+		self.count = 0
+
+	#Writers
+
+	def write(self, data: bytes):
+		if data:
+			self.file.write(data)
+			self.count += len(data)
+
+		return len(data)
+
+	def close(self):
+		'''Function to close file, if it was opened by writer'''
+		if self.own_file:
+			self.file.close()
+
+	#Other classic methods
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.close()
@@ -1,17 +1,66 @@
-from PIL import Image, ImageDraw, ImageFilter
+import collections
+import concurrent.futures
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import tempfile
+import traceback
+import zlib
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, features
 
 from . import BasicElements
+from . import DistanceRasterizer
 from . import MapElements
+from . import Instrumentation
 from . import MapGenerator
 
 class Visualizer:
 
-	def __init__(self, map_info: MapGenerator.MapInfo, pixels_per_unit: float = 10, image_size: (int, int) = (2048, 2048), blur_pixels: int = 0):
+	#Blur methods: exact gaussian blur, or approximate blur of downsampled image for large blur radiuses
+	BLUR_METHODS = ["gaussian", "downsample"]
+
+	#Blur radius in pixels of downsampled image for 'downsample' method
+	DOWNSAMPLE_BLUR_PIXELS = 4
+
+	#Rasterization engines: drawing by PIL, or antialiased rasterization by signed distance fields
+	ENGINES = ["pil", "distance"]
+
+	#Names of formats for encoding in PIL, 'raw' is RGBA buffer without encoding
+	FORMATS = {
+		"png": "PNG",
+		"webp": "WEBP",
+		"raw": None,
+	}
+
+	def __init__(self, 
+			map_info: MapGenerator.MapInfo, 
+			pixels_per_unit: float = 10, 
+			image_size: (int, int) = (2048, 2048), 
+			blur_pixels: int = 0, 
+			cache: 'RenderCache' = None,
+			blur_method: str = "gaussian",
+			engine: str = "pil"
+	):
+		if blur_method not in self.BLUR_METHODS:
+			raise ValueError(f"Unknown blur method '{blur_method}', available methods: {self.BLUR_METHODS}")
+
+		if engine not in self.ENGINES:
+			raise ValueError(f"Unknown rasterization engine '{engine}', available engines: {self.ENGINES}")
+
 		self.map_info = map_info
 		self.pixels_per_unit = pixels_per_unit
 		self.image_size = image_size
 		self.blur_pixels = blur_pixels
+		self.cache = cache
+		self.blur_method = blur_method
+		self.engine = engine
 
+	@Instrumentation.instrumented("Visualizer.transform")
 	def get_offset_map_info(self) -> MapGenerator.MapInfo:
 		'''Function to get new map information with Image offsets'''
 		offset = BasicElements.Point(*self.image_size)/2
@@ -21,41 +70,89 @@ class Visualizer:
 
 		return updated_map_info
 
-	def get_map_image(self) -> Image:
-		'''Function to draw road map for this map info'''
-
-		blank = Image.new("RGBA", self.image_size, (255,255,255,0))
-		image = ImageDraw.Draw(blank)
-	
-		updated_map_info = self.get_offset_map_info()
+	@Instrumentation.instrumented("Visualizer.commands")
+	def get_draw_commands(self, updated_map_info: MapGenerator.MapInfo):
+		'''
+		Function to prepare drawing arguments of all elements in image coordinates
+		Returns tuple (circles, lines), where circles are [(box, fill, outline, width), ...] and lines are LineCommands
+		'''
+		#Coordinates of all elements are transformed and truncated to pixels at once
+		circle_array, circleclasses = updated_map_info.get_circle_array()
+		lower, upper = circle_array.get_boundary_box(self.pixels_per_unit)
+		boxes = np.trunc(np.stack([lower.x, lower.y, upper.x, upper.y], axis=-1)).astype(np.int64).reshape(-1, 4).tolist()
 
-		for circle in updated_map_info.get_circles():
-			circle.scale(self.pixels_per_unit)
-			
+		#Circles are drawn one by one in order of elements, because transparent fill of outlined circle overwrites previous circles
+		circles = []
+		for (x0, y0, x1, y1), circleclass in zip(boxes, circleclasses):
 			fill = (0, 0, 0, 255)
 			outline = (0, 0, 0, 0)
 			width = 0
-			if circle.get_thickness() > 0:
+			if circleclass.thickness > 0:
 				fill = (0, 0, 0, 0)
 				outline = (0, 0, 0, 255)
-				width = circle.get_thickness()*self.pixels_per_unit
+				width = circleclass.thickness*self.pixels_per_unit
 
-			image.ellipse(
-				[point.int().get_coordinates() for point in circle.get_boundary_box()], 
-				fill=fill,
-				outline=outline, 
-				width=width
-			)
+			circles.append(([(x0, y0), (x1, y1)], fill, outline, width))
 
-		for line in updated_map_info.get_lines():
-			image.line(
-				[point.int().get_coordinates() for point in line.get_boundaries()], 
-				fill=(0, 0, 0, 255), 
-				width=line.get_thickness()*self.pixels_per_unit
-			)
+		line_array, lineclasses = updated_map_info.get_line_array()
+		points = np.trunc(np.stack([line_array.point1.x, line_array.point1.y, line_array.point2.x, line_array.point2.y], axis=-1))
+
+		#Lines are grouped by width of distinct line classes
+		classes = {}
+		indices = np.array([classes.setdefault(id(lineclass), (len(classes), lineclass))[0] for lineclass in lineclasses], dtype=np.int64)
+		widths = {}
+		class_widths = np.array(
+			[widths.setdefault(lineclass.thickness*self.pixels_per_unit, len(widths)) for _, lineclass in classes.values()], 
+			dtype=np.int64
+		)
+
+		lines = LineCommands(points.astype(np.int64).reshape(-1, 4), list(widths), class_widths[indices] if len(indices) else indices)
+		return circles, lines
+
+	@Instrumentation.instrumented("Visualizer.draw")
+	def draw_commands(self, image: ImageDraw.ImageDraw, circles: list, lines: 'LineCommands', offset: (int, int) = (0, 0)):
+		'''Function to draw prepared circles and lines, shifted by integer offset. Connected lines of the same width are drawn as one polyline'''
+		dx, dy = offset
 
+		for box, fill, outline, width in circles:
+			image.ellipse([(x + dx, y + dy) for x, y in box], fill=fill, outline=outline, width=width)
+
+		for points, width in lines.get_polylines(offset):
+			image.line(points, fill=(0, 0, 0, 255), width=width)
+
+	def get_distance_rasterizer(self, circles: list, lines: 'LineCommands') -> DistanceRasterizer.DistanceRasterizer:
+		'''Function to get rasterizer by signed distance fields for prepared circles and lines'''
+		circles = [
+			((x0 + x1)/2, (y0 + y1)/2, (abs(x1 - x0) + 1)/2, width) 
+			for ((x0, y0), (x1, y1)), _, _, width in circles
+		]
+		return DistanceRasterizer.DistanceRasterizer(circles, np.column_stack([lines.points, lines.get_widths()]))
+
+	def draw_layer(self, size: (int, int), circles: list, lines: 'LineCommands', offset: (int, int) = (0, 0)) -> Image:
+		'''Function to draw prepared circles and lines, shifted by integer offset, on transparent image of the size with engine of visualizer'''
+		if self.engine == "distance":
+			return self.get_distance_rasterizer(circles, lines).rasterize(size, offset)
+
+		blank = Image.new("RGBA", size, (255, 255, 255, 0))
+		self.draw_commands(ImageDraw.Draw(blank), circles, lines, offset)
 		return blank
 
+	def get_map_image(self) -> Image:
+		'''Function to draw road map for this map info'''
+		updated_map_info = self.get_offset_map_info()
+		circles, lines = self.get_draw_commands(updated_map_info)
+		return self.draw_layer(self.image_size, circles, lines)
+
+	def get_boundary_polygon(self, updated_map_info: MapGenerator.MapInfo):
+		'''Function to get boundary polygon of the map in image coordinates'''
+		return [point.int().get_coordinates() for point in updated_map_info.get_boundaries()]
+
+	@Instrumentation.instrumented("Visualizer.boundaries")
+	def draw_boundaries(self, image: ImageDraw.ImageDraw, polygon: list, offset: (int, int) = (0, 0)):
+		'''Function to draw boundary polygon, shifted by integer offset'''
+		dx, dy = offset
+		image.polygon([(x + dx, y + dy) for x, y in polygon], fill=(255, 255, 255, 255))
+
 	def get_map_boundaries_image(self) -> Image:
 		'''Function to draw boundaries of the image'''
 
@@ -63,35 +160,792 @@ class Visualizer:
 		image = ImageDraw.Draw(blank)
 
 		updated_map_info = self.get_offset_map_info()
-
-		image.polygon(
-			[
-				point.int().get_coordinates()
-				for point in updated_map_info.get_boundaries()
-			], fill=(255, 255, 255, 255)
-		)
+		self.draw_boundaries(image, self.get_boundary_polygon(updated_map_info))
 
 		return blank
 
+	@Instrumentation.instrumented("Visualizer.blur")
 	def apply_blur_to_image(self, image: Image) -> Image:
 		'''Function to apply blur to image'''
+		factor = self.get_downsample_factor()
+		if factor > 1:
+			#Approximate blur: blur of downsampled image with smaller radius, and then upsampling to image size
+			#Image is extended by edge pixels to multiple of factor, so each downsampled pixel is exactly one square of factor size,
+			#and result of any part of the image with origin at multiple of factor is the same as result of whole image
+			size = (math.ceil(image.width/factor), math.ceil(image.height/factor))
+			pixels = np.asarray(image)
+			pixels = np.pad(pixels, ((0, size[1]*factor - image.height), (0, size[0]*factor - image.width), (0, 0)), mode="edge")
+			padded = Image.fromarray(pixels, image.mode)
+
+			#Bands are resampled separately, because blur doesn't premultiply colors by alpha, but RGBA resampling does
+			small = Image.merge(image.mode, [band.resize(size, Image.Resampling.BOX) for band in padded.split()])
+			small = small.filter(ImageFilter.GaussianBlur(self.blur_pixels/factor))
+			padded = Image.merge(image.mode, [band.resize(padded.size, Image.Resampling.BILINEAR) for band in small.split()])
+			return padded.crop((0, 0, image.width, image.height))
+
 		image = image.filter(ImageFilter.GaussianBlur(self.blur_pixels))
 		return image
 
-	def merge_layers(self, layers: list[Image]) -> Image:
-		'''Function to merge layers containing images'''
-		blank = Image.new("RGBA", self.image_size, (255, 255, 255, 0))
+	def get_downsample_factor(self) -> int:
+		'''Function to get factor of downsampling for approximate blur (1 - blur is exact)'''
+		if self.blur_method != "downsample":
+			return 1
+
+		return max(int(self.blur_pixels//self.DOWNSAMPLE_BLUR_PIXELS), 1)
+
+	@Instrumentation.instrumented("Visualizer.merge")
+	def merge_layers(self, layers: list[Image], size: (int, int) = None) -> Image:
+		'''Function to merge layers containing images (by default - of the image size)'''
+		blank = Image.new("RGBA", size or self.image_size, (255, 255, 255, 0))
 		for image in layers:
 			blank = Image.alpha_composite(blank, image)
 
 		return blank
 
-	def save_image(self, filename: str):
-		'''Function to save image to file'''
-		blank = self.get_map_image()
+	def render_image(self) -> Image:
+		'''
+		Function to draw road map with blur over boundaries of the map
+		Drawing, blur and merging are done only inside padded box of the map, rest of the image is filled with background
+		'''
+		updated_map_info = self.get_offset_map_info()
+		circles, lines = self.get_draw_commands(updated_map_info)
+		boxes = self.get_commands_boxes(circles, lines)
+		polygon = self.get_boundary_polygon(updated_map_info)
+
+		image = Image.new("RGBA", self.image_size, self.get_background_color())
+		box = self.get_content_box(boxes, polygon)
+		if box is not None:
+			image.paste(self.get_tile_image(box, circles, lines, boxes, polygon), box[:2])
+
+		return image
+
+	def get_background_color(self):
+		'''Function to get color of merged image pixels, where nothing is drawn'''
+		empty = Image.new("RGBA", (1, 1), (255, 255, 255, 0))
+		return self.merge_layers([empty, empty], (1, 1)).getpixel((0, 0))
+
+	def get_content_box(self, boxes: tuple, polygon: list):
+		'''Function to get box [left, top, right, bottom] of the image, out of which there are no drawn pixels even after blur, or None if nothing is drawn'''
+		polygon_box = np.array(polygon, dtype=float).reshape(-1, 2)
+		polygon_box = np.concatenate([polygon_box.min(axis=0), polygon_box.max(axis=0)]).reshape(-1, 4) if len(polygon_box) else polygon_box.reshape(-1, 4)
+		boxes = np.concatenate([*boxes, polygon_box + [-2, -2, 2, 2]])
+		if len(boxes) == 0:
+			return None
+
+		width, height = self.image_size
+		padding = self.get_blur_padding()
+		left = max(math.floor(boxes[:, 0].min()) - padding, 0)
+		top = max(math.floor(boxes[:, 1].min()) - padding, 0)
+		right = min(math.ceil(boxes[:, 2].max()) + padding + 1, width)
+		bottom = min(math.ceil(boxes[:, 3].max()) + padding + 1, height)
+		if left >= right or top >= bottom:
+			return None
+
+		return left, top, right, bottom
+
+	def get_render_settings(self):
+		'''Function to get settings, which affect rendered image'''
+		return {
+			"pixels_per_unit": self.pixels_per_unit,
+			"image_size": list(self.image_size),
+			"blur_pixels": self.blur_pixels,
+			"blur_method": self.blur_method,
+			"engine": self.engine,
+		}
+
+	def get_image(self) -> Image:
+		'''Function to get rendered image, from render cache (if it's given) or by drawing it'''
+		if self.cache is None:
+			return self.render_image()
+
+		key = self.cache.get_key(self.map_info, self.get_render_settings())
+		image = self.cache.get(key)
+		if image is None:
+			image = self.render_image()
+			self.cache.put(key, image)
+
+		return image
+
+	def get_rgba_buffer(self) -> memoryview:
+		'''
+		Function to get read-only buffer of rendered image in RGBA format, rows from top to bottom, for callers with own encoding
+		Buffer is created by one copy from PIL storage, and isn't copied again by 'memoryview' or 'np.frombuffer'
+		'''
+		return memoryview(self.get_image().tobytes())
+
+	def encode_image(self, target = None, format: str = "png", **options):
+		'''
+		Function to encode rendered image
+		- 'target': name of the file, binary file-like object (with 'write'), socket-like object (with 'sendall'), or None to return bytes
+		- 'format': 'png', 'webp', or 'raw' for RGBA buffer without encoding
+		- 'options': options of PIL encoder, for example 'compress_level' and 'optimize' for PNG, 'quality', 'lossless' and 'method' for WebP
+		'''
+		if format not in self.FORMATS:
+			raise ValueError(f"Unknown image format '{format}', available formats: {list(self.FORMATS)}")
+
+		if format == "webp" and not features.check("webp"):
+			raise ValueError("Image format 'webp' isn't supported by installed PIL")
+
+		if format == "raw" and options:
+			raise ValueError(f"Image format 'raw' has no encoder options, but options {list(options)} are given")
+
+		if format == "raw":
+			data = self.get_rgba_buffer()
+		else:
+			image = self.get_image()
+
+		output = io.BytesIO() if target is None else target
+		with Instrumentation.stage("Visualizer.encode"):
+			if isinstance(output, (str, os.PathLike)):
+				if format == "raw":
+					with open(output, "wb") as file:
+						file.write(data)
+				else:
+					image.save(output, self.FORMATS[format], **options)
+			else:
+				writer = get_writer(output)
+				if format == "raw":
+					writer.write(data)
+				else:
+					image.save(writer, self.FORMATS[format], **options)
+
+		if target is None:
+			return output.getvalue()
+
+	def save_image(self, filename: str, format: str = "png", **options):
+		'''Function to save image to file (see 'encode_image' for formats and options)'''
+		self.encode_image(filename, format, **options)
+
+	#Tiled rendering
+
+	def get_blur_padding(self) -> int:
+		'''Function to get count of pixels around the tile, which affect tile pixels after blur'''
+		if self.blur_pixels <= 0:
+			return 0
+
+		#Gaussian blur is applied as three passes of box blur, each with extent about blur radius
+		#Approximate blur also spreads pixels by resampling kernels of downsampling and upsampling
+		return 3*(math.ceil(self.blur_pixels) + 1) + 1 + 2*self.get_downsample_factor()
+
+	def get_commands_boxes(self, circles: list, lines: 'LineCommands'):
+		'''Function to get boxes [left, top, right, bottom] in image coordinates, covering drawn circles and lines'''
+		circle_boxes = np.array(
+			[(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)) for ((x0, y0), (x1, y1)), _, _, _ in circles],
+			dtype=float
+		).reshape(-1, 4)
+
+		points = lines.points
+		halfwidths = (lines.get_widths()/2)[:, None]
+		line_boxes = np.concatenate([
+			np.minimum(points[:, :2], points[:, 2:]) - halfwidths,
+			np.maximum(points[:, :2], points[:, 2:]) + halfwidths,
+		], axis=1).astype(float)
+
+		#Small margin for rounding of drawn pixels
+		return circle_boxes + [-2, -2, 2, 2], line_boxes + [-2, -2, 2, 2]
+
+	def get_tile_image(self, tile: (int, int, int, int), circles: list, lines: 'LineCommands', boxes: tuple, polygon: list) -> Image:
+		'''
+		Function to render one tile [left, top, right, bottom] of the image
+		Only elements with boxes intersecting padded tile are drawn, and blur is applied to padded tile to avoid seams
+		'''
+		left, top, right, bottom = tile
+		width, height = self.image_size
+		padding = self.get_blur_padding()
+		factor = self.get_downsample_factor()
+
+		#Padded canvas is limited by image, so blur near image borders is the same as for whole image
+		#For approximate blur canvas is aligned to multiples of downsampling factor, so downsampling grid is the same as for whole image
+		canvas = (
+			max(left - padding, 0)//factor*factor,
+			max(top - padding, 0)//factor*factor,
+			min(math.ceil((right + padding)/factor)*factor, width),
+			min(math.ceil((bottom + padding)/factor)*factor, height),
+		)
+		size = (canvas[2] - canvas[0], canvas[3] - canvas[1])
+		offset = (-canvas[0], -canvas[1])
+
+		def visible(elements_boxes):
+			return (
+				(elements_boxes[:, 2] >= canvas[0]) & (elements_boxes[:, 0] <= canvas[2]) &
+				(elements_boxes[:, 3] >= canvas[1]) & (elements_boxes[:, 1] <= canvas[3])
+			)
+
+		circle_boxes, line_boxes = boxes
+		visible_circles = [circles[index] for index in np.flatnonzero(visible(circle_boxes))]
+		visible_lines = lines.select(visible(line_boxes))
+
+		blank = self.draw_layer(size, visible_circles, visible_lines, offset)
 		blank = self.apply_blur_to_image(blank)
-		boundaries = self.get_map_boundaries_image()
-		blank = self.merge_layers([boundaries, blank])
 
-		blank.save(filename, "PNG")
-		
\ No newline at end of file
+		boundaries = Image.new("RGBA", size, (255, 255, 255, 0))
+		self.draw_boundaries(ImageDraw.Draw(boundaries), polygon, offset)
+
+		blank = self.merge_layers([boundaries, blank], size)
+		return blank.crop((left - canvas[0], top - canvas[1], right - canvas[0], bottom - canvas[1]))
+
+	def save_tiled_image(self, filename: str, tile_size: int = 1024, compress_level: int = 6):
+		'''
+		Function to save image to PNG file (or file-like or socket-like object), rendering it tile by tile
+		Tiles are written to file by horizontal bands, so peak memory is bounded by tile size and image width instead of whole image size
+		'''
+		width, height = self.image_size
+		tile_size = max(int(tile_size), 1)
+
+		updated_map_info = self.get_offset_map_info()
+		circles, lines = self.get_draw_commands(updated_map_info)
+		boxes = self.get_commands_boxes(circles, lines)
+		polygon = self.get_boundary_polygon(updated_map_info)
+
+		with StreamingPNGWriter(filename, self.image_size, compress_level) as writer:
+			for top in range(0, height, tile_size):
+				bottom = min(top + tile_size, height)
+				band = Image.new("RGBA", (width, bottom - top), (255, 255, 255, 0))
+
+				for left in range(0, width, tile_size):
+					right = min(left + tile_size, width)
+					band.paste(self.get_tile_image((left, top, right, bottom), circles, lines, boxes, polygon), (left, 0))
+
+				writer.write_rows(band)
+
+
+class LineCommands:
+	'''
+	LineCommands - class with drawing arguments of lines in image coordinates, stored as arrays
+	Containing parameters:
+	- 'points': integer array with rows [x1, y1, x2, y2]
+	- 'widths': list of distinct widths of lines
+	- 'width_indices': array of indices of lines widths in 'widths'
+	'''
+
+	__slots__ = ("points", "widths", "width_indices")
+
+	#Initializer
+	def __init__(self, points, widths: list, width_indices):
+		self.points = np.asarray(points, dtype=np.int64).reshape(-1, 4)
+		self.widths = widths
+		self.width_indices = np.asarray(width_indices, dtype=np.int64)
+
+	#Getters
+
+	def get_widths(self):
+		'''Function to get array of widths of all lines'''
+		return np.array(self.widths, dtype=float)[self.width_indices] if len(self.widths) else np.zeros(len(self.points))
+
+	def select(self, mask):
+		'''Function to get commands of lines selected by mask or indices'''
+		return LineCommands(self.points[mask], self.widths, self.width_indices[mask])
+
+	def get_chains_order(self, points):
+		'''
+		Function to join lines into chains, where second point of each line is first point of next line
+		Returns tuple (order, starts): indices of lines sorted by chains, and positions of first lines of chains in this order
+		'''
+		count = len(points)
+		index = np.arange(count)
+
+		#Successor of each line - first line, which starts at its end point. Each line can continue only one line
+		keys = points[:, 0]*(2**32) + points[:, 1]
+		ends = points[:, 2]*(2**32) + points[:, 3]
+		sorted_starts = np.argsort(keys, kind="stable")
+		positions = np.minimum(np.searchsorted(keys[sorted_starts], ends), max(count - 1, 0))
+		successor = np.where(keys[sorted_starts][positions] == ends, sorted_starts[positions], -1)
+		successor[successor == index] = -1
+
+		linked = np.flatnonzero(successor >= 0)
+		_, first = np.unique(successor[linked], return_index=True)
+		unique_successor = np.full(count, -1)
+		unique_successor[linked[first]] = successor[linked[first]]
+		successor = unique_successor
+
+		#Break cycles at line with minimal index, which is found by pointer jumping
+		jump = successor.copy()
+		minimal = index.copy()
+		for _ in range(max(count, 1).bit_length()):
+			valid = jump >= 0
+			minimal[valid] = np.minimum(minimal[valid], minimal[jump[valid]])
+			jump[valid] = jump[jump[valid]]
+
+		in_cycle = jump >= 0
+		predecessor = np.full(count, -1)
+		predecessor[successor[successor >= 0]] = index[successor >= 0]
+		heads = in_cycle & (minimal == index)
+		successor[predecessor[heads]] = -1
+		predecessor[heads] = -1
+
+		#Head of chain and distance to it for each line by pointer jumping over predecessors
+		head = index.copy()
+		rank = (predecessor >= 0).astype(np.int64)
+		jump = predecessor.copy()
+		for _ in range(max(count, 1).bit_length()):
+			valid = jump >= 0
+			rank[valid] += rank[jump[valid]]
+			head[valid] = head[jump[valid]]
+			jump[valid] = jump[jump[valid]]
+
+		order = np.lexsort((rank, head))
+		starts = np.flatnonzero(np.concatenate([[True], head[order][1:] != head[order][:-1]])) if count else np.zeros(0, dtype=np.int64)
+		return order, starts
+
+	def get_polylines(self, offset: (int, int) = (0, 0)):
+		'''Function to get list of polylines [(points, width), ...] for drawing, where 'points' is flat list of coordinates shifted by offset'''
+		polylines = []
+		for width_index, width in enumerate(self.widths):
+			points = self.points[self.width_indices == width_index] + [offset[0], offset[1], offset[0], offset[1]]
+			if len(points) == 0:
+				continue
+
+			order, starts = self.get_chains_order(points)
+			points = points[order]
+
+			#Vertices of chains: first points of all lines, and second point of last line of each chain
+			ends = np.append(starts[1:], len(points))
+			vertices = np.insert(points[:, :2], ends, points[ends - 1, 2:], axis=0).ravel().tolist()
+			bounds = (np.append(starts, len(points)) + np.arange(len(starts) + 1))*2
+
+			for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+				polylines.append((vertices[start:end], width))
+
+		return polylines
+
+	#Other classic methods
+
+	def __len__(self):
+		return len(self.points)
+
+	def __str__(self):
+		return f"LineCommands: Lines - '{len(self.points)}', Widths - '{self.widths}'"
+
+	def __repr__(self):
+		return f"LineCommands{{lines={len(self.points)}, widths={self.widths}}}"
+
+
+class SocketWriter:
+	'''
+	SocketWriter - class to write binary data to socket-like object with file-like interface
+	Containing parameters:
+	- 'socket': object with method 'sendall'
+	'''
+
+	#Initializer
+	def __init__(self, socket):
+		self.socket = socket
+
+	#Writers
+
+	def write(self, data):
+		self.socket.sendall(data)
+		return len(data)
+
+	def flush(self):
+		pass
+
+def get_writer(target):
+	'''Function to get file-like object for writing to binary file-like or socket-like object'''
+	if hasattr(target, "write"):
+		return target
+
+	if hasattr(target, "sendall"):
+		return SocketWriter(target)
+
+	raise ValueError(f"Output target '{target!r}' must be name of the file, or object with 'write' or 'sendall' method")
+
+
+class StreamingPNGWriter:
+	'''
+	StreamingPNGWriter - class to write RGBA PNG image by horizontal bands of rows, without keeping whole image in memory
+	Containing parameters:
+	- 'file': name of the file, binary file-like object, or socket-like object
+	- 'size': size of the image (width, height)
+	- 'compress_level': zlib compression level
+	Rows are encoded with PNG 'Up' filter
+	'''
+
+	SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+	#Initializer
+	def __init__(self, file, size: (int, int), compress_level: int = 6):
+		self.own_file = isinstance(file, (str, os.PathLike))
+		self.file = open(file, "wb") if self.own_file else get_writer(file)
+		self.size = size
+		self.compressor = zlib.compressobj(compress_level)
+		self.previous_row = np.zeros(size[0]*4, dtype=np.uint8)
+		self.rows = 0
+
+		width, height = size
+		self.file.write(self.SIGNATURE)
+		self.write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+	#Writers
+
+	def write_chunk(self, chunk_type: bytes, data: bytes):
+		'''Function to write PNG chunk with length and checksum'''
+		self.file.write(struct.pack(">I", len(data)))
+		self.file.write(chunk_type)
+		self.file.write(data)
+		self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+	@Instrumentation.instrumented("Visualizer.encode")
+	def write_rows(self, image: Image):
+		'''Function to write next rows of the image, given as RGBA image with width of the whole image'''
+		if image.size[0] != self.size[0]:
+			raise ValueError(f"Width of rows '{image.size[0]}' isn't equal to width of the image '{self.size[0]}'")
+
+		rows = np.asarray(image.convert("RGBA"), dtype=np.uint8).reshape(image.size[1], -1)
+		if self.rows + len(rows) > self.size[1]:
+			raise ValueError(f"Count of rows is more than height of the image '{self.size[1]}'")
+
+		#'Up' filter: difference with previous row modulo 256, with filter type byte at start of each row
+		previous = np.vstack([self.previous_row[None], rows[:-1]])
+		filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+		filtered[:, 0] = 2
+		filtered[:, 1:] = rows - previous
+
+		data = self.compressor.compress(filtered.tobytes())
+		if data:
+			self.write_chunk(b"IDAT", data)
+
+		self.previous_row = rows[-1].copy()
+		self.rows += len(rows)
+
+	def close(self):
+		'''Function to finish image and close file, if it was opened by writer'''
+		if self.rows != self.size[1]:
+			raise ValueError(f"Count of written rows '{self.rows}' isn't equal to height of the image '{self.size[1]}'")
+
+		self.write_chunk(b"IDAT", self.compressor.flush())
+		self.write_chunk(b"IEND", b"")
+		if self.own_file:
+			self.file.close()
+
+	#Other classic methods
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		if exc_type is None:
+			self.close()
+		elif self.own_file:
+			self.file.close()
+		
+
+
+class RenderCache:
+	'''
+	RenderCache - class of two-tier cache of rendered images: in memory, and optionally on disk
+	Containing parameters:
+	- 'max_bytes': maximal total size of RGBA buffers of images in memory, least recently used images are evicted first
+	- 'directory': directory of cached image files (None - images are cached only in memory)
+	- 'max_disk_bytes': maximal total size of cached files, least recently used files are evicted after writes (None - unbounded)
+	- 'disk_format': format of cached files, 'png' (compressed) or 'raw' (RGBA buffer, faster to read and write)
+	Images are cached by digest of map geometry and render settings. Cached images are returned as copies, so they can be modified
+	'''
+
+	FORMATS = ["png", "raw"]
+
+	#Version of rendering, changed when images rendered with the same settings can change
+	VERSION = 1
+
+	#Size and mode of image, before raw RGBA buffer
+	RAW_HEADER = struct.Struct("<II4s")
+
+	#Initializer
+	def __init__(self, max_bytes: int = 256*1024**2, directory: str = None, max_disk_bytes: int = None, disk_format: str = "png"):
+		if disk_format not in self.FORMATS:
+			raise ValueError(f"Unknown render cache format '{disk_format}', available formats: {self.FORMATS}")
+
+		self.max_bytes = max_bytes
+		self.directory = directory
+		self.max_disk_bytes = max_disk_bytes
+		self.disk_format = disk_format
+
+		self.images = collections.OrderedDict()
+		self.size = 0
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+
+		if self.directory is not None:
+			os.makedirs(self.directory, exist_ok=True)
+
+	#Getters
+
+	def get_key(self, map_info: MapGenerator.MapInfo, settings: dict):
+		'''Function to get key of rendered image by map information and render settings'''
+		digest = hashlib.sha256(map_info.get_digest().encode())
+		digest.update(json.dumps({"version": self.VERSION, **settings}, sort_keys=True).encode())
+		return digest.hexdigest()
+
+	def get_image_size(self, image: Image):
+		return image.width*image.height*len(image.getbands())
+
+	def get_filename(self, key: str):
+		return os.path.join(self.directory, f"{key}.{self.disk_format}")
+
+	def get(self, key: str) -> Image:
+		'''Function to get copy of cached image by key, or None if image isn't cached'''
+		if key in self.images:
+			self.images.move_to_end(key)
+			self.memory_hits += 1
+			return self.images[key].copy()
+
+		image = self.read_file(key) if self.directory is not None else None
+		if image is None:
+			self.misses += 1
+			return None
+
+		self.disk_hits += 1
+		self.put_to_memory(key, image)
+		return image.copy()
+
+	def read_file(self, key: str) -> Image:
+		'''Function to read cached image file by key, returns None if file doesn't exist or is damaged'''
+		filename = self.get_filename(key)
+		try:
+			if self.disk_format == "raw":
+				with open(filename, "rb") as file:
+					data = file.read()
+
+				width, height, mode = self.RAW_HEADER.unpack_from(data)
+				image = Image.frombytes(mode.decode().strip(), (width, height), data[self.RAW_HEADER.size:])
+			else:
+				with Image.open(filename) as file:
+					image = file.copy()
+
+			os.utime(filename)
+		except (OSError, ValueError, struct.error):
+			return None
+
+		return image
+
+	def get_files(self):
+		'''Function to get list of cached files as tuples (last use time, size, filename)'''
+		files = []
+		for filename in os.listdir(self.directory):
+			if not filename.endswith(f".{self.disk_format}"):
+				continue
+
+			path = os.path.join(self.directory, filename)
+			try:
+				status = os.stat(path)
+			except OSError:
+				continue
+
+			files.append((status.st_mtime, status.st_size, path))
+
+		return files
+
+	def get_statistics(self):
+		return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses, "images": len(self.images), "bytes": self.size}
+
+	#Setters
+
+	def put(self, key: str, image: Image):
+		'''Function to cache copy of rendered image by key in memory and on disk'''
+		image = image.copy()
+		self.put_to_memory(key, image)
+		if self.directory is not None:
+			self.write_file(key, image)
+
+	def put_to_memory(self, key: str, image: Image):
+		size = self.get_image_size(image)
+		if size > self.max_bytes:
+			return
+
+		if key in self.images:
+			self.size -= self.get_image_size(self.images.pop(key))
+
+		self.images[key] = image
+		self.size += size
+
+		while self.size > self.max_bytes:
+			_, evicted = self.images.popitem(last=False)
+			self.size -= self.get_image_size(evicted)
+
+	def write_file(self, key: str, image: Image):
+		'''Function to write image to cache file atomically, and evict least recently used files'''
+		descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+		try:
+			with os.fdopen(descriptor, "wb") as file:
+				if self.disk_format == "raw":
+					file.write(self.RAW_HEADER.pack(image.width, image.height, image.mode.encode().ljust(4)))
+					file.write(image.tobytes())
+				else:
+					image.save(file, "PNG")
+
+			os.replace(temporary, self.get_filename(key))
+		except BaseException:
+			os.remove(temporary)
+			raise
+
+		if self.max_disk_bytes is None:
+			return
+
+		files = sorted(self.get_files())
+		size = sum(file_size for _, file_size, _ in files)
+		for _, file_size, path in files:
+			if size <= self.max_disk_bytes:
+				break
+
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+			size -= file_size
+
+	def clear(self):
+		'''Function to drop images from memory'''
+		self.images = collections.OrderedDict()
+		self.size = 0
+
+	def reset_statistics(self):
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+
+	#Other classic methods
+
+	def __getstate__(self):
+		'''Images in memory aren't sent to worker processes, only settings and directory of the cache'''
+		state = self.__dict__.copy()
+		state["images"] = collections.OrderedDict()
+		state["size"] = 0
+		return state
+
+	def __len__(self):
+		return len(self.images)
+
+	def __str__(self):
+		return f"RenderCache: Images - '{len(self.images)}', Bytes - '{self.size}', Memory hits - '{self.memory_hits}', Disk hits - '{self.disk_hits}', Misses - '{self.misses}'"
+
+	def __repr__(self):
+		return f"RenderCache{{max_bytes={self.max_bytes}, directory={self.directory!r}, statistics={self.get_statistics()}}}"
+
+
+class RenderResult:
+	'''
+	RenderResult - class with result of rendering one item of the batch
+	Containing parameters:
+	- 'index': index of the item in the batch
+	- 'filename': name of the file for the item
+	- 'error': description of error with traceback, or None if item was rendered successfully
+	'''
+
+	#Initializer
+	def __init__(self, index: int, filename: str, error: str = None):
+		self.index = index
+		self.filename = filename
+		self.error = error
+
+	#Getters
+
+	def is_successful(self):
+		return self.error is None
+
+	#Other classic methods
+
+	def __str__(self):
+		status = "OK" if self.is_successful() else f"Error - {self.error}"
+		return f"RenderResult: Index - '{self.index}', Filename - '{self.filename}', {status}"
+
+	def __repr__(self):
+		return f"RenderResult{{index={self.index}, filename={self.filename}, error={self.error!r}}}"
+
+
+#Items of the batch, inherited by worker processes on initialization
+WORKER_RENDER_ITEMS = []
+
+def initialize_render_worker(items: list):
+	'''Function to initialize worker process with items of the batch'''
+	global WORKER_RENDER_ITEMS
+	WORKER_RENDER_ITEMS = items
+
+def render_item(item, filename: str, settings: dict):
+	'''Function to render map information, or map generated by dictionary of generator parameters, and save it to file'''
+	map_info = item if isinstance(item, MapGenerator.MapInfo) else MapGenerator.Generator(**item).generate()
+	Visualizer(map_info, **settings).save_image(filename)
+
+def render_worker_item(index: int, filename: str, settings: dict):
+	'''Function to render item of the batch in worker process by index. Errors are reported in result instead of raising'''
+	try:
+		render_item(WORKER_RENDER_ITEMS[index], filename, settings)
+		return RenderResult(index, filename)
+	except Exception:
+		return RenderResult(index, filename, traceback.format_exc())
+
+def render_many(
+		items: list,
+		filenames: list[str],
+		workers: int = None,
+		max_in_flight: int = None,
+		**settings
+):
+	'''
+	Function to render and save many maps in a process pool. Yields RenderResult for each item in order of completion
+	- 'items': list of MapInfo, or dictionaries with Generator initializer arguments
+	- 'filenames': list of names of the files for items
+	- 'workers': count of worker processes (by default - count of CPUs), with 0 or 1 maps are rendered in current process
+	- 'max_in_flight': maximal count of items submitted to workers at once (by default - two per worker)
+	- 'settings': Visualizer initializer arguments (pixels_per_unit, image_size, blur_pixels, cache, blur_method, engine)
+	Each worker rasterizes, encodes and writes one image at a time, so count of image buffers in memory is bounded by count of workers
+	'''
+	items = list(items)
+	filenames = list(filenames)
+	if len(items) != len(filenames):
+		raise ValueError(f"Count of items '{len(items)}' isn't equal to count of filenames '{len(filenames)}'")
+
+	workers = (os.cpu_count() or 1) if workers is None else workers
+
+	if workers <= 1 or len(items) <= 1:
+		for index, (item, filename) in enumerate(zip(items, filenames)):
+			try:
+				render_item(item, filename, settings)
+				yield RenderResult(index, filename)
+			except Exception:
+				yield RenderResult(index, filename, traceback.format_exc())
+		return
+
+	context = MapGenerator.get_process_context()
+	if context.get_start_method() != "fork":
+		MapGenerator.check_parameter_sets_picklable([item for item in items if isinstance(item, dict)])
+
+	max_in_flight = max(int(max_in_flight or 2*workers), 1)
+
+	executor = concurrent.futures.ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=context,
+		initializer=initialize_render_worker,
+		initargs=(items,)
+	)
+	try:
+		pending = {}
+		next_index = 0
+
+		while pending or next_index < len(items):
+			#Keep only bounded count of submitted items
+			while next_index < len(items) and len(pending) < max_in_flight:
+				try:
+					future = executor.submit(render_worker_item, next_index, filenames[next_index], settings)
+				except concurrent.futures.BrokenExecutor:
+					#Worker process died and pool is broken, so remaining items can't be submitted and are reported as failed
+					error = traceback.format_exc()
+					for index in range(next_index, len(items)):
+						yield RenderResult(index, filenames[index], error)
+					next_index = len(items)
+					break
+
+				pending[future] = next_index
+				next_index += 1
+
+			done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				index = pending.pop(future)
+				try:
+					yield future.result()
+				except Exception:
+					#Worker process failed or died (BrokenProcessPool), so error can't be reported by worker
+					yield RenderResult(index, filenames[index], traceback.format_exc())
+	finally:
+		executor.shutdown(wait=True, cancel_futures=True)
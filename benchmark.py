@@ -0,0 +1,387 @@
+"""
+Parameterized benchmark suite of map generation, transformation and rendering
+Timings depend on the machine, so baseline isn't stored in repository and is created locally before changes:
+	python benchmark.py --quick --save baseline.json
+and then results after changes are compared with it (with the same case selection options):
+	python benchmark.py --quick --compare baseline.json
+"""
+
+import argparse
+import gc
+import io
+import itertools
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import Scripts.BasicElements as BasicElements
+import Scripts.Functions as Functions
+import Scripts.MapGenerator as MapGenerator
+import Scripts.RoadGraph as RoadGraph
+import Scripts.SpatialIndex as SpatialIndex
+import Scripts.Visualizer as Visualizer
+import Scripts.VectorExporter as VectorExporter
+
+class DictPoint:
+	'''DictPoint - mock of BasicElements.Point before '__slots__', with the same attributes stored in per-instance __dict__'''
+
+	def __init__(self, x: float, y: float):
+		self.x = x
+		self.y = y
+
+class DictMapLine:
+	'''DictMapLine - mock of MapElements.MapLine before '__slots__', with the same attributes stored in per-instance __dict__'''
+
+	def __init__(self, point1: DictPoint, point2: DictPoint, angle: float, distance: float, lineclass):
+		self.point1 = point1
+		self.point2 = point2
+		self.angle = angle
+		self.distance = distance
+		self.lineclass = lineclass
+
+class DictMapCircle:
+	'''DictMapCircle - mock of MapElements.MapCircle before '__slots__', with the same attributes stored in per-instance __dict__'''
+
+	def __init__(self, center: DictPoint, radius: float, circleclass, fixed_radius: bool):
+		self.center = center
+		self.radius = radius
+		self.circleclass = circleclass
+		self.fixed_radius = fixed_radius
+
+def scale_dict_elements(map_info: MapGenerator.MapInfo, factor: float = 1):
+	'''Function to build scaled copies of all elements with __dict__ representation, allocating the same values as MapInfo.scale'''
+	lines = [
+		DictMapLine(
+			DictPoint(line.point1.x*factor, line.point1.y*factor),
+			DictPoint(line.point2.x*factor, line.point2.y*factor),
+			line.angle%math.pi,
+			round(line.distance*factor, 6),
+			line.lineclass
+		) for line in map_info.get_lines()
+	]
+	circles = [
+		DictMapCircle(
+			DictPoint(circle.center.x*factor, circle.center.y*factor),
+			circle.radius,
+			circle.circleclass,
+			circle.fixed_radius
+		) for circle in map_info.get_circles()
+	]
+	return lines, circles
+
+def get_large_map():
+	'''Function to generate large map for benchmarks'''
+	return MapGenerator.Generator(
+		sides_count=200,
+		rings_count=5,
+		sector_subdivisions=8,
+		generation_count=10,
+	).generate()
+
+def get_traced_memory(function):
+	'''Function to get count of bytes allocated by function and still alive after call'''
+	tracemalloc.start()
+	start, _ = tracemalloc.get_traced_memory()
+	result = function()
+	end, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return result, end - start
+
+def benchmark_memory():
+	'''
+	Benchmark of bytes per element for large generator output, for compact '__slots__' and previous '__dict__' representations
+	Previous representation isn't available anymore, so it's estimated with mock classes with the same attributes (see 'DictMapLine' and 'DictMapCircle')
+	'''
+	map_info = get_large_map()
+	count = len(list(map_info.get_lines())) + len(list(map_info.get_circles()))
+
+	_, compact = get_traced_memory(lambda: map_info.scale(1).objects_lists)
+	_, dictionary = get_traced_memory(lambda: scale_dict_elements(map_info, 1))
+
+	print(f"Elements: \t{count}")
+	print(f"Before (__dict__, estimate by mock classes): \t{dictionary/count:.1f} bytes per element")
+	print(f"After (__slots__): \t{compact/count:.1f} bytes per element")
+
+class BenchmarkCase:
+	'''
+	BenchmarkCase - class with one parameterized case of the benchmark
+	Containing parameters:
+	- 'group': name of the benchmarked stage
+	- 'parameters': dictionary of case parameters
+	- 'setup': function of parameters, which returns state for measured function (not measured)
+	- 'function': measured function of state
+	'''
+
+	#Initializer
+	def __init__(self, group: str, parameters: dict, setup, function):
+		self.group = group
+		self.parameters = parameters
+		self.setup = setup
+		self.function = function
+
+	#Getters
+
+	def get_name(self):
+		parameters = ",".join(f"{key}={value}" for key, value in self.parameters.items())
+		return f"{self.group}[{parameters}]"
+
+	#Other classic methods
+
+	def __str__(self):
+		return f"BenchmarkCase: {self.get_name()}"
+
+	def __repr__(self):
+		return f"BenchmarkCase{{group={self.group}, parameters={self.parameters}}}"
+
+def get_generator_parameters(parameters: dict):
+	'''Function to get Generator arguments from case parameters'''
+	return {
+		"sides_count": parameters["sides_count"],
+		"generation_count": parameters["generation_count"],
+		"sector_subdivisions": parameters["sector_subdivisions"],
+		"rings_count": 3,
+		"backend": parameters.get("backend", "python"),
+	}
+
+def get_random_lines_and_circles(count: int):
+	'''Function to generate reproducible random lines and circles for intersection cases'''
+	generator = random.Random(count)
+	point = lambda: BasicElements.Point(generator.uniform(-100, 100), generator.uniform(-100, 100))
+	lines = [BasicElements.Line(point(), point()) for _ in range(count)]
+	circles = [BasicElements.Circle(point(), generator.uniform(1, 50)) for _ in range(count)]
+	return lines, circles
+
+def get_visualizer_state(parameters: dict):
+	'''Function to prepare visualizer and images of previous stages for visualizer cases'''
+	map_info = MapGenerator.Generator(sides_count=parameters["sides_count"], generation_count=4, sector_subdivisions=4, rings_count=2).generate()
+	size = parameters["image_size"]
+	visualizer = Visualizer.Visualizer(map_info, pixels_per_unit=size//512, image_size=(size, size), blur_pixels=parameters["blur_pixels"])
+	image = visualizer.get_map_image()
+	boundaries = visualizer.get_map_boundaries_image()
+	return visualizer, image, boundaries
+
+def get_engine_visualizer(parameters: dict):
+	'''Function to prepare visualizer with rasterization engine for comparison of engines'''
+	map_info = MapGenerator.Generator(sides_count=parameters["sides_count"], generation_count=4, sector_subdivisions=4, rings_count=2).generate()
+	size = parameters["image_size"]
+	return Visualizer.Visualizer(map_info, pixels_per_unit=size//512, image_size=(size, size), engine=parameters["engine"])
+
+def get_small_map_visualizer(parameters: dict):
+	'''Function to prepare visualizer of small map on large image for rendering cases'''
+	map_info = MapGenerator.Generator(sides_count=6, generation_count=2).generate()
+	size = parameters["image_size"]
+	return Visualizer.Visualizer(
+		map_info, pixels_per_unit=2, image_size=(size, size), blur_pixels=parameters["blur_pixels"], blur_method=parameters["blur_method"]
+	)
+
+def get_cases(quick: bool = False):
+	'''Function to get list of all benchmark cases (with 'quick' - only small cases)'''
+	cases = []
+
+	sides = [6, 60] if quick else [6, 60, 200]
+	generations = [2] if quick else [2, 10]
+	subdivisions = [0, 4] if quick else [0, 4, 16]
+
+	for sides_count, generation_count, sector_subdivisions, backend in itertools.product(sides, generations, subdivisions, MapGenerator.Generator.BACKENDS):
+		parameters = {"sides_count": sides_count, "generation_count": generation_count, "sector_subdivisions": sector_subdivisions, "backend": backend}
+		cases.append(BenchmarkCase(
+			"generator_init", parameters,
+			get_generator_parameters,
+			lambda arguments: MapGenerator.Generator(**arguments)
+		))
+		cases.append(BenchmarkCase(
+			"generator_generate", parameters,
+			lambda parameters: MapGenerator.Generator(**get_generator_parameters(parameters)),
+			lambda generator: generator.generate()
+		))
+		cases.append(BenchmarkCase(
+			"generator_regenerate", parameters,
+			lambda parameters: MapGenerator.Generator(**get_generator_parameters(parameters)),
+			lambda generator: generator.regenerate(sector_subdivisions=generator.sector_subdivisions ^ 1)
+		))
+
+	for sides_count in sides:
+		parameters = {"sides_count": sides_count, "generation_count": 10, "sector_subdivisions": 4}
+		large_map = lambda parameters: MapGenerator.Generator(**get_generator_parameters(parameters)).generate()
+		cases.append(BenchmarkCase("map_info_move", parameters, large_map, lambda map_info: map_info.move(BasicElements.Point(10, 10))))
+		cases.append(BenchmarkCase("map_info_scale", parameters, large_map, lambda map_info: map_info.scale(-10)))
+		cases.append(BenchmarkCase(
+			"map_info_materialize", parameters, large_map,
+			lambda map_info: map_info.scale(-10).move(BasicElements.Point(10, 10)).objects_lists
+		))
+		cases.append(BenchmarkCase(
+			"map_info_classify_points", parameters,
+			lambda parameters: (
+				SpatialIndex.MembershipIndex(MapGenerator.Generator(**get_generator_parameters(parameters)).generate()),
+				np.random.default_rng(0).uniform(-1000, 1000, (2, 10**6))
+			),
+			lambda state: state[0].classify(*state[1])
+		))
+		cases.append(BenchmarkCase("map_info_intersections", parameters, large_map, lambda map_info: map_info.get_intersections()))
+		cases.append(BenchmarkCase("map_info_road_graph", parameters, large_map, lambda map_info: map_info.get_road_graph()))
+		cases.append(BenchmarkCase(
+			"road_graph_distances", parameters,
+			lambda parameters: RoadGraph.RoadGraph.from_map_info(large_map(parameters), cache_size=0),
+			lambda graph: graph.get_distances(
+				np.random.default_rng(0).integers(0, len(graph), (16, 1)), np.random.default_rng(1).integers(0, len(graph), (16, 64))
+			)
+		))
+		cases.append(BenchmarkCase(
+			"map_info_arrays", parameters, large_map,
+			lambda map_info: (map_info.scale(-10).move(BasicElements.Point(10, 10)).get_line_array(), map_info.get_circle_array())
+		))
+
+	for count in ([1000] if quick else [1000, 10000]):
+		parameters = {"count": count}
+		cases.append(BenchmarkCase(
+			"intersect_line_line", parameters,
+			lambda parameters: get_random_lines_and_circles(parameters["count"]),
+			lambda elements: [Functions.Intersection.intersect_line_line(line, other) for line, other in zip(elements[0], elements[0][1:])]
+		))
+		cases.append(BenchmarkCase(
+			"intersect_line_circle", parameters,
+			lambda parameters: get_random_lines_and_circles(parameters["count"]),
+			lambda elements: [Functions.Intersection.intersect_line_circle(line, circle) for line, circle in zip(*elements)]
+		))
+		cases.append(BenchmarkCase(
+			"point_queries", parameters,
+			lambda parameters: get_random_lines_and_circles(parameters["count"]),
+			lambda elements: [
+				(line.is_point_on_line(circle.center), circle.is_point_inside(line.point1)) for line, circle in zip(*elements) for _ in range(10)
+			]
+		))
+		cases.append(BenchmarkCase(
+			"intersect_all", parameters,
+			lambda parameters: get_random_lines_and_circles(parameters["count"]),
+			lambda elements: Functions.Intersection.intersect_all(*elements)
+		))
+
+	for image_size in ([1024] if quick else [1024, 2048]):
+		parameters = {"sides_count": 60, "image_size": image_size, "blur_pixels": 4}
+		cases.append(BenchmarkCase("visualizer_draw", parameters, get_visualizer_state, lambda state: state[0].get_map_image()))
+		cases.append(BenchmarkCase("visualizer_blur", parameters, get_visualizer_state, lambda state: state[0].apply_blur_to_image(state[1])))
+		cases.append(BenchmarkCase("visualizer_boundaries", parameters, get_visualizer_state, lambda state: state[0].get_map_boundaries_image()))
+		cases.append(BenchmarkCase("visualizer_merge", parameters, get_visualizer_state, lambda state: state[0].merge_layers([state[2], state[1]])))
+		cases.append(BenchmarkCase("visualizer_save_png", parameters, get_visualizer_state, lambda state: state[1].save(io.BytesIO(), "PNG")))
+
+	for image_size, engine in itertools.product([1024] if quick else [1024, 2048], Visualizer.Visualizer.ENGINES):
+		parameters = {"sides_count": 60, "image_size": image_size, "engine": engine}
+		cases.append(BenchmarkCase("visualizer_engine", parameters, get_engine_visualizer, lambda visualizer: visualizer.get_map_image()))
+
+	for format, merge_paths in itertools.product(VectorExporter.VectorExporter.FORMATS, [False, True]):
+		parameters = {"sides_count": 60 if quick else 200, "generation_count": 10, "sector_subdivisions": 4, "format": format, "merge_paths": merge_paths}
+		cases.append(BenchmarkCase(
+			"vector_export", parameters,
+			lambda parameters: (
+				VectorExporter.VectorExporter(MapGenerator.Generator(**get_generator_parameters(parameters)).generate(), merge_paths=parameters["merge_paths"]),
+				parameters["format"]
+			),
+			lambda state: state[0].export(io.BytesIO(), state[1])
+		))
+
+	for blur_method in Visualizer.Visualizer.BLUR_METHODS:
+		parameters = {"image_size": 2048 if quick else 4096, "blur_pixels": 16, "blur_method": blur_method}
+		cases.append(BenchmarkCase("visualizer_render", parameters, get_small_map_visualizer, lambda visualizer: visualizer.render_image()))
+
+	return cases
+
+def run_case(case: BenchmarkCase, repeat: int = 5):
+	'''
+	Function to measure benchmark case. Returns dictionary with:
+	- wall time of the runs in seconds (minimal and median)
+	- peak of traced memory and count of memory blocks allocated and still alive after the run, measured by tracemalloc in separate run
+	Memory allocated by C libraries (like image buffers of PIL) isn't traced
+	'''
+	times = []
+	for _ in range(repeat):
+		state = case.setup(case.parameters)
+		start = time.perf_counter()
+		case.function(state)
+		times.append(time.perf_counter() - start)
+
+	#Garbage collector is disabled, so count of blocks isn't changed by collection of previous runs
+	state = case.setup(case.parameters)
+	gc.collect()
+	gc.disable()
+	tracemalloc.start()
+	blocks = sys.getallocatedblocks()
+	result = case.function(state)
+	blocks = sys.getallocatedblocks() - blocks
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	gc.enable()
+	del result
+
+	return {
+		"group": case.group,
+		"parameters": case.parameters,
+		"time_min": min(times),
+		"time_median": statistics.median(times),
+		"peak_memory": peak,
+		"allocated_blocks": blocks,
+	}
+
+def compare_results(results: dict, baseline: dict):
+	'''Function to print comparison of results with baseline results by case names'''
+	print(f"{'Case':<80} {'Baseline':>10} {'Current':>10} {'Ratio':>7}")
+	missing = 0
+	for name, result in results.items():
+		if name not in baseline:
+			print(f"{name:<80} {'-':>10} {result['time_median']*1000:>8.2f}ms {'-':>7}")
+			missing += 1
+			continue
+
+		base = baseline[name]["time_median"]
+		ratio = result["time_median"]/base if base > 0 else math.inf
+		print(f"{name:<80} {base*1000:>8.2f}ms {result['time_median']*1000:>8.2f}ms {ratio:>6.2f}x")
+
+	if missing:
+		print(f"Cases without baseline: {missing}, baseline is created by running the same cases with '--save <file>' before changes")
+
+def run_benchmarks(arguments):
+	'''Function to run selected benchmark cases, print results, and save or compare them with baseline JSON'''
+	results = {}
+	for case in get_cases(arguments.quick):
+		name = case.get_name()
+		if arguments.filter and arguments.filter not in name:
+			continue
+
+		result = run_case(case, arguments.repeat)
+		results[name] = result
+		print(f"{name:<80} {result['time_median']*1000:>10.2f}ms {result['peak_memory']/1024:>10.1f}KiB {result['allocated_blocks']:>8} blocks")
+
+	if arguments.save:
+		with open(arguments.save, "w") as file:
+			json.dump({"python": platform.python_version(), "results": results}, file, indent="\t")
+
+	if arguments.compare:
+		with open(arguments.compare) as file:
+			compare_results(results, json.load(file)["results"])
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Benchmarks of map generation, transformation and rendering",
+		epilog="Baseline is created on the same machine before changes with '--save baseline.json', and then used with '--compare baseline.json'"
+	)
+	parser.add_argument("--filter", default="", help="run only cases with this substring in name")
+	parser.add_argument("--repeat", type=int, default=5, help="count of measured runs of each case")
+	parser.add_argument("--quick", action="store_true", help="run only small cases")
+	parser.add_argument("--save", help="save results to JSON file as baseline")
+	parser.add_argument("--compare", help="compare results with baseline JSON file")
+	parser.add_argument("--memory", action="store_true", help="run only memory benchmark of element representation")
+	arguments = parser.parse_args()
+
+	if arguments.memory:
+		benchmark_memory()
+	else:
+		run_benchmarks(arguments)
+
+if __name__ == "__main__":
+	main()
@@ -1,3 +1,7 @@
+import io
+
+from PIL import Image
+
 import Scripts.Abstracts as Abstracts
 import Scripts.BasicElements as BasicElements
 import Scripts.MapElements as MapElements
@@ -109,4 +113,72 @@ def test_2():
 	visualizer = Visualizer.Visualizer(generated_map, blur_pixels=blur_pixels)
 	visualizer.save_image("Hello world.png")
 
-test_2()
\ No newline at end of file
+def test_3():
+
+	generated_map = MapGenerator.Generator(sides_count=6, generation_count=2).generate()
+	offset = BasicElements.Point(1, 2)
+
+	#Layer reassigned on view must be kept by next views
+	moved_map = generated_map.move(offset)
+	moved_map.outside_lines = []
+	lines_count = len(list(moved_map.get_lines()))
+
+	moved_twice_map = moved_map.move(offset)
+	assert len(list(moved_twice_map.get_lines())) == lines_count
+	assert len(moved_twice_map.get_line_array()[0].point1.x) == lines_count
+	assert moved_twice_map.outside_lines == []
+
+	#Other layers are moved twice
+	line = generated_map.inside_lines[0]
+	moved_line = moved_twice_map.inside_lines[0]
+	assert moved_line.point1.get_distance(line.point1 + offset*2) < 1e-9
+
+def test_4():
+
+	points = BasicElements.PointArray([1, 2], [3, 4])
+	point = BasicElements.Point(5, 5)
+
+	#Mixed arithmetic of point and array of points gives array of points
+	for result, expected in [
+		(point + points, [(6, 8), (7, 9)]),
+		(points + point, [(6, 8), (7, 9)]),
+		(point - points, [(4, 2), (3, 1)]),
+		(points - point, [(-4, -2), (-3, -1)]),
+	]:
+		assert isinstance(result, BasicElements.PointArray)
+		assert [tuple(element) for element in result] == expected
+
+	scaled = points.get_scaled_point_to_factor(BasicElements.Point(0, 0), 0.5)
+	for index, element in enumerate(points):
+		assert scaled[index].get_distance(element.get_scaled_point_to_factor(BasicElements.Point(0, 0), 0.5)) < 1e-9
+
+def test_5():
+
+	generated_map = MapGenerator.Generator(sides_count=6, generation_count=2).generate()
+	generated_map.get_spatial_index()
+
+	#Spatial index is built again over reassigned layer
+	generated_map.outside_lines = []
+	lines_count = len(list(generated_map.get_lines()))
+	assert len(generated_map.get_spatial_index().lines) == lines_count
+
+def test_6():
+
+	generated_map = MapGenerator.Generator(sides_count=7, generation_count=3, sector_subdivisions=2, rings_count=1).generate()
+	visualizer = Visualizer.Visualizer(generated_map, pixels_per_unit=1, image_size=(900, 700), blur_pixels=24, blur_method="downsample")
+
+	#Tile size isn't multiple of downsampling factor, but tiled image must be the same as whole image
+	tile_size = 333
+	assert tile_size%visualizer.get_downsample_factor() != 0
+
+	output = io.BytesIO()
+	visualizer.save_tiled_image(output, tile_size=tile_size)
+	output.seek(0)
+	with Image.open(output) as image:
+		assert image.convert("RGBA").tobytes() == visualizer.get_image().tobytes()
+
+test_2()
+test_3()
+test_4()
+test_5()
+test_6()
\ No newline at end of file